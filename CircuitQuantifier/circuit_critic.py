@@ -8,6 +8,7 @@ import numpy as np
 import threading
 
 from Utilities.decorators import thread
+from Utilities.events     import NOTIFIER
 
 #====================================================
 
@@ -45,8 +46,10 @@ class CircuitCritic(object):
 				# we need to modify the circuit_id of the proposed circuit parameters
 				new_circuit_id = str(uuid.uuid4())
 				extra_task['circuit']['circuit_id'] = new_circuit_id
+				extra_task['task_set_id']           = task['task_set_id']
 				self.EXTRA_TASKS.append(extra_task)
 				remaining_extra_circuit_ids.append(new_circuit_id)
+			NOTIFIER.notify('critic')
 
 			while len(received_extra_task_evaluations) < len(remaining_extra_circuit_ids):
 				# check if we have any new evaluated circuits
@@ -65,13 +68,18 @@ class CircuitCritic(object):
 
 			circuit_dict['loss']             = merit_eval_dict['loss']
 			circuit_dict['context_circuits'] = list(received_extra_task_evaluations.values())
+			if 'gradient' in merit_eval_dict:
+				circuit_dict['gradient'] = merit_eval_dict['gradient']
 
 		else:
 
 			circuit_dict['loss'] = merit_eval_dict['loss']
 			circuit_dict['context_circuits'] = None
+			if 'gradient' in merit_eval_dict:
+				circuit_dict['gradient'] = merit_eval_dict['gradient']
 
 		self.CRITICIZED_CIRCUITS.append([circuit_dict, task])
+		NOTIFIER.notify('critic')
 
 	##############################################################
 
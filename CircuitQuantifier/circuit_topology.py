@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+""" Topology checks on the component graph of circuits, run before circuits are submitted to a solver """
+
+import numpy as np
+
+#====================================================
+
+# reasons for rejecting a circuit based on its topology
+DISCONNECTED     = 'disconnected'       # circuit or its junction network splits into independent parts
+CAPACITIVE_NODE  = 'capacitive_node'    # node without junction or inductor, i.e. a floating island
+INDUCTOR_LOOP    = 'inductor_loop'      # loop made of inductors only, which carries no junction
+NO_FLUX_LOOP     = 'no_flux_loop'       # flux sweep requested but no loop to thread the flux through
+EXCESS_LOOPS     = 'excess_loops'       # more loops than flux offsets specified in phiOffs_specs
+
+REJECTION_REASONS = [DISCONNECTED, CAPACITIVE_NODE, INDUCTOR_LOOP, NO_FLUX_LOOP, EXCESS_LOOPS]
+
+#====================================================
+
+class UnionFind(object):
+
+	def __init__(self, num_vertices):
+		self.parents = list(range(num_vertices))
+
+	def find(self, vertex):
+		while self.parents[vertex] != vertex:
+			self.parents[vertex] = self.parents[self.parents[vertex]]
+			vertex = self.parents[vertex]
+		return vertex
+
+	def union(self, vertex_0, vertex_1):
+		""" returns False if both vertices were already connected, i.e. the new edge closes a loop """
+		root_0, root_1 = self.find(vertex_0), self.find(vertex_1)
+		if root_0 == root_1:
+			return False
+		self.parents[root_1] = root_0
+		return True
+
+	def get_num_components(self, vertices):
+		return len(set([self.find(vertex) for vertex in vertices]))
+
+#====================================================
+
+def get_edges(array):
+	"""
+		Parameters:
+			array: np.ndarray | flattened upper triangular component matrix of an n-node circuit
+
+		Returns:
+			edges: list | (vertex_0, vertex_1) pairs of all present components, where vertex 0 is the
+			              ground and diagonal entries connect a node to the ground
+	"""
+	if array is None: return []
+	array = np.array(array, dtype = np.float64)
+	num_nodes  = int(np.sqrt(2 * len(array) + 0.25) - 0.5)
+	rows, cols = np.triu_indices(num_nodes)
+	edges = []
+	for row, col, value in zip(rows, cols, array):
+		if value <= 0.: continue
+		if row == col:
+			edges.append((0, row + 1))
+		else:
+			edges.append((row + 1, col + 1))
+	return edges
+
+
+def analyze_topology(circuit_values, flux_sweep = True, max_loops = None):
+	"""
+		Checks the graph of capacitances, junctions and inductances of a circuit for designs which
+		would only produce useless spectra.
+
+		Parameters:
+			circuit_values: dict | capacities, junctions and inductances (may be None) of the circuit
+			flux_sweep: bool     | the solver sweeps an external flux, which requires at least one loop
+			max_loops: int       | number of loops flux offsets are available for (None for no limit)
+
+		Returns:
+			reason: str | rejection reason from REJECTION_REASONS, None if the topology is sound
+	"""
+	num_nodes    = int(np.sqrt(2 * len(circuit_values['capacities']) + 0.25) - 0.5)
+	vertices     = range(num_nodes + 1)
+	c_edges      = get_edges(circuit_values['capacities'])
+	j_edges      = get_edges(circuit_values['junctions'])
+	l_edges      = get_edges(circuit_values.get('inductances', None))
+
+	# all components together need to connect every node to the ground
+	circuit_graph = UnionFind(num_nodes + 1)
+	for edge in c_edges + j_edges + l_edges:
+		circuit_graph.union(*edge)
+	if circuit_graph.get_num_components(vertices) > 1:
+		return DISCONNECTED
+
+	# every node needs a junction or an inductor, otherwise it forms a free island
+	inductive_nodes = set([vertex for edge in j_edges + l_edges for vertex in edge])
+	for node in range(1, num_nodes + 1):
+		if not node in inductive_nodes:
+			return CAPACITIVE_NODE
+
+	# linear loops are closed by inductors alone
+	inductor_graph = UnionFind(num_nodes + 1)
+	for edge in l_edges:
+		if not inductor_graph.union(*edge):
+			return INDUCTOR_LOOP
+
+	# junctions and inductors need to form a single network, isolated parts are only coupled capacitively
+	# independent loops are counted along the way, i.e. edges - vertices + components
+	inductive_graph = UnionFind(num_nodes + 1)
+	num_loops = 0
+	for edge in j_edges + l_edges:
+		if not inductive_graph.union(*edge):
+			num_loops += 1
+	if inductive_graph.get_num_components(inductive_nodes) > 1:
+		return DISCONNECTED
+	if flux_sweep and num_loops == 0:
+		return NO_FLUX_LOOP
+	if max_loops is not None and num_loops > max_loops:
+		return EXCESS_LOOPS
+	return None
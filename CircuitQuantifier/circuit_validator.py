@@ -2,12 +2,13 @@
 
 #====================================================
 
-import copy
 import threading
 import numpy as np 
 import time
 
-from Utilities.decorators import thread
+from CircuitQuantifier.circuit_topology import analyze_topology, REJECTION_REASONS
+from Designers.design_utils             import get_canonical_key, get_exact_key, LABEL_INVARIANT_SOLVERS
+from Utilities.events                   import NOTIFIER
 
 #====================================================
 
@@ -15,39 +16,140 @@ class CircuitValidator(object):
 
 	VALIDATED_CIRCUITS = []
 
-	def __init__(self):
-		pass
+	# solvers which always sweep the external flux
+	FLUX_SWEEP_SOLVERS = ['JJcircuitSimV3']
+
+	def __init__(self, circuit_params = None, general_params = None):
+		self.circuit_params = circuit_params
+		self.general_params = general_params
+
+		# topology checks need to know whether a loop is required and how many loops can be biased
+		self.flux_sweep = True
+		self.max_loops  = None
+		if general_params is not None:
+			self.flux_sweep = general_params['solver'] in self.FLUX_SWEEP_SOLVERS or np.ndim(general_params.get('phiExt', None)) > 0
+		if circuit_params is not None and circuit_params.get('phiOffs_specs', None) is not None:
+			self.max_loops  = circuit_params['phiOffs_specs']['dimension']
+		self.rejections     = {reason: 0 for reason in REJECTION_REASONS}
+
+		# canonical forms of all circuits seen so far, used to drop node relabelings of known circuits;
+		# for solvers which depend on the labeling only identical circuits are dropped
+		self.label_invariant = general_params is not None and general_params['solver'] in LABEL_INVARIANT_SOLVERS
+		self.seen_circuits  = set()
+		self.seen_lock      = threading.Lock()
+		self.num_duplicates = 0
+		self.validated_lock = threading.Lock()
+
+
+	def is_duplicate(self, circuit):
+		# optimizers wait for the evaluation of each proposed circuit, their circuits are never dropped
+		if 'sim_id' in circuit['circuit_values']: return False
+		if self.label_invariant:
+			key = get_canonical_key(circuit['circuit_values'])
+		else:
+			key = get_exact_key(circuit['circuit_values'])
+		with self.seen_lock:
+			if key in self.seen_circuits:
+				self.num_duplicates += 1
+				return True
+			self.seen_circuits.add(key)
+		return False
+
+
+	def has_sound_topology(self, circuit):
+		# circuits of optimizers are evaluated regardless, the optimizer waits for their losses
+		if 'sim_id' in circuit['circuit_values']: return True
+		reason = analyze_topology(circuit['circuit_values'], flux_sweep = self.flux_sweep, max_loops = self.max_loops)
+		if reason is None: return True
+		circuit['rejection'] = reason
+		with self.seen_lock:
+			self.rejections[reason] += 1
+		return False
+
+
+	def get_statistics(self):
+		"""
+			Returns:
+				statistics: dict | number of circuits rejected for each topology reason and as duplicates,
+				                   i.e. the number of solver runs saved by the validator
+		"""
+		with self.seen_lock:
+			statistics = dict(self.rejections)
+			statistics['duplicates'] = self.num_duplicates
+		statistics['saved_simulations'] = sum(statistics.values())
+		return statistics
+
+
+	@staticmethod
+	def get_capacitance_matrices(capacities):
+		"""
+			Parameters:
+				capacities: np.ndarray | (batch, n(n+1)/2) flattened upper triangular capacitance arrays
+
+			Returns:
+				c_mats: np.ndarray | (batch, n, n) capacitance matrices of the circuits
+		"""
+		capacities = np.atleast_2d(np.array(capacities, dtype = np.float64))
+		k = capacities.shape[1]
+		n = int(np.sqrt(2 * k + 0.25) - 0.5)
 
+		c_mat_mf = np.zeros((len(capacities), n, n))
+		c_mat_mf[:, np.triu_indices(n, k = 0)[0], np.triu_indices(n, k = 0)[1]] = capacities
+		c_mat_mf = np.maximum(c_mat_mf, np.transpose(c_mat_mf, (0, 2, 1)))
 
-	@thread
-	def run_validation(self, circuit):
-		start = time.time()
+		diagonal = np.arange(n)
+		c_mats   = - c_mat_mf
+		c_mats[:, diagonal, diagonal] += np.sum(c_mat_mf, axis = 1) + c_mat_mf[:, diagonal, diagonal]
+		return c_mats
 
-		capacities = circuit['circuit_values']['capacities']
 
-		k = len(capacities)
-		n = int(np.sqrt(2 * k + 0.25) - 0.5)
+	def check_capacitances(self, capacities):
+		"""
+			Parameters:
+				capacities: np.ndarray | (batch, n(n+1)/2) flattened upper triangular capacitance arrays
 
-		c_mat_mf = np.zeros((n, n))
-		c_mat_mf[np.triu_indices(n, k = 0)] = capacities
-		c_mat_mf = np.maximum(c_mat_mf, c_mat_mf.transpose())
+			Returns:
+				is_invertible: np.ndarray | (batch,) boolean array, True for non-singular capacitance matrices
+		"""
+		determinants = np.abs(np.linalg.det(self.get_capacitance_matrices(capacities)))
+		return determinants > 10**-6
 
-		c_mat_modified  = np.diag(np.sum(c_mat_mf, axis = 0))
-		c_mat_modified += np.diag(np.diag(c_mat_mf)) - c_mat_mf
 
-		determinant = np.abs(np.linalg.det(c_mat_modified))
-		if determinant > 10**-6:
-			circuit['is_valid'] = True
-		else:
-			circuit['is_valid'] = False
+	def validate_batch(self, circuits):
+		"""
+			Validates circuits on the calling thread. Circuits are grouped by their number of nodes and
+			the capacitance matrices of each group are checked with a single batched determinant.
+
+			Parameters:
+				circuits: list | circuit dictionaries with 'circuit_values'
+
+			Returns:
+				is_valid: np.ndarray | (len(circuits),) boolean array, also stored as 'is_valid' in each circuit
+		"""
+		is_valid = np.zeros(len(circuits), dtype = bool)
+		groups   = {}
+		for circuit_index, circuit in enumerate(circuits):
+			num_entries = len(circuit['circuit_values']['capacities'])
+			groups.setdefault(num_entries, []).append(circuit_index)
+		for num_entries, circuit_indices in groups.items():
+			capacities = np.array([circuits[circuit_index]['circuit_values']['capacities'] for circuit_index in circuit_indices])
+			is_valid[circuit_indices] = self.check_capacitances(capacities)
 
-		self.VALIDATED_CIRCUITS.append(circuit)
+		# duplicates are checked in submission order, the first proposal of a circuit is kept
+		for circuit_index, circuit in enumerate(circuits):
+			if is_valid[circuit_index]:
+				is_valid[circuit_index] = self.has_sound_topology(circuit) and not self.is_duplicate(circuit)
+			circuit['is_valid'] = bool(is_valid[circuit_index])
+		return is_valid
 
 
 	def validate_circuits(self, circuits):
 		start = time.time()
-		for circuit in circuits:
-			self.run_validation(circuit)
+		if len(circuits) > 0:
+			self.validate_batch(circuits)
+			with self.validated_lock:
+				self.VALIDATED_CIRCUITS.extend(circuits)
+			NOTIFIER.notify('validator')
 		end = time.time()
 		content = open('TIME_validations', 'a')
 		content.write('%.5f\t%d\n' % (end - start, len(circuits)))
@@ -55,7 +157,8 @@ class CircuitValidator(object):
 
 
 	def get_validated_circuits(self):
-		validated_circuits = copy.deepcopy(self.VALIDATED_CIRCUITS)
-		for circuit in validated_circuits:
-			self.VALIDATED_CIRCUITS.pop(0)
+		# circuits are handed over rather than copied, the validator keeps no reference to them
+		with self.validated_lock:
+			validated_circuits = self.VALIDATED_CIRCUITS[:]
+			del self.VALIDATED_CIRCUITS[:]
 		return validated_circuits
@@ -54,6 +54,39 @@ def check_circuit_doublewell(circuit):
 	return check
 
 
+def _double_well_gradient(circuit, hpeak, hsplit, merit_options):
+	"""
+		Gradient of the double-well loss (without flux sensitivity) with respect to the circuit
+		parameters, computed from eigenvalue derivatives if the solver provided them. Clipped
+		contributions and the minima are treated as locally constant (subgradient).
+
+		Output
+		gradient: array or None
+	"""
+	if not 'eigen_gradients' in circuit['measurements']:
+		return None
+
+	max_peak  = merit_options['max_peak']
+	max_split = merit_options['max_split']
+	norm_p    = merit_options['norm_p']
+
+	spectrum   = np.array(circuit['measurements']['eigen_spectrum']).T
+	eigengrads = np.array(circuit['measurements']['eigen_gradients'])
+	gradsGS, gradsES = eigengrads[:,0], eigengrads[:,1]
+
+	# Derivatives of center peak height and level separation
+	idx_mid   = int(len(spectrum[0])/2)
+	idx_min   = np.argmin(spectrum[0])
+	idx_split = np.argmin(spectrum[1] - spectrum[0])
+	dhpeak  = (gradsGS[idx_mid] - gradsGS[idx_min]) * float(hpeak < max_peak)
+	dhsplit = (gradsES[idx_split] - gradsGS[idx_split]) * float(hsplit < max_split)
+
+	# Chain rule through the p-norm
+	norm = ( (hpeak/max_peak)**norm_p + (hsplit/max_split)**norm_p )**(1/norm_p - 1)
+	gradient = - norm * ( (hpeak/max_peak)**(norm_p-1) * dhpeak/max_peak + (hsplit/max_split)**(norm_p-1) * dhsplit/max_split )
+	return gradient
+
+
 def merit_DoubleWell(circuit, merit_options, **kwargs):
 
 	print('# Calculating double-well merit ...')
@@ -65,6 +98,8 @@ def merit_DoubleWell(circuit, merit_options, **kwargs):
 	flux_sens_bool = merit_options['flux_sens']
 	max_merit      = merit_options['max_merit']
 
+	gradient = None
+
 	# Check if circuit is valid and has double well
 	if check_circuit_doublewell(circuit):
 
@@ -137,6 +172,7 @@ def merit_DoubleWell(circuit, merit_options, **kwargs):
 		# Combined loss
 		if hsens == None:
 			loss = max_merit - ( (hpeak/max_peak)**norm_p + (hsplit/max_split)**norm_p )**(1/norm_p)
+			gradient = _double_well_gradient(circuit, hpeak, hsplit, merit_options)
 		else:
 			# print('A:', (hpeak/max_peak))
 			# print('B:', (hsplit/max_split))
@@ -146,10 +182,14 @@ def merit_DoubleWell(circuit, merit_options, **kwargs):
 
 	else:
 		loss = max_merit
+		if 'eigen_gradients' in circuit['measurements']:
+			gradient = np.zeros(np.shape(circuit['measurements']['eigen_gradients'])[-1])
 
 	print('# LOSS: {} ...'.format(loss))
 	
 	merit_dict = {'loss': loss, 'extra_tasks': []}
+	if gradient is not None:
+		merit_dict['gradient'] = gradient
 
 	return merit_dict
 
@@ -13,6 +13,13 @@ def merit_TargetSpectrum(circuit, merit_options, circuit_params = {}):
 	loss_flux = np.mean((spectrum[:,1:3]-targetspec[:,1:3])**2)
 	loss = loss_flux
 
+	# Gradient with respect to [capacities, junctions] if the solver provided eigenvalue derivatives
+	gradient = None
+	if 'eigen_gradients' in circuit['measurements']:
+		eigengrads = np.array(circuit['measurements']['eigen_gradients'])
+		residuals  = spectrum[:,1:3]-targetspec[:,1:3]
+		gradient   = 2 * np.einsum('mk,mkp->p', residuals, eigengrads[:,1:3]) / residuals.size
+
 	# Symmetry enforcement for 2-node circuits without linear inductances
 	if merit_options['include_symmetry']:
 		Carr_norm = (circuit['circuit']['circuit_values']['capacities'] - circuit_params['c_specs']['low']) / circuit_params['c_specs']['high']
@@ -21,12 +28,21 @@ def merit_TargetSpectrum(circuit, merit_options, circuit_params = {}):
 		if len(Carr_norm) == 3 and Larr == None:
 			loss_symmetry = np.abs(Carr_norm[0] - Carr_norm[2]) + np.abs(Jarr_norm[0] - Jarr_norm[2])
 			loss += 100 * loss_symmetry
+			if gradient is not None:
+				c_sign = np.sign(Carr_norm[0] - Carr_norm[2]) / circuit_params['c_specs']['high']
+				j_sign = np.sign(Jarr_norm[0] - Jarr_norm[2]) / circuit_params['j_specs']['high']
+				gradient[[0, 2]] += 100 * c_sign * np.array([1., -1.])
+				gradient[[3, 5]] += 100 * j_sign * np.array([1., -1.])
 		else:
 			raise NotImplementedError("Symmetry loss only implemented for 2-node circuits without linear inductances")
 
 	# Apply squashing function
+	if gradient is not None:
+		gradient = gradient / (loss * np.log(10))
 	loss = np.log10(loss)
 	
 	merit_dict = {'loss': loss, 'extra_tasks': []}
+	if gradient is not None:
+		merit_dict['gradient'] = gradient
 
 	return merit_dict
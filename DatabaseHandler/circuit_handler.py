@@ -17,6 +17,10 @@ class CircuitHandler(DB_Werkzeug):
 					 'is_valid':         'bool',
 					 'context_circuits': 'pickle'}
 
+	# circuit ids are generated as uuids, hence unique
+	DB_INDEXES = [{'columns': ['circuit_id'], 'unique': True},
+				  {'columns': ['circuit_status'], 'unique': False}]
+
 	NEW_CIRCUITS       = {}
 	VALIDATED_CIRCUITS = {}
 	ALL_CIRCUITS       = {}
@@ -24,7 +28,7 @@ class CircuitHandler(DB_Werkzeug):
 	def __init__(self, db_settings):
 
 		DB_Werkzeug.__init__(self)
-		self.create_database(db_settings, self.DB_ATTRIBUTES)
+		self.create_database(db_settings, self.DB_ATTRIBUTES, self.DB_INDEXES)
 
 
 	def add_new_circuits(self, info_dicts):
@@ -54,14 +58,17 @@ class CircuitHandler(DB_Werkzeug):
 
 
 	def reserve_circuits(self, info_dicts):
-		conditions, updates = [], []
+		# circuits which are no longer validated (e.g. reserved by another task set) are skipped
+		conditions, updates, reserved = [], [], []
 		for index, info_dict in enumerate(info_dicts):
+			if self.VALIDATED_CIRCUITS.pop(info_dict['circuit_id'], None) is None: continue
 			condition = {'circuit_id':     info_dict['circuit_id']}
 			update    = {'circuit_status': 'processing'}
 			conditions.append(condition)
 			updates.append(update)
-			del self.VALIDATED_CIRCUITS[info_dict['circuit_id']]
+			reserved.append(info_dict)
 		self.db_update_all(conditions, updates)
+		return reserved
 
 
 	def release_circuits(self, info_dicts):
@@ -88,7 +95,7 @@ class CircuitHandler(DB_Werkzeug):
 		for circuit in circuits:
 			condition = {'circuit_id': circuit['circuit_id']}
 			update    = {'is_valid': circuit['is_valid'],
-						 'circuit_status': 'validated'}
+						 'circuit_status': 'validated' if circuit['is_valid'] else 'invalid'}
 			conditions.append(condition)
 			updates.append(update)
 
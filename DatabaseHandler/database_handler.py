@@ -58,11 +58,11 @@ class DatabaseHandler(object):
 	def task_set_completed(self, task_set_id):
 		return self.task_handler.task_set_completed(task_set_id)
 
-	def report_circuit_submission(self):
-		self.task_handler.report_circuit_submission()
+	def report_circuit_submission(self, task_set_id):
+		self.task_handler.report_circuit_submission(task_set_id)
 
-	def report_circuit_computation(self):
-		self.task_handler.report_circuit_computation()
+	def report_circuit_computation(self, task_set_id):
+		self.task_handler.report_circuit_computation(task_set_id)
 
 	def set_tasks_to_submitted(self, tasks):
 		self.task_handler.set_tasks_to_submitted(tasks)
@@ -106,7 +106,7 @@ class DatabaseHandler(object):
 		return circuits
 
 	def reserve_circuits(self, circuit_dicts):
-		self.circuit_handler.reserve_circuits(circuit_dicts)
+		return self.circuit_handler.reserve_circuits(circuit_dicts)
 
 	def release_circuits(self, circuit_dicts):
 		self.circuit_handler.release_circuits(circuit_dicts)
@@ -117,11 +117,8 @@ class DatabaseHandler(object):
 	#====================================================================
 
 	def store_validated_circuits(self, circuits):
-		valid_circuits = []
-		for circuit in circuits:
-			if circuit['is_valid']:
-				valid_circuits.append(circuit)
-		self.circuit_handler.store_validated_circuits(valid_circuits)
+		# invalid circuits are passed on as well, such that they are removed from the new circuits
+		self.circuit_handler.store_validated_circuits(circuits)
 
 	def __OLD__store_validated_circuits(self, circuits):
 		self.circuit_handler.store_validated_circuits(circuits)
@@ -221,7 +218,7 @@ class DatabaseHandler(object):
 
 	def get_task_set_progress_info(self, task_set, run_time):
 		
-		counter       = self.task_handler.COUNTER
+		counter       = self.task_handler.get_counter(task_set.task_set_id)
 		statuses      = range(counter['statuses'])
 		num_new       = counter['new']
 		num_submitted = counter['submitted']
@@ -244,7 +241,6 @@ class DatabaseHandler(object):
 		for index in range( NUM_CHAR - len(progress_string)):
 			progress_string += '.'
 
-		counter = self.task_handler.COUNTER
 		print(len(statuses), num_new, num_submitted, num_computed, num_completed, \
 			  '(#statuses, #new, #submitted, #computed, #completed)')
 
@@ -496,8 +492,9 @@ class DatabaseHandler(object):
 			if limiting < 20:
 				break
 			else:
+				# pending requests are drained in one transaction per batch, short waits suffice
 				print('## WAITING ##', num_updates, num_writes, num_reads)
-				time.sleep(1.0)
+				time.sleep(0.05)
 	
 
 	def print_pending_updates(self, iteration, db = 'master'):
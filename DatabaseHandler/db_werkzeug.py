@@ -14,14 +14,15 @@ class DB_Werkzeug(object):
 		pass
 
 
-	def create_database(self, db_settings, db_attributes):
+	def create_database(self, db_settings, db_attributes, db_indexes = []):
 	
 		self.db_settings   = db_settings
 		self.db_attributes = db_attributes
+		self.db_indexes    = db_indexes
 		if db_settings.db_type == 'sqlite':
 			from DatabaseHandler import SQLiteDatabase
 			try:
-				self.database = SQLiteDatabase(db_settings.db_path, db_attributes, db_settings.db_name)	
+				self.database = SQLiteDatabase(db_settings.db_path, db_attributes, db_settings.db_name, indexes = db_indexes)	
 			except OSError:
 				print('path to database %s does not exist:\n\t%s' % (db_settings.db_name, db_settings.db_path))
 		else:
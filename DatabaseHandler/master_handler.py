@@ -18,27 +18,74 @@ class MasterHandler(DB_Werkzeug):
 					 'execution_index': 'integer',
 					 'interest_score': 'string'}
 
+	DB_INDEXES = [{'columns': ['task_id', 'primer_index', 'execution_index'], 'unique': False},
+				  {'columns': ['circuit_id'],  'unique': False},
+				  {'columns': ['merit_id'],    'unique': False},
+				  {'columns': ['task_set_id'], 'unique': False}]
+
 	LINKED_LOSSES_AND_CIRCUITS = {}
 
+	# columns with hash indexes {value: set of row indices}
+	INDEXED_KEYS = ['task_id', 'circuit_id', 'merit_id', 'task_set_id']
+
 	def __init__(self, db_settings):
 
 		DB_Werkzeug.__init__(self)
 		self.MASTER_DICT = {key: [] for key in self.DB_ATTRIBUTES}
+		self.INDEXES     = {key: {} for key in self.INDEXED_KEYS}
 		self.num_dict_entries = 0
-		self.create_database(db_settings, self.DB_ATTRIBUTES)
+		self.create_database(db_settings, self.DB_ATTRIBUTES, self.DB_INDEXES)
 		self.dict_busy = False
 
 
+	def _index_add(self, key, value, row):
+		try:
+			self.INDEXES[key].setdefault(value, set()).add(row)
+		except TypeError:
+			# unhashable values are not indexed, lookups for them fall back to scanning
+			pass
+
+
+	def _index_remove(self, key, value, row):
+		try:
+			rows = self.INDEXES[key].get(value)
+		except TypeError:
+			return
+		if rows is None: return
+		rows.discard(row)
+		if len(rows) == 0:
+			del self.INDEXES[key][value]
+
+
+	def _candidate_rows(self, condition, multi_valued = False):
+		# narrows down the rows which can satisfy the condition using the hash indexes; None if no index applies
+		candidates = None
+		for cond_key, cond_value in condition.items():
+			if not cond_key in self.INDEXES: continue
+			values = cond_value if multi_valued else [cond_value]
+			rows   = set()
+			try:
+				for value in values:
+					rows.update(self.INDEXES[cond_key].get(value, ()))
+			except TypeError:
+				continue
+			candidates = rows if candidates is None else candidates & rows
+		return candidates
+
+
 	def dict_add(self, info_dicts):
 		self.dict_busy = True
 		if not isinstance(info_dicts, list):
 			info_dicts = [info_dicts]
 		for info_dict in info_dicts:
+			row = self.num_dict_entries
 			for key in self.DB_ATTRIBUTES:
 				if key in info_dict: 
 					self.MASTER_DICT[key].append(info_dict[key])
 				else:
 					self.MASTER_DICT[key].append(None)
+			for key in self.INDEXED_KEYS:
+				self._index_add(key, self.MASTER_DICT[key][row], row)
 			self.num_dict_entries += 1
 		self.dict_busy = False
 
@@ -50,14 +97,20 @@ class MasterHandler(DB_Werkzeug):
 			conditions = [conditions]
 			updates    = [updates]
 
-		for index in range(self.num_dict_entries):
-			for condition_index, condition in enumerate(conditions):
-				update = updates[condition_index]
+		for condition_index, condition in enumerate(conditions):
+			update = updates[condition_index]
+			rows   = self._candidate_rows(condition)
+			if rows is None:
+				rows = range(self.num_dict_entries)
+			for index in sorted(rows):
 				for cond_key, cond_value in condition.items():
 					if self.MASTER_DICT[cond_key][index] != cond_value:
 						break
 				else:
 					for up_key, up_value in update.items():
+						if up_key in self.INDEXES:
+							self._index_remove(up_key, self.MASTER_DICT[up_key][index], index)
+							self._index_add(up_key, up_value, index)
 						self.MASTER_DICT[up_key][index] = up_value
 		self.dict_busy = False
 
@@ -66,7 +119,10 @@ class MasterHandler(DB_Werkzeug):
 		# attempt a recovery from the dictionary
 		self.dict_busy = True
 		return_dicts   = []
-		for entry_index in range(self.num_dict_entries):
+		rows = self._candidate_rows(condition, multi_valued = True)
+		if rows is None:
+			rows = range(self.num_dict_entries)
+		for entry_index in sorted(rows):
 			
 			if len(condition) == 0:
 				return_dict = {key: self.MASTER_DICT[key][entry_index] for key in self.DB_ATTRIBUTES}
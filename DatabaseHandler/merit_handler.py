@@ -15,11 +15,13 @@ class MeritHandler(DB_Werkzeug):
 			 'merit_value':  'pickle',
 			 'measurements': 'pickle',}
 
+	DB_INDEXES = [{'columns': ['merit_id'], 'unique': True}]
+
 	ALL_MERITS    = {}
 
 	def __init__(self, db_settings):
 		DB_Werkzeug.__init__(self)
-		self.create_database(db_settings, self.DB_ATTRIBUTES)
+		self.create_database(db_settings, self.DB_ATTRIBUTES, self.DB_INDEXES)
 
 
 	def add_losses_for_invalid_circuits(self, n_iter = 1):
@@ -48,9 +50,12 @@ class MeritHandler(DB_Werkzeug):
 		info_dicts = []
 		for circuit in circuits:
 			merit_id = str(uuid.uuid4())
-			info_dict = {'merit_id': merit_id, 'merit_value': {'loss': circuit['loss']}, 'measurements': circuit['measurements']}
+			merit_value = {'loss': circuit['loss']}
+			if 'gradient' in circuit:
+				merit_value['gradient'] = circuit['gradient']
+			info_dict = {'merit_id': merit_id, 'merit_value': merit_value, 'measurements': circuit['measurements']}
 			info_dicts.append(info_dict)
-			self.ALL_MERITS[merit_id] = {'merit_id': merit_id, 'merit_value': {'loss': circuit['loss']}, 'measurements': circuit['measurements']}
+			self.ALL_MERITS[merit_id] = {'merit_id': merit_id, 'merit_value': merit_value, 'measurements': circuit['measurements']}
 		self.db_add(info_dicts)
 		return info_dicts
 
@@ -5,12 +5,18 @@ __author__ = 'Florian Hase'
 #========================================================================
 
 import os
+import sys
 import uuid
 import time
 import copy
+import itertools
+import threading
 import sqlalchemy as sql
 
+from collections import OrderedDict
+
 from DatabaseHandler  import AddEntry, FetchEntries, UpdateEntries
+from DatabaseHandler.sqlite_operations import build_update_statement, get_update_parameters, get_update_signature
 from Utilities.decorators import thread
 
 #========================================================================
@@ -23,11 +29,21 @@ class SQLiteDatabase(object):
 					  'pickle':  sql.PickleType(),
 					  'string':  sql.String(512),}
 
-	def __init__(self, path, attributes, name = 'table', verbosity = 0):
+	# time to wait before retrying a batch when the database file is locked, and number of retries;
+	# each attempt already waits for the busy timeout of the driver (5 s)
+	RETRY_INTERVAL = 0.1
+	MAX_RETRIES    = 20
+
+	# maximum number of values in a single IN clause (SQLite limits the number of bound parameters)
+	IN_CHUNK_SIZE  = 500
+
+	def __init__(self, path, attributes, name = 'table', verbosity = 0, indexes = []):
 
 		self.WRITING_REQUESTS = []
 		self.READING_REQUESTS = {}
 		self.UPDATE_REQUESTS  = []
+		# (request, error) of writes and updates which could not be executed
+		self.FAILED_REQUESTS  = []
 
 		self.db_path              = 'sqlite:///%s' % path
 		self.attributes           = attributes
@@ -38,9 +54,10 @@ class SQLiteDatabase(object):
 		if not os.path.isdir(dir_name):
 			os.makedirs(dir_name)	
 
-		# create database 
-		self.db       = sql.create_engine(self.db_path)
+		# create database; the connection is shared by request processor threads, access is serialized by the lock
+		self.db       = sql.create_engine(self.db_path, connect_args = {'check_same_thread': False})
 		self.db.echo  = False		
+		sql.event.listen(self.db, 'connect', self._set_pragmas)
 		self.metadata = sql.MetaData(self.db)
 
 		# create table in database
@@ -48,10 +65,41 @@ class SQLiteDatabase(object):
 		for name, att_type in self.attributes.items():
 			self.table.append_column(sql.Column(name, self.SQLITE_COLUMNS[att_type]))
 		self.table.create(checkfirst = True)
+		self._create_indexes(indexes)
+
+		self.connection        = self.db.connect()
+		self.connection_lock   = threading.Lock()
+		self.sequence          = itertools.count()
+		self.update_statements = {}
 
 		# start request processor
+		self._processing_requests = False
 		self._process_requests()
 
+
+	def _create_indexes(self, indexes):
+		# IF NOT EXISTS also adds the indexes to databases created by earlier versions
+		for index in indexes:
+			columns = index['columns']
+			name    = 'ix_%s_%s' % (self.name, '_'.join(columns))
+			columns = ', '.join('"%s"' % column for column in columns)
+			try:
+				if index['unique']:
+					self.db.execute('CREATE UNIQUE INDEX IF NOT EXISTS "%s" ON "%s" (%s)' % (name, self.name, columns))
+					continue
+			except sql.exc.IntegrityError:
+				print('WARNING: found duplicate entries in %s; creating non-unique index %s' % (self.name, name))
+			self.db.execute('CREATE INDEX IF NOT EXISTS "%s" ON "%s" (%s)' % (name, self.name, columns))
+
+
+	@staticmethod
+	def _set_pragmas(dbapi_connection, connection_record):
+		# write-ahead logging: commits append to the log instead of rewriting pages, readers do not block writers
+		cursor = dbapi_connection.cursor()
+		cursor.execute('PRAGMA journal_mode=WAL')
+		cursor.execute('PRAGMA synchronous=NORMAL')
+		cursor.close()
+
 	#====================================================================
 
 	def _return_dict(function):
@@ -63,79 +111,125 @@ class SQLiteDatabase(object):
 
 	#====================================================================
 
+	def _drain_requests(self):
+		# collect all pending requests in the order in which they were issued
+		requests = []
+		for update_index in range(len(self.UPDATE_REQUESTS)):
+			requests.append(self.UPDATE_REQUESTS.pop(0))
+		for writing_index in range(len(self.WRITING_REQUESTS)):
+			requests.append(self.WRITING_REQUESTS.pop(0))
+		for request_key in list(self.READING_REQUESTS.keys()):
+			reading_request = self.READING_REQUESTS[request_key]
+			if not reading_request.executed:
+				requests.append(reading_request)
+		return sorted(requests, key = lambda request: request.sequence)
+
+
+	def _group_operations(self, requests):
+		# consecutive operations of the same kind and signature are merged into one executemany
+		groups = []
+		for request in requests:
+			if isinstance(request, FetchEntries):
+				groups.append(['read', None, [request]])
+				continue
+			if isinstance(request, AddEntry):
+				operations = [('insert', None, {key: entry.get(key) for key in self.attributes}) for entry in request.get_entries()]
+			else:
+				operations = [('update', get_update_signature(condition, update), get_update_parameters(condition, update)) for condition, update in request.get_pairs()]
+			for kind, signature, parameters in operations:
+				if len(groups) > 0 and groups[-1][0] == kind and groups[-1][1] == signature:
+					groups[-1][2].append(parameters)
+				else:
+					groups.append([kind, signature, [parameters]])
+		return groups
+
+
+	def _get_update_statement(self, signature):
+		if not signature in self.update_statements:
+			self.update_statements[signature] = build_update_statement(self.table, *signature)
+		return self.update_statements[signature]
+
+
+	def _execute_batch(self, requests):
+		groups = self._group_operations(requests)
+		for attempt in range(self.MAX_RETRIES + 1):
+			try:
+				# all updates and inserts of the batch are committed in a single transaction
+				with self.connection.begin():
+					for kind, signature, elements in groups:
+						if kind == 'read':
+							elements[0].execute(self.connection)
+						elif kind == 'insert':
+							self.connection.execute(self.table.insert(), elements)
+						else:
+							self.connection.execute(self._get_update_statement(signature), elements)
+				break
+			except sql.exc.OperationalError as error:
+				# only locks held by other connections go away by waiting
+				if not self._is_lock_error(error) or attempt == self.MAX_RETRIES:
+					raise
+				time.sleep(self.RETRY_INTERVAL)
+
+
+	@staticmethod
+	def _is_lock_error(error):
+		message = str(getattr(error, 'orig', error)).lower()
+		return isinstance(error, sql.exc.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+	def _fail_request(self, request, error):
+		if isinstance(request, FetchEntries):
+			request.fail(error)
+			return
+		self.FAILED_REQUESTS.append((request, error))
+		sys.stderr.write('# ERROR | ... %s request on table %s failed: %s ...\n' % (type(request).__name__, self.name, str(error)))
+
+
+	def _execute_requests(self, requests):
+		try:
+			self._execute_batch(requests)
+			return
+		except sql.exc.SQLAlchemyError as error:
+			batch_error = error
+
+		# the transaction of the batch was rolled back; a database which stays locked fails all requests,
+		# otherwise the requests are executed one by one such that only the failing ones are lost
+		if self._is_lock_error(batch_error) or len(requests) == 1:
+			for request in requests:
+				self._fail_request(request, batch_error)
+			return
+		for request in requests:
+			try:
+				self._execute_batch([request])
+			except sql.exc.SQLAlchemyError as error:
+				self._fail_request(request, error)
+
+
 	@thread
 	def _process_requests(self):
 		self._processing_requests = True
 		keep_processing           = True
-		iteration_index           = 0
-		while keep_processing:
-			num_reading_requests = len(self.READING_REQUESTS)
-			num_writing_requests = len(self.WRITING_REQUESTS)
-			num_update_requests  = len(self.UPDATE_REQUESTS)
-
-			iteration_index += 1
-
-			# run all reading request
-			request_keys = copy.deepcopy(list(self.READING_REQUESTS.keys()))
-			for request_key in request_keys:
-				if not self.READING_REQUESTS[request_key].executed:
-					self.READING_REQUESTS[request_key].execute()
-				
-			# run all update requests
-			with self.db.connect() as conn:
-
-				# run all update requests
-				for update_index in range(num_update_requests):
-					update_request = self.UPDATE_REQUESTS.pop(0)
-					if isinstance(update_request.updates, list):
-						for update in update_request.updates:
-							has_updated = False
-							while not has_updated:
-								try:
-									updated = conn.execute(update)
-									has_updated = True
-								except sql.exc.OperationalError:
-									time.sleep(0.1)
-									updated = conn.execute(update)
-					else:
-						has_updated = False
-						while not has_updated:
-							try:
-								updated = conn.execute(update_request.updates)
-								has_updated = True
-							except sql.exc.OperationalError:
-								time.sleep(0.1)
-								updated = conn.execute(update_request.updates)				
-
-				# run all writing requests
-				master_entry = []
-				for writing_index in range(num_writing_requests):
-					writing_request = self.WRITING_REQUESTS.pop(0)
-					if isinstance(writing_request.entry, list):
-						master_entry.extend(writing_request.entry)
-					else:
-						master_entry.append(writing_request.entry)
-				has_updated = False
-				while not has_updated:
-					try:
-						conn.execute(self.table.insert(), master_entry)
-						has_updated = True
-					except sql.exc.OperationalError:
-						time.sleep(0.1)
-
-				conn.close()
-
-			# clean reading requests
-			request_keys = copy.deepcopy(list(self.READING_REQUESTS.keys()))
-			delete_keys  = []
-			for request_key in request_keys:
-				if self.READING_REQUESTS[request_key].entries_fetched:
-					delete_keys.append(request_key)
-			for request_key in delete_keys:
-				del self.READING_REQUESTS[request_key]
-
-			keep_processing = len(self.WRITING_REQUESTS) > 0 or len(self.UPDATE_REQUESTS) > 0 or len(self.READING_REQUESTS) > 0
-		self._processing_requests = False
+		# unexpected errors are raised, later requests start a new processing thread
+		try:
+			while keep_processing:
+
+				with self.connection_lock:
+					requests = self._drain_requests()
+					if len(requests) > 0:
+						self._execute_requests(requests)
+
+				# clean reading requests
+				request_keys = copy.deepcopy(list(self.READING_REQUESTS.keys()))
+				delete_keys  = []
+				for request_key in request_keys:
+					if self.READING_REQUESTS[request_key].entries_fetched:
+						delete_keys.append(request_key)
+				for request_key in delete_keys:
+					del self.READING_REQUESTS[request_key]
+
+				keep_processing = len(self.WRITING_REQUESTS) > 0 or len(self.UPDATE_REQUESTS) > 0 or len(self.READING_REQUESTS) > 0
+		finally:
+			self._processing_requests = False
 
 	#====================================================================
 
@@ -143,7 +237,7 @@ class SQLiteDatabase(object):
 	def add(self, info_dict):
 		if len(info_dict) == 0: return None
 		
-		add_entry = AddEntry(self.db, self.table, info_dict)
+		add_entry = AddEntry(self.db, self.table, info_dict, sequence = next(self.sequence))
 		self.WRITING_REQUESTS.append(add_entry)
 		if not self._processing_requests:
 			self._process_requests()
@@ -154,20 +248,32 @@ class SQLiteDatabase(object):
 		condition_keys   = list(condition_dict.keys())
 		condition_values = list(condition_dict.values())
 
-		# define the selection
-		selection = sql.select([self.table])
+		# list conditions are split into chunks of IN clauses, one selection per combination of chunks
+		chunked_values = []
 		for index, key in enumerate(condition_keys):
 			if isinstance(condition_values[index], list):
-				# with a list, we need to combine all possibilities with _or
 				if len(condition_values[index]) == 0:
 					return []
-				filters   = [getattr(self.table.c, key) == value for value in condition_values[index]]
-				condition = sql.or_(*filters)
+				values = list(OrderedDict.fromkeys(condition_values[index]))
+				chunked_values.append([values[start : start + self.IN_CHUNK_SIZE] for start in range(0, len(values), self.IN_CHUNK_SIZE)])
 			else:
-				condition = getattr(self.table.c, key) == condition_values[index]
-			selection = selection.where(condition)
+				chunked_values.append([condition_values[index]])
 
-		fetch_entries = FetchEntries(self.db, self.table, selection, name = self.name)
+		selections = []
+		for values in itertools.product(*chunked_values):
+			selection = sql.select([self.table])
+			for index, key in enumerate(condition_keys):
+				column = getattr(self.table.c, key)
+				if isinstance(condition_values[index], list):
+					condition = column.in_([value for value in values[index] if value is not None])
+					if None in values[index]:
+						condition = sql.or_(condition, column.is_(None))
+				else:
+					condition = column == values[index]
+				selection = selection.where(condition)
+			selections.append(selection)
+
+		fetch_entries = FetchEntries(self.db, self.table, selections, name = self.name, sequence = next(self.sequence))
 		fetch_keys    = str(uuid.uuid4())
 		self.READING_REQUESTS[fetch_keys] = fetch_entries
 		if not self._processing_requests:
@@ -178,38 +284,8 @@ class SQLiteDatabase(object):
 
 
 	def update_all(self, condition_dict, update_dict):
-
-		if isinstance(condition_dict, list):
-
-			updates = []
-			for cond_dict_index, cond_dict in enumerate(condition_dict):
-
-				up_dict = update_dict[cond_dict_index]
-				condition_keys   = list(cond_dict.keys())
-				condition_values = list(cond_dict.values())
-
-				update = sql.update(self.table).values(up_dict)
-				for index, key in enumerate(condition_keys):
-					update = update.where(getattr(self.table.c, key) == condition_values[index])
-				updates.append(update)
-
-		else:
-			
-			condition_keys   = list(condition_dict.keys())
-			condition_values = list(condition_dict.values())
-
-			update = sql.update(self.table).values(update_dict)
-			for index, key in enumerate(condition_keys):
-				update = update.where(getattr(self.table.c, key) == condition_values[index])
-			updates = update
-
-		# submitting the update
-		update_entries = UpdateEntries(self.db, self.table, updates)
+		# condition_dict and update_dict are either single dictionaries or lists of matching dictionaries
+		update_entries = UpdateEntries(self.db, self.table, condition_dict, update_dict, sequence = next(self.sequence))
 		self.UPDATE_REQUESTS.append(update_entries)
 		if not self._processing_requests:
 			self._process_requests()
-
-
-
-
-
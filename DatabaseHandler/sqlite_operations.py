@@ -1,77 +1,142 @@
-#!/usr/bin/env python 
+#!/usr/bin/env python
 
 __author__ = 'Florian Hase'
 
 #========================================================================
 
 import time
+import threading
 import sqlalchemy as sql
 
 #========================================================================
 
 class AddEntry(object):
-		
-	def __init__(self, database, table, entry):
-		self.db    = database
-		self.table = table
-		self.entry = entry
 
-	def execute(self):
+	def __init__(self, database, table, entry, sequence = 0):
+		self.db       = database
+		self.table    = table
+		self.entry    = entry
+		self.sequence = sequence
+
+	def get_entries(self):
+		if isinstance(self.entry, list):
+			return self.entry
+		return [self.entry]
+
+	def execute(self, conn = None):
 		start = time.time()
-		with self.db.connect() as conn:
+		if conn is None:
+			with self.db.connect() as conn:
+				conn.execute(self.table.insert(), self.entry)
+				conn.close()
+		else:
 			conn.execute(self.table.insert(), self.entry)
-			conn.close()
 		end = time.time()
 
 #========================================================================
 
 class FetchEntries(object):
 
-	def __init__(self, database, table, selection, name = 'test'):
+	def __init__(self, database, table, selection, name = 'test', sequence = 0):
 		self.db              = database
 		self.table           = table
 		self.selection       = selection
 		self.entries         = None
 		self.executed        = False
-		self.entries_fetched = False 
+		self.entries_fetched = False
 		self.name            = name
-
-	def execute(self):
+		self.sequence        = sequence
+		self.error           = None
+		self.executed_event  = threading.Event()
+
+	def _fetch(self, conn):
+		# a list of selections is executed one after another, the entries are concatenated
+		selections = self.selection if isinstance(self.selection, list) else [self.selection]
+		entries    = []
+		for selection in selections:
+			entries.extend(conn.execute(selection).fetchall())
+		return entries
+
+	def execute(self, conn = None):
 		start = time.time()
-		with self.db.connect() as conn:
-			selected = conn.execute(self.selection)
-			entries  = selected.fetchall()
-			conn.close()
+		if conn is None:
+			with self.db.connect() as conn:
+				entries = self._fetch(conn)
+				conn.close()
+		else:
+			entries = self._fetch(conn)
 		self.entries  = entries
 		self.executed = True
+		self.executed_event.set()
 		end = time.time()
 
+	def fail(self, error):
+		# the waiting caller raises the error instead of waiting forever
+		self.error    = error
+		self.executed = True
+		self.executed_event.set()
+
 	def get_entries(self):
-		iteration_index = 0
-		while not self.executed:
-			pass
+		# block without spinning, the request processor needs the interpreter
+		self.executed_event.wait()
 		self.entries_fetched = True
+		if self.error is not None:
+			raise self.error
 		return self.entries
 
 #========================================================================
 
 class UpdateEntries(object):
-
-	def __init__(self, database, table, updates):
-		self.db      = database
-		self.table   = table		
-		self.updates = updates
-
-	def execute(self):
+	""" collects (condition_dict, update_dict) pairs which are executed with bound parameters """
+
+	def __init__(self, database, table, conditions, updates, sequence = 0):
+		self.db         = database
+		self.table      = table
+		if not isinstance(conditions, list):
+			conditions = [conditions]
+			updates    = [updates]
+		self.conditions = conditions
+		self.updates    = updates
+		self.sequence   = sequence
+
+	def get_pairs(self):
+		return zip(self.conditions, self.updates)
+
+	def execute(self, conn = None):
 		start = time.time()
-		if isinstance(self.updates, list):
+		if conn is None:
 			with self.db.connect() as conn:
-				for updates in self.updates:
-					updated = conn.execute(updates)
+				for condition, update in self.get_pairs():
+					conn.execute(build_update_statement(self.table, *get_update_signature(condition, update)), get_update_parameters(condition, update))
 				conn.close()
 		else:
-
-			with self.db.connect() as conn:
-				updated = conn.execute(self.updates)
-				conn.close()
+			for condition, update in self.get_pairs():
+				conn.execute(build_update_statement(self.table, *get_update_signature(condition, update)), get_update_parameters(condition, update))
 		end = time.time()
+
+#========================================================================
+
+def get_update_signature(condition, update):
+	# updates with the same signature share a compiled statement and can run as one executemany
+	# None conditions are rendered as IS NULL and do not become parameters
+	condition_keys = tuple(sorted((key, condition[key] is None) for key in condition))
+	update_keys    = tuple(sorted(update.keys()))
+	return condition_keys, update_keys
+
+
+def get_update_parameters(condition, update):
+	parameters = {'_cond_%s' % key: value for key, value in condition.items() if value is not None}
+	parameters.update({'_upd_%s' % key: value for key, value in update.items()})
+	return parameters
+
+
+def build_update_statement(table, condition_keys, update_keys):
+	values    = {key: sql.bindparam('_upd_%s' % key, type_ = getattr(table.c, key).type) for key in update_keys}
+	statement = sql.update(table).values(values)
+	for key, is_none in condition_keys:
+		column = getattr(table.c, key)
+		if is_none:
+			statement = statement.where(column.is_(None))
+		else:
+			statement = statement.where(column == sql.bindparam('_cond_%s' % key, type_ = column.type))
+	return statement
@@ -2,6 +2,8 @@
 
 #====================================================
 
+from collections import OrderedDict
+
 from DatabaseHandler import DB_Werkzeug
 
 #====================================================
@@ -23,23 +25,40 @@ class TaskHandler(DB_Werkzeug):
 					 'primer_index':       'integer',
 					 'execution_index':    'integer',}
 
+	DB_INDEXES = [{'columns': ['task_set_id', 'task_status'], 'unique': False},
+				  {'columns': ['task_id', 'primer_index', 'execution_index'], 'unique': False}]
+
 	TASK_SETS_COMPLETED         = {}
 	TASK_SETS_COMPLETED_CHANGED = {}
 	TASK_SETS_REMAINING         = {}
 	TASK_SETS_REMAINING_CHANGED = {}
 	NOT_YET_COMPLETED           = {}
 
+	# tasks are identified by these keys within a task set
+	TASK_KEYS = ['task_id', 'primer_index', 'execution_index']
+
 	def __init__(self, db_settings):
 
 		DB_Werkzeug.__init__(self)
-		self.create_database(db_settings, self.DB_ATTRIBUTES)
+		self.create_database(db_settings, self.DB_ATTRIBUTES, self.DB_INDEXES)
+		# REMAINING_TASKS and NOT_YET_COMPLETED map task_set_id to ordered dicts keyed by TASK_KEYS
 		self.REMAINING_TASKS = {}
-		self.COUNTER = {'statuses': 0, 'new': 0, 'submitted': 0, 'computed': 0, 'completed': 0}
+		self.COUNTERS        = {}
 
 	#====================================================================
 
+	def _task_key(self, task):
+		return tuple(task[key] for key in self.TASK_KEYS)
+
+
+	def get_counter(self, task_set_id):
+		if not task_set_id in self.COUNTERS:
+			self.COUNTERS[task_set_id] = {'statuses': 0, 'new': 0, 'submitted': 0, 'computed': 0, 'completed': 0}
+		return self.COUNTERS[task_set_id]
+
+
 	def refresh(self):
-		self.COUNTER = {'statuses': 0, 'new': 0, 'submitted': 0, 'computed': 0, 'completed': 0}
+		self.COUNTERS = {}
 
 
 	def add_tasks(self, info_dicts):
@@ -47,21 +66,23 @@ class TaskHandler(DB_Werkzeug):
 			info_dict['task_status'] = 'new'
 			if not 'from_optimizer' in info_dict:
 				info_dict['from_optimizer'] = False
-			try:
-				self.REMAINING_TASKS[info_dict['task_set_id']].append(info_dict)
-				self.NOT_YET_COMPLETED[info_dict['task_set_id']].append(info_dict)
-			except KeyError:
-				self.REMAINING_TASKS[info_dict['task_set_id']] = [info_dict]
-				self.NOT_YET_COMPLETED[info_dict['task_set_id']] = [info_dict]
-			self.TASK_SETS_REMAINING_CHANGED[info_dict['task_set_id']] = True
-			self.COUNTER['statuses'] += 1
-			self.COUNTER['new'] += 1
+			task_set_id = info_dict['task_set_id']
+			if not task_set_id in self.REMAINING_TASKS:
+				self.REMAINING_TASKS[task_set_id]   = OrderedDict()
+				self.NOT_YET_COMPLETED[task_set_id] = OrderedDict()
+			task_key = self._task_key(info_dict)
+			self.REMAINING_TASKS[task_set_id][task_key]   = info_dict
+			self.NOT_YET_COMPLETED[task_set_id][task_key] = info_dict
+			self.TASK_SETS_REMAINING_CHANGED[task_set_id] = True
+			counter = self.get_counter(task_set_id)
+			counter['statuses'] += 1
+			counter['new'] += 1
 		self.db_add(info_dicts)
 
 
 	def fetch_remaining_tasks(self, task_set_id):
 		try:
-			return self.REMAINING_TASKS[task_set_id]
+			return list(self.REMAINING_TASKS[task_set_id].values())
 		except KeyError:
 			condition = {'task_set_id': task_set_id, 'task_status': 'new'}
 			entries   = self.db_fetch_all(condition)
@@ -74,107 +95,63 @@ class TaskHandler(DB_Werkzeug):
 
 	#====================================================================
 
-	def report_circuit_submission(self):
-		self.COUNTER['submitted'] += 1
+	def report_circuit_submission(self, task_set_id):
+		self.get_counter(task_set_id)['submitted'] += 1
 
 
-	def report_circuit_computation(self):
-		self.COUNTER['submitted'] -= 1	
+	def report_circuit_computation(self, task_set_id):
+		self.get_counter(task_set_id)['submitted'] -= 1	
 	
 
-	def set_tasks_to_submitted(self, tasks):
+	def _update_statuses(self, tasks, status):
 		conditions = []
 		updates    = []
 		for task in tasks:
-			condition = {key: task[key] for key in ['task_id', 'primer_index', 'execution_index']}
-			update    = {'task_status': 'submitted'}
+			condition = {key: task[key] for key in self.TASK_KEYS}
+			update    = {'task_status': status}
 			conditions.append(condition)
 			updates.append(update)
-			self.TASK_SETS_REMAINING_CHANGED[task['task_set_id']] = True
-			self.COUNTER['new'] -= 1
-			self.COUNTER['submitted'] += 1
-
-			remaining_tasks = self.REMAINING_TASKS[task['task_set_id']]
-			for index, info_dict in enumerate(remaining_tasks):
-				identical = True
-				for key in ['task_id', 'primer_index', 'execution_index']:
-					identical = identical and info_dict[key] == task[key]
-				if identical:
-					del self.REMAINING_TASKS[task['task_set_id']][index]
-					break
-
 		self.db_update_all(conditions, updates)
 
 
-	def set_tasks_to_redundant(self, tasks):
-		conditions = []
-		updates    = []
+	def set_tasks_to_submitted(self, tasks):
 		for task in tasks:
-			condition = {key: task[key] for key in ['task_id', 'primer_index', 'execution_index']}
-			update    = {'task_status': 'redundant'}
-			conditions.append(condition)
-			updates.append(update)
 			self.TASK_SETS_REMAINING_CHANGED[task['task_set_id']] = True
-			self.TASK_SETS_COMPLETED_CHANGED[task['task_set_id']] = True
+			counter = self.get_counter(task['task_set_id'])
+			counter['new'] -= 1
+			counter['submitted'] += 1
+			self.REMAINING_TASKS[task['task_set_id']].pop(self._task_key(task), None)
+		self._update_statuses(tasks, 'submitted')
 
-			remaining_tasks = self.REMAINING_TASKS[task['task_set_id']]
-			for index, info_dict in enumerate(remaining_tasks):
-				identical = True
-				for key in ['task_id', 'primer_index', 'execution_index']:
-					identical = identical and info_dict[key] == task[key]
-				if identical:
-					del self.REMAINING_TASKS[task['task_set_id']][index]
-					break
-
-			not_yet_completed_tasks = self.NOT_YET_COMPLETED[task['task_set_id']]
-			for index, info_dict in enumerate(not_yet_completed_tasks):
-				identical = True
-				for key in ['task_id', 'primer_index', 'execution_index']:
-					identical = identical and info_dict[key] == task[key]
-				if identical:
-					del self.NOT_YET_COMPLETED[task['task_set_id']][index]
-					break
 
-		self.db_update_all(conditions, updates)
+	def set_tasks_to_redundant(self, tasks):
+		for task in tasks:
+			self.TASK_SETS_REMAINING_CHANGED[task['task_set_id']] = True
+			self.TASK_SETS_COMPLETED_CHANGED[task['task_set_id']] = True
+			task_key = self._task_key(task)
+			self.REMAINING_TASKS[task['task_set_id']].pop(task_key, None)
+			self.NOT_YET_COMPLETED[task['task_set_id']].pop(task_key, None)
+		self._update_statuses(tasks, 'redundant')
 
 
 	def set_tasks_to_computed(self, tasks):
-		conditions = []
-		updates    = []
 		for task in tasks:
-			condition = {key: task[key] for key in ['task_id', 'primer_index', 'execution_index']}
-			update    = {'task_status': 'computed'}
-			conditions.append(condition)
-			updates.append(update)
 			self.TASK_SETS_REMAINING_CHANGED[task['task_set_id']] = True
-			self.COUNTER['submitted'] -= 1
-			self.COUNTER['computed'] += 1
-		self.db_update_all(conditions, updates)
+			counter = self.get_counter(task['task_set_id'])
+			counter['submitted'] -= 1
+			counter['computed'] += 1
+		self._update_statuses(tasks, 'computed')
 
 
 	def set_tasks_to_completed(self, tasks):
-		conditions = []
-		updates    = []
 		for task in tasks:
-			condition = {key: task[key] for key in ['task_id', 'primer_index', 'execution_index']}
-			update    = {'task_status': 'completed'}
-			conditions.append(condition)
-			updates.append(update)
 			self.TASK_SETS_REMAINING_CHANGED[task['task_set_id']] = True
 			self.TASK_SETS_COMPLETED_CHANGED[task['task_set_id']] = True
-			self.COUNTER['computed'] -= 1
-			self.COUNTER['completed'] += 1
-
-			not_yet_completed_tasks = self.NOT_YET_COMPLETED[task['task_set_id']]
-			for index, info_dict in enumerate(not_yet_completed_tasks):
-				identical = True
-				for key in ['task_id', 'primer_index', 'execution_index']:
-					identical = identical and info_dict[key] == task[key]
-				if identical:
-					del self.NOT_YET_COMPLETED[task['task_set_id']][index]
-					break
-
-		self.db_update_all(conditions, updates)
+			counter = self.get_counter(task['task_set_id'])
+			counter['computed'] -= 1
+			counter['completed'] += 1
+			self.NOT_YET_COMPLETED[task['task_set_id']].pop(self._task_key(task), None)
+		self._update_statuses(tasks, 'completed')
 
 	#====================================================================
 
@@ -186,4 +163,4 @@ class TaskHandler(DB_Werkzeug):
 
 	def get_num_available_resources(self, task_set):
 		info_dict = task_set.generated_tasks[0]
-		return info_dict['designer_options']['max_concurrent'] - self.COUNTER['submitted']
+		return info_dict['designer_options']['max_concurrent'] - self.get_counter(info_dict['task_set_id'])['submitted']
@@ -1,13 +1,12 @@
 
 from Designers.abstract_designer    	import AbstractDesigner
 
-try:
-	from Designers.particle_swarm_designer import ParticleSwarmDesigner
-except ModuleNotFoundError:
-	ParticleSwarmDesigner = None
-
+from Designers.particle_swarm_designer import ParticleSwarmDesigner
 from Designers.random_designer         import RandomDesigner 
 from Designers.scipy_minimize_designer import ScipyMinimizeDesigner
+from Designers.cmaes_designer          import CMAESDesigner
+from Designers.bayesian_designer       import BayesianDesigner
+from Designers.grid_designer           import GridDesigner
 
 from Designers.circuit_designer      	import CircuitDesigner
 
@@ -2,16 +2,35 @@
 
 #====================================================
 
+import copy
 import uuid
+import time
+import threading
 
 import numpy as np
 
+from Designers.design_utils import UnitCubeSampler
+from Utilities.events       import NOTIFIER
+
 #====================================================
 
 # Factor to account for intrinsic junction capacitance
 CJFACTOR = 0 #junction capacitance is added automatically in simulation code
 
 class AbstractDesigner(object):
+
+	# strategy for drawing random circuits, see Designers.design_utils.SAMPLING_METHODS
+	sampling = 'uniform'
+
+	# designers driving their optimizers through ask and tell implement create_optimizer
+	USES_ASK_TELL = False
+	# name of the optimizer in log messages
+	optimizer_name = 'ask/tell'
+	# optimizers which do not model flux offsets get them drawn like for random circuits
+	DRAWS_PHIOFFS  = False
+
+	# losses of proposed circuits which are not reported within this time [s] are set to 10**6
+	evaluation_timeout = 100.
 		
 	def __init__(self, general_settings, param_settings, options):
 		self.busy = False
@@ -31,8 +50,19 @@ class AbstractDesigner(object):
 		self.NEW_TASKS           = []
 		self.OPTIMIZERS_FINISHED = False
 
+		self.sampler = None
 		self.construct_bounds()
 
+		# optimizer instances and the circuits they wait for, keyed by sim_id and circuit_id
+		self.optimizers          = {}
+		self.sim_info_dicts      = {}
+		self.PENDING_EVALUATIONS = {}
+		self.ask_tell_lock       = threading.Lock()
+
+		# tasks of the task set by task_id, optimizer instances in the order they were prepared
+		self.task_dict            = {}
+		self.running_instance_ids = []
+
 
 	def construct_bounds(self):
 		# construct bounds for combined array (c, j, l)
@@ -91,52 +121,264 @@ class AbstractDesigner(object):
 		c_arr += j_arr * CJFACTOR
 		circuit = {'junctions': j_arr, 'capacities': c_arr, 'inductances': l_arr, 
 				   'sim_id': info_dict['sim_id'], 'task_id_index': info_dict['task_id_index'], 'circuit_id': str(uuid.uuid4())}
-		if 'phiOffs' in info_dict:
+		if self.DRAWS_PHIOFFS:
+			circuit['phiOffs'] = self._draw_phiOffs(1)[0]
+		elif 'phiOffs' in info_dict:
 			circuit['phiOffs'] = info_dict['phiOffs']
 		return circuit
 
 
-	def _design_random_circuit(self):
+	def _scale_samples(self, samples, specs, mask):
+		values = (specs['low'] + samples * (specs['high'] - specs['low'])) * mask
+		# Case of 4-node circuit: add zero at forbidden connection 2-4
+		if specs['dimension']==9:
+			values = np.insert(values, 6, 0, axis = 1)
+		return values
+
+
+	def _design_random_circuits(self, num_circuits):
+		"""
+			Draws the component values of num_circuits circuits at once. Continuous values are taken from
+			the unit hypercube sampler selected with the 'sampling' option, masks are always drawn at random.
+
+			Parameters:
+				num_circuits: int | number of circuits
+
+			Returns:
+				circuits: list | dictionaries with junctions, capacities, inductances and phiOffs
+		"""
+		specs_list = [specs for specs in [self.j_specs, self.c_specs, self.l_specs] if specs is not None]
+		if self.sampler is None:
+			self.sampler = UnitCubeSampler(sum([specs['dimension'] for specs in specs_list]), self.sampling)
+		samples = np.split(self.sampler.draw(num_circuits), np.cumsum([specs['dimension'] for specs in specs_list])[:-1], axis = 1)
 
-		mask      = np.ones(self.j_specs['dimension'])
-		indices   = np.arange(len(mask))
-		np.random.shuffle(indices)
-		mask[indices[:self.j_specs['dimension']-self.j_specs['keep_num']]] *= 0.
+		# Keep exactly keep_num junctions per circuit
+		ranks     = np.argsort(np.argsort(np.random.uniform(0., 1., (num_circuits, self.j_specs['dimension'])), axis = 1), axis = 1)
+		mask      = (ranks < self.j_specs['keep_num']).astype(np.float64)
 
 		# Draw junctions
-		junctions  = np.random.uniform(self.j_specs['low'], self.j_specs['high'], self.j_specs['dimension'])
-		junctions *= mask
-		# Case of 4-node circuit: add zero at forbidden connection 2-4
-		if self.j_specs['dimension']==9:
-			junctions = np.insert(junctions, 6, 0)
+		junctions  = self._scale_samples(samples[0], self.j_specs, mask)
 
 		# Draw capacitances
-		capacities  = np.random.uniform(self.c_specs['low'], self.c_specs['high'], self.c_specs['dimension'])
-		capacities  = capacities * (np.random.uniform(0., 1., self.c_specs['dimension']) < self.c_specs['keep_prob'])
-		# Case of 4-node circuit: add zero at forbidden connection 2-4
-		if self.c_specs['dimension']==9:
-			capacities = np.insert(capacities, 6, 0)
+		mask        = (np.random.uniform(0., 1., (num_circuits, self.c_specs['dimension'])) < self.c_specs['keep_prob'])
+		capacities  = self._scale_samples(samples[1], self.c_specs, mask)
 		capacities += junctions * CJFACTOR
 
 		# Draw inductances
 		if self.l_specs != None:
-			inductances  = np.random.uniform(self.l_specs['low'], self.l_specs['high'], self.l_specs['dimension'])
-			inductances  = inductances * (np.random.uniform(0., 1., self.l_specs['dimension']) < self.l_specs['keep_prob'])
-			# Case of 4-node circuit: add zero at forbidden connection 2-4
-			if self.l_specs['dimension']==9:
-				inductances = np.insert(inductances, 6, 0)
+			mask         = (np.random.uniform(0., 1., (num_circuits, self.l_specs['dimension'])) < self.l_specs['keep_prob'])
+			inductances  = self._scale_samples(samples[2], self.l_specs, mask)
 			inductances[junctions > 0] = 0.
 		else:
-			inductances = None
+			inductances = [None for _ in range(num_circuits)]
 
 		# draw flux offsets for loops
-		if self.phiOffs_specs is not None:
-			phiOffs = np.random.choice(self.phiOffs_specs['values'], self.phiOffs_specs['dimension'])
+		phiOffs = self._draw_phiOffs(num_circuits)
+
+		circuits = []
+		for index in range(num_circuits):
+			circuit = {'junctions': junctions[index], 'capacities': capacities[index], 'inductances': inductances[index], 'phiOffs': phiOffs[index]}
+			circuits.append(circuit)
+		return circuits
+
+
+	def _draw_phiOffs(self, num_circuits):
+		if self.phiOffs_specs is None:
+			return [None for _ in range(num_circuits)]
+		return np.random.choice(self.phiOffs_specs['values'], (num_circuits, self.phiOffs_specs['dimension']))
+
+
+	def _design_random_circuit(self):
+		return self._design_random_circuits(1)[0]
+
+
+	def _squeeze_gradient(self, gradient, loss, info_dict):
+		# gradients are reported for the full parameter array, the optimizer only sees unmasked entries
+		# missing gradients stay missing, a zero gradient would look like a converged optimization
+		if gradient is None or loss >= 10**6:
+			return None
+		gradient = np.array(gradient, dtype = float)
+		return gradient[np.where(info_dict['x_mask'] > 0.)[0]]
+
+
+	def prepare_optimizer_instance(self, task_ids, observation_index, observation = None):
+		"""
+			Registers an optimizer instance starting from an observation or, if no observation is given,
+			from a random circuit. Components which are switched off in the start circuit stay off.
+
+			Parameters:
+				task_ids: list          | ids of the tasks the proposals of the instance are assigned to
+				observation_index: int  | index of the observation, reported as primer_index of new tasks
+				observation: dict       | observed circuit (optional)
+
+			Returns:
+				sim_info_dict: dict | start point, mask and bounds of the unmasked entries, keyed by sim_id
+		"""
+		if observation:
+			x_init, x_mask = self._construct_array_from_dict(observation)
+			phiOffs        = observation['phiOffs']['samples'] if 'phiOffs' in observation else None
+		else:
+			circuit        = self._design_random_circuit()
+			x_init, x_mask = self._construct_array_from_dict(circuit)
+			phiOffs        = circuit.get('phiOffs', None)
+		sim_info_dict = self._register_instance(task_ids, observation_index, x_init, x_mask)
+		if phiOffs is not None:
+			sim_info_dict['phiOffs'] = phiOffs
+		return sim_info_dict
+
+
+	def prepare_optimizer_instances(self, task_ids, observations):
+		# one optimizer instance for each observation
+		if len(observations) == 0:
+			self.prepare_optimizer_instance(task_ids, 0)
 		else:
-			phiOffs = None
+			for observation_index, observation in enumerate(observations):
+				self.prepare_optimizer_instance(task_ids, observation_index, observation = observation)
+
+
+	def _register_instance(self, task_ids, observation_index, x_init, x_mask):
+		sim_id        = str(uuid.uuid4())
+		unmasked      = np.where(x_mask > 0.)[0]
+		sim_info_dict = {'x_init': x_init, 'x_init_squeezed': x_init[unmasked], 'x_mask': x_mask,
+						 'bounds_squeezed': self.bounds[unmasked],
+						 'sim_id': sim_id, 'task_id_index': 0,
+						 'task_ids': task_ids, 'observation_index': observation_index, 'num_executed': 0}
+		self.sim_info_dicts[sim_id] = sim_info_dict
+		self.running_instance_ids.append(sim_info_dict)
+		return sim_info_dict
+
+
+	def initialize_optimizers(self, task_set, observations):
+		"""
+			Prepares the optimizer instances of a task set and starts an optimizer for each of them.
+			Designers driving their optimizers through ask and tell implement create_optimizer.
+
+			Parameters:
+				task_set: TaskSet   | calculation task set the designer proposes circuits for
+				observations: list  | observations of the task set the designer depends on
+		"""
+		print('# LOG | ... initializing %s optimizer (%d) ...' % (self.optimizer_name, len(observations)))
+		settings = task_set.settings['designer_options']
+
+		self.task_dict = {task['task_id']: task for task in task_set.generated_tasks}
+		task_ids       = [task['task_id'] for task in task_set.generated_tasks]
+		self.prepare_optimizer_instances(task_ids, observations)
+
+		# optimizers are resumable state machines, they only advance when losses are reported
+		for sim_info_dict_index, sim_info_dict in enumerate(self.running_instance_ids):
+			print('# LOG | ... starting %d (%d) %s optimizer' % (sim_info_dict_index + 1, len(self.running_instance_ids), self.optimizer_name))
+			self.optimizers[sim_info_dict['sim_id']] = self.create_optimizer(sim_info_dict, settings, observations)
+
+
+	def get_num_primer_tasks(self, designer_options):
+		# number of tasks generated when the task set starts, designers may request more tasks later on
+		return designer_options['max_iters']
+
+
+	def create_optimizer(self, sim_info_dict, settings, observations):
+		# returns the ask and tell optimizer for a prepared instance
+		raise NotImplementedError()
+
+
+	def _append_task(self, info_dict, task_id, execution_index):
+		# proposed circuits are evaluated within a copy of a task of the task set
+		new_task                    = copy.deepcopy(self.task_dict[task_id])
+		new_task['execution_index'] = execution_index
+		new_task['primer_index']    = info_dict['observation_index']
+		new_task['from_optimizer']  = True
+		self.NEW_TASKS.append(new_task)
+
+
+	def _proposals_made(self, sim_id, proposals):
+		# called for each batch of points handed out by an optimizer instance, all circuits of the batch
+		# get a task right away such that they can be submitted at once
+		info_dict       = self.sim_info_dicts[sim_id]
+		task_id_index   = min(info_dict['task_id_index'], len(info_dict['task_ids']) - 1)
+		current_task_id = info_dict['task_ids'][task_id_index]
+		for point_id, point in proposals:
+			info_dict['num_executed'] += 1
+			self._append_task(info_dict, current_task_id, info_dict['num_executed'])
+		NOTIFIER.notify('designer')
+
+	def _losses_received(self, sim_id, point_id):
+		# called after the loss of a point has been reported to its optimizer instance
+		pass
 
-		circuit = {'junctions': junctions, 'capacities': capacities, 'inductances': inductances, 'phiOffs': phiOffs}
-		return circuit
+
+	def ask(self):
+		"""
+			Collects the points all optimizer instances can evaluate next
+
+			Returns:
+				circuits: list | proposed circuits, identified by their sim_id and circuit_id
+		"""
+		circuits = []
+		with self.ask_tell_lock:
+			self._expire_evaluations()
+			for sim_id, optimizer in self.optimizers.items():
+				proposals = optimizer.ask()
+				if len(proposals) == 0: continue
+				info_dict = self.sim_info_dicts[sim_id]
+				for point_id, point in proposals:
+					circuit = self._construct_dict_from_array(point, info_dict)
+					self.PENDING_EVALUATIONS[circuit['circuit_id']] = (sim_id, point_id, time.time())
+					circuits.append(circuit)
+				self._proposals_made(sim_id, proposals)
+		return circuits
+
+
+	def tell(self, observations):
+		"""
+			Reports losses of evaluated circuits to the optimizer instances which proposed them
+
+			Parameters:
+				observations: list | observation dictionaries with circuit_id, loss and optional gradient
+		"""
+		with self.ask_tell_lock:
+			for observation in observations:
+				circuit_id = observation.get('circuit_id', None)
+				if isinstance(circuit_id, dict):
+					circuit_id = circuit_id['samples']
+				if not circuit_id in self.PENDING_EVALUATIONS: continue
+				sim_id, point_id, _ = self.PENDING_EVALUATIONS.pop(circuit_id)
+				self._tell_optimizer(sim_id, point_id, observation['loss'], observation.get('gradient', None))
+
+
+	def _tell_optimizer(self, sim_id, point_id, loss, gradient = None):
+		# caller holds the ask_tell_lock
+		if np.isinf(loss) or np.isnan(loss):
+			loss = 10**6
+		gradient = self._squeeze_gradient(gradient, loss, self.sim_info_dicts[sim_id])
+		self.optimizers[sim_id].tell(point_id, loss, gradient)
+		self._losses_received(sim_id, point_id)
+
+
+	def _expire_evaluations(self):
+		# circuits can get lost, e.g. if they do not pass the validator
+		now = time.time()
+		for circuit_id, (sim_id, point_id, proposal_time) in list(self.PENDING_EVALUATIONS.items()):
+			if now - proposal_time < self.evaluation_timeout: continue
+			del self.PENDING_EVALUATIONS[circuit_id]
+			self._tell_optimizer(sim_id, point_id, 10**6)
+
+
+	def is_initialized(self):
+		return len(self.optimizers) > 0
+
+
+	def close_optimizers(self):
+		# optimizers which are still running when their task set is completed are dropped
+		with self.ask_tell_lock:
+			for optimizer in self.optimizers.values():
+				optimizer.close()
+
+
+	def optimizers_finished(self):
+		# a designer whose optimizers are not initialized yet has not started, let alone finished
+		with self.ask_tell_lock:
+			if len(self.optimizers) == 0:
+				return False
+			return all([optimizer.is_finished() for optimizer in self.optimizers.values()])
 
 
 	def is_busy(self):
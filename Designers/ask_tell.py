@@ -0,0 +1,958 @@
+#!/usr/bin/env python
+
+""" Resumable optimizers which are driven by the designer through ask and tell """
+
+import os
+import queue
+import pickle
+import tempfile
+import threading
+import numpy as np
+
+from collections    import deque
+from scipy.stats    import norm
+from scipy.optimize import minimize as sp_minimize, OptimizeResult
+
+from Designers.design_utils     import iterate_grid
+from Designers.gaussian_process import GaussianProcess
+
+#====================================================
+
+class AskTellOptimizer(object):
+	"""
+		Optimizers never block: ask returns the points which can be evaluated next and tell reports the
+		loss of a single point. Points are identified by the ids handed out with them by ask.
+	"""
+
+	def __init__(self):
+		self.finished = False
+
+	def ask(self):
+		"""
+			Returns:
+				proposals: list | (point_id, x) pairs of points to evaluate, empty while waiting for losses
+		"""
+		raise NotImplementedError
+
+	def tell(self, point_id, loss, gradient = None):
+		raise NotImplementedError
+
+	def is_finished(self):
+		return self.finished
+
+	def close(self):
+		# called when the optimizer is dropped, releases resources held for an unfinished optimization
+		self.finished = True
+
+#====================================================
+
+def _get_perturbed_points(x, bounds, fd_step):
+	# forward steps, turned around at the upper bounds
+	points = []
+	for index in range(len(x)):
+		point = np.copy(x)
+		step  = fd_step
+		if bounds is not None and x[index] + step > bounds[index][1]:
+			step = - step
+		point[index] += step
+		points.append(point)
+	return points
+
+
+def _finite_differences(x, points, losses, center):
+	steps = np.array([point[index] - x[index] for index, point in enumerate(points)])
+	return (np.array(losses) - center) / steps
+
+#====================================================
+
+class LBFGSBOptimizer(AskTellOptimizer):
+	"""
+		Limited memory BFGS with bound constraints, written as a state machine: each request for losses
+		is handed out by ask, tell advances the optimization once all losses of the request are known.
+		No thread or replay is needed.
+
+		Search directions come from the two-loop recursion over the last memory steps. Variables which
+		sit on a bound with the gradient pointing outwards are held fixed, the step follows the
+		projection of the direction onto the bounds and is found with a backtracking Armijo line
+		search. The stopping criteria are those of scipy's L-BFGS-B (ftol, gtol, maxiter).
+
+		Finite difference gradients are requested in the same batch as the loss of a point, such that
+		all points are evaluated concurrently. Losses reported without gradient although use_gradients
+		is set get their gradient from such a batch as well.
+
+		Parameters:
+			x_init: np.ndarray    | initial position
+			bounds: np.ndarray    | (low, high) bounds for each entry of the position
+			max_iter: int         | maximum number of iterations
+			use_gradients: bool   | losses are reported with gradients
+			fd_step: float        | step of the forward differences (the default of L-BFGS-B)
+			memory: int           | number of steps of the inverse Hessian approximation
+			ftol: float           | stop when the relative reduction of the loss falls below ftol
+			gtol: float           | stop when the largest projected gradient entry falls below gtol
+	"""
+
+	ARMIJO         = 1e-4
+	MAX_BACKTRACKS = 20
+
+	def __init__(self, x_init, bounds, max_iter = 100, use_gradients = False, fd_step = 1e-8, memory = 10, ftol = 2.2e-9, gtol = 1e-5):
+		AskTellOptimizer.__init__(self)
+		x_init              = np.array(x_init, dtype = np.float64)
+		if bounds is None:
+			bounds = [(-np.inf, np.inf) for _ in x_init]
+		self.bounds         = np.array(bounds, dtype = np.float64)
+		self.lower          = self.bounds[:, 0]
+		self.upper          = self.bounds[:, 1]
+		self.max_iter       = max_iter
+		self.use_gradients  = use_gradients
+		self.fd_step        = fd_step
+		self.memory         = memory
+		self.ftol           = ftol
+		self.gtol           = gtol
+
+		self.x              = np.clip(x_init, self.lower, self.upper)
+		self.loss           = None
+		self.gradient       = None
+		self.steps          = []
+		self.num_iterations = 0
+		self.num_requests   = 0
+		self.num_losses     = 0
+		self.result         = None
+
+		# line search along the projected direction
+		self.direction      = None
+		self.step_length    = None
+		self.num_backtracks = 0
+
+		# current request: points, the position they belong to and the loss of that position if known
+		self.pending        = None
+		self.received       = {}
+		self.asked          = False
+		self.center         = None
+		self.center_loss    = None
+		self._request_position(self.x)
+
+
+	def _request_position(self, x):
+		self.center      = x
+		self.center_loss = None
+		self.pending     = [np.copy(x)]
+		if not self.use_gradients:
+			self.pending.extend(_get_perturbed_points(x, self.bounds, self.fd_step))
+
+
+	def ask(self):
+		if self.finished or self.asked: return []
+		self.asked    = True
+		self.received = {}
+		return [((self.num_requests, point_index), np.copy(point)) for point_index, point in enumerate(self.pending)]
+
+
+	def tell(self, point_id, loss, gradient = None):
+		request_index, point_index = point_id
+		if request_index != self.num_requests or not self.asked: return
+		self.received[point_index] = (loss, gradient)
+		if len(self.received) < len(self.pending): return
+		answers            = [self.received[point_index] for point_index in range(len(self.pending))]
+		self.num_requests += 1
+		self.num_losses   += len(answers)
+		self.asked         = False
+
+		# requests either start with the loss of the position or only hold the perturbed points
+		if self.center_loss is None:
+			loss, gradient = answers.pop(0)
+		else:
+			loss, gradient = self.center_loss, None
+		if len(answers) > 0:
+			gradient = _finite_differences(self.center, self.pending[-len(answers):], [entry[0] for entry in answers], loss)
+		elif gradient is None:
+			self.center_loss = loss
+			self.pending     = _get_perturbed_points(self.center, self.bounds, self.fd_step)
+			return
+		self._position_evaluated(self.center, loss, np.array(gradient, dtype = np.float64))
+
+
+	def _position_evaluated(self, x, loss, gradient):
+		if self.loss is None:
+			self.x, self.loss, self.gradient = x, loss, gradient
+			self._start_iteration()
+			return
+
+		# Armijo condition along the projected path
+		if np.isfinite(loss) and loss <= self.loss + self.ARMIJO * np.dot(self.gradient, x - self.x):
+			self._accept(x, loss, gradient)
+			return
+		self.num_backtracks += 1
+		self.step_length    *= 0.5
+		if self.num_backtracks > self.MAX_BACKTRACKS:
+			self._finish('ABNORMAL_TERMINATION_IN_LNSRCH', False)
+			return
+		self._request_trial()
+
+
+	def _accept(self, x, loss, gradient):
+		step, change = x - self.x, gradient - self.gradient
+		if np.dot(step, change) > 1e-10 * np.dot(change, change):
+			self.steps.append((step, change))
+			self.steps = self.steps[-self.memory:]
+		previous_loss = self.loss
+		self.x, self.loss, self.gradient = x, loss, gradient
+		self.num_iterations += 1
+		if (previous_loss - loss) / max(abs(previous_loss), abs(loss), 1.) <= self.ftol:
+			self._finish('CONVERGENCE: REL_REDUCTION_OF_F_<=_FACTR*EPSMCH', True)
+			return
+		self._start_iteration()
+
+
+	def _get_direction(self, free):
+		# two-loop recursion restricted to the free variables
+		q      = self.gradient * free
+		alphas = []
+		for step, change in reversed(self.steps):
+			step, change = step * free, change * free
+			rho = np.dot(change, step)
+			if rho <= 0.: continue
+			alpha = np.dot(step, q) / rho
+			q    -= alpha * change
+			alphas.append((alpha, rho, step, change))
+		if len(alphas) > 0:
+			alpha, rho, step, change = alphas[0]
+			q *= rho / np.dot(change, change)
+		for alpha, rho, step, change in reversed(alphas):
+			beta = np.dot(change, q) / rho
+			q   += (alpha - beta) * step
+		return - q
+
+
+	def _start_iteration(self):
+		projected_gradient = np.clip(self.x - self.gradient, self.lower, self.upper) - self.x
+		if np.amax(np.abs(projected_gradient)) <= self.gtol:
+			self._finish('CONVERGENCE: NORM_OF_PROJECTED_GRADIENT_<=_PGTOL', True)
+			return
+		if self.num_iterations >= self.max_iter:
+			self._finish('STOP: TOTAL NO. of ITERATIONS REACHED LIMIT', False)
+			return
+
+		# variables on a bound with the gradient pointing outwards are held fixed
+		fixed = ((self.x <= self.lower) & (self.gradient > 0.)) | ((self.x >= self.upper) & (self.gradient < 0.))
+		free  = np.logical_not(fixed).astype(np.float64)
+		self.direction = self._get_direction(free)
+		if np.dot(self.direction, self.gradient) >= 0.:
+			self.steps     = []
+			self.direction = - self.gradient * free
+		self.step_length    = 1. if len(self.steps) > 0 else min(1., 1. / np.linalg.norm(self.direction))
+		self.num_backtracks = 0
+		self._request_trial()
+
+
+	def _request_trial(self):
+		trial = np.clip(self.x + self.step_length * self.direction, self.lower, self.upper)
+		if np.all(trial == self.x):
+			self._finish('ABNORMAL_TERMINATION_IN_LNSRCH', False)
+			return
+		self._request_position(trial)
+
+
+	def _finish(self, message, success):
+		self.finished = True
+		self.pending  = None
+		self.result   = OptimizeResult(x = self.x, fun = self.loss, jac = self.gradient, nit = self.num_iterations,
+									   nfev = self.num_losses, success = success, message = message)
+
+#====================================================
+
+class _StopOptimization(Exception):
+	pass
+
+
+class ScipyMinimizeOptimizer(AskTellOptimizer):
+	"""
+		Runs scipy.optimize.minimize in a thread of its own, which is suspended whenever scipy requests
+		losses: the requested points are handed out by ask and scipy resumes once all of their losses
+		have been reported with tell. tell waits until scipy has issued its next request or finished, so
+		the thread only runs while tell is called and the optimizer behaves like a coroutine of the
+		calling thread.
+
+		Finite difference gradients are requested as one batch of perturbed points, which are evaluated
+		concurrently instead of one after another by scipy. Losses which are reported without gradient
+		although use_gradients is set (failed evaluations, losses without derivatives) get their gradient
+		from such a batch as well.
+
+		Parameters:
+			x_init: np.ndarray    | initial position
+			bounds: np.ndarray    | (low, high) bounds for each entry of the position
+			method: str           | scipy minimization method
+			max_iter: int         | maximum number of optimizer iterations
+			use_gradients: bool   | losses are reported with gradients
+			batch_gradients: bool | estimate gradients from batches of perturbed points
+			fd_step: float        | step of the forward differences (the default of L-BFGS-B)
+	"""
+
+	# methods which make use of gradients
+	GRADIENT_METHODS = ['L-BFGS-B', 'BFGS', 'CG', 'SLSQP', 'TNC']
+
+	def __init__(self, x_init, bounds, method = 'L-BFGS-B', max_iter = 100, use_gradients = False, batch_gradients = True, fd_step = 1e-8):
+		AskTellOptimizer.__init__(self)
+		self.x_init          = np.array(x_init, dtype = np.float64)
+		self.bounds          = bounds
+		self.method          = method
+		self.max_iter        = max_iter
+		self.use_gradients   = use_gradients
+		self.batch_gradients = batch_gradients and not use_gradients and method in self.GRADIENT_METHODS
+		self.fd_step         = fd_step
+		self.num_requests    = 0
+		self.pending         = None
+		self.received        = {}
+		self.asked           = False
+		self.num_iterations  = 0
+		self.result          = None
+
+		# requests of scipy and the answers to them are exchanged over queues
+		self.requests        = queue.Queue()
+		self.answers         = queue.Queue()
+		self.thread          = threading.Thread(target = self._minimize)
+		self.thread.daemon   = True
+		self.thread.start()
+		self._wait_for_request()
+
+
+	def _get_perturbed_points(self, x):
+		return _get_perturbed_points(x, self.bounds, self.fd_step)
+
+
+	def _evaluate(self, points):
+		# runs on the optimizer thread, which is suspended until the losses of all points are known
+		self.requests.put(('request', [np.array(point, dtype = np.float64) for point in points]))
+		answers = self.answers.get()
+		if answers is None:
+			raise _StopOptimization()
+		return answers
+
+
+	def _minimize(self):
+		evaluated = {}
+
+		def loss_function(x):
+			(loss, gradient), = self._evaluate([x])
+			evaluated[np.array(x, dtype = np.float64).tobytes()] = loss
+			if self.use_gradients:
+				if gradient is None:
+					gradient = gradient_function(x)
+				return loss, gradient
+			return loss
+
+		def gradient_function(x):
+			x      = np.array(x, dtype = np.float64)
+			points = self._get_perturbed_points(x)
+			if x.tobytes() in evaluated:
+				losses = [loss for loss, _ in self._evaluate(points)]
+				center = evaluated[x.tobytes()]
+			else:
+				losses = [loss for loss, _ in self._evaluate(points + [x])]
+				center = losses.pop(-1)
+			steps  = np.array([point[index] - x[index] for index, point in enumerate(points)])
+			return (np.array(losses) - center) / steps
+
+		def callback(xk):
+			self.num_iterations += 1
+
+		if self.use_gradients:
+			jac = True
+		elif self.batch_gradients:
+			jac = gradient_function
+		else:
+			jac = None
+
+		try:
+			result = sp_minimize(loss_function, self.x_init, method = self.method, jac = jac,
+								 bounds = self.bounds, options = {'maxiter': self.max_iter}, callback = callback)
+		except _StopOptimization:
+			return
+		except Exception as error:
+			self.requests.put(('error', error))
+			return
+		self.requests.put(('finished', result))
+
+
+	def _wait_for_request(self):
+		state, content = self.requests.get()
+		if state == 'request':
+			self.pending = content
+			return
+		self.pending  = None
+		self.finished = True
+		if state == 'error':
+			raise content
+		self.result   = content
+
+
+	def ask(self):
+		if self.finished or self.asked: return []
+		self.asked    = True
+		self.received = {}
+		return [((self.num_requests, point_index), np.copy(point)) for point_index, point in enumerate(self.pending)]
+
+
+	def tell(self, point_id, loss, gradient = None):
+		request_index, point_index = point_id
+		if request_index != self.num_requests or not self.asked: return
+		self.received[point_index] = (loss, gradient)
+		if len(self.received) < len(self.pending): return
+		self.num_requests += 1
+		self.asked         = False
+		self.answers.put([self.received[point_index] for point_index in range(len(self.pending))])
+		self._wait_for_request()
+
+
+	def close(self):
+		# ends the thread of an optimization which is abandoned before it finished, called by the designer
+		# when its task set is completed
+		if self.finished: return
+		self.finished = True
+		self.answers.put(None)
+
+#====================================================
+
+class ParticleSwarmOptimizer(AskTellOptimizer):
+	"""
+		Global best particle swarm optimization with the update rules of pyswarms.single.GlobalBestPSO.
+		All particles of a generation are handed out at once, the swarm moves as soon as the losses of
+		all particles of the generation have been reported.
+
+		Parameters:
+			init_pos: np.ndarray | (n_particles, dimensions) initial positions
+			lower: np.ndarray    | lower bounds of the positions
+			upper: np.ndarray    | upper bounds of the positions
+			options: dict        | cognitive (c1), social (c2) and inertia (w) parameters
+			max_iter: int        | number of generations
+	"""
+
+	def __init__(self, init_pos, lower, upper, options, max_iter):
+		AskTellOptimizer.__init__(self)
+		self.positions    = np.array(init_pos, dtype = np.float64)
+		self.n_particles  = len(self.positions)
+		self.lower        = lower
+		self.upper        = upper
+		self.options      = options
+		self.max_iter     = max_iter
+		self.velocities   = np.random.uniform(0., 1., self.positions.shape)
+		self.best_pos     = np.copy(self.positions)
+		self.best_losses  = np.zeros(self.n_particles) + np.inf
+		self.global_pos   = np.copy(self.positions[0])
+		self.global_loss  = np.inf
+		self.losses       = np.zeros(self.n_particles)
+		self.received     = np.zeros(self.n_particles, dtype = bool)
+		self.generation   = 0
+		self.asked        = False
+		self.finished     = max_iter <= 0
+
+
+	def ask(self):
+		if self.finished or self.asked: return []
+		self.asked = True
+		first_id   = self.generation * self.n_particles
+		return [(first_id + index, np.copy(position)) for index, position in enumerate(self.positions)]
+
+
+	def tell(self, point_id, loss, gradient = None):
+		generation, index = divmod(point_id, self.n_particles)
+		if generation != self.generation or self.received[index]: return
+		self.losses[index]   = loss
+		self.received[index] = True
+		if np.all(self.received):
+			self._move_swarm()
+
+
+	def _move_swarm(self):
+		improved = self.losses < self.best_losses
+		self.best_pos[improved]    = self.positions[improved]
+		self.best_losses[improved] = self.losses[improved]
+		best_index = np.argmin(self.best_losses)
+		if self.best_losses[best_index] < self.global_loss:
+			self.global_pos  = np.copy(self.best_pos[best_index])
+			self.global_loss = self.best_losses[best_index]
+
+		self.generation += 1
+		self.received[:] = False
+		self.asked       = False
+		if self.generation >= self.max_iter:
+			self.finished = True
+			return
+
+		cognitive_rand  = np.random.uniform(0., 1., self.positions.shape)
+		social_rand     = np.random.uniform(0., 1., self.positions.shape)
+		self.velocities = self.options['w'] * self.velocities \
+						+ self.options['c1'] * cognitive_rand * (self.best_pos - self.positions) \
+						+ self.options['c2'] * social_rand * (self.global_pos - self.positions)
+		self.positions  = np.minimum(np.maximum(self.positions + self.velocities, self.lower), self.upper)
+
+#====================================================
+
+class AsyncParticleSwarmOptimizer(ParticleSwarmOptimizer):
+	"""
+		Steady-state variant of the global best particle swarm: each particle moves as soon as its own loss
+		has been reported, using the global best known at that time. Particles never wait for the slowest
+		evaluation of a generation, so every idle worker can be handed a particle.
+
+		Fast particles move on stale global bests and make more moves than slow ones, hence the same
+		number of evaluations does not buy the same progress: on the simulated Rastrigin benchmark the
+		asynchronous swarm finishes in less wall time but with worse best losses for small and medium
+		swarms (41.8 vs 29.3 with 4 workers, 18.3 vs 14.8 with 16) and equal ones for large swarms.
+
+		Parameters are those of ParticleSwarmOptimizer, max_iter is the number of evaluations per particle.
+	"""
+
+	def __init__(self, init_pos, lower, upper, options, max_iter):
+		ParticleSwarmOptimizer.__init__(self, init_pos, lower, upper, options, max_iter)
+		self.evaluations = np.zeros(self.n_particles, dtype = int)
+		self.in_flight   = np.zeros(self.n_particles, dtype = bool)
+
+
+	def ask(self):
+		proposals = []
+		for index in np.where(np.logical_not(self.in_flight) & (self.evaluations < self.max_iter))[0]:
+			self.in_flight[index] = True
+			proposals.append((self.evaluations[index] * self.n_particles + index, np.copy(self.positions[index])))
+		return proposals
+
+
+	def tell(self, point_id, loss, gradient = None):
+		evaluation, index = divmod(point_id, self.n_particles)
+		if evaluation != self.evaluations[index] or not self.in_flight[index]: return
+		self.in_flight[index]    = False
+		self.evaluations[index] += 1
+		self.generation          = int(np.amin(self.evaluations))
+
+		if loss < self.best_losses[index]:
+			self.best_pos[index]    = np.copy(self.positions[index])
+			self.best_losses[index] = loss
+		if loss < self.global_loss:
+			self.global_pos  = np.copy(self.positions[index])
+			self.global_loss = loss
+
+		if self.evaluations[index] < self.max_iter:
+			cognitive_rand = np.random.uniform(0., 1., len(self.positions[index]))
+			social_rand    = np.random.uniform(0., 1., len(self.positions[index]))
+			self.velocities[index] = self.options['w'] * self.velocities[index] \
+								   + self.options['c1'] * cognitive_rand * (self.best_pos[index] - self.positions[index]) \
+								   + self.options['c2'] * social_rand * (self.global_pos - self.positions[index])
+			self.positions[index]  = np.minimum(np.maximum(self.positions[index] + self.velocities[index], self.lower), self.upper)
+		self.finished = np.all(self.evaluations >= self.max_iter)
+
+#====================================================
+
+class CMAESOptimizer(AskTellOptimizer):
+	"""
+		Covariance matrix adaptation evolution strategy with IPOP or BIPOP restarts. Each generation is
+		handed out as one batch. The search runs in coordinates normalized to the bounds, sampled points
+		outside the bounds are clipped onto them before they are evaluated. Mean and covariance are
+		updated from the unclipped samples, ranked by their loss plus a quadratic penalty on the distance
+		to the bounds, such that the distribution is not biased towards the clipped points. The penalty
+		is scaled by the interquartile range of the losses of the generation.
+
+		Restarts are triggered when the best losses stagnate, the step size collapses or the covariance
+		matrix degenerates. IPOP doubles the population size on each restart, BIPOP alternates between
+		doubled populations and small populations with smaller step sizes, choosing the regime which has
+		used fewer evaluations so far.
+
+		Parameters:
+			x_init: np.ndarray | initial mean
+			lower: np.ndarray  | lower bounds
+			upper: np.ndarray  | upper bounds
+			max_iter: int      | number of generations over all restarts
+			popsize: int       | (optional) population size of the first run (default: 4 + 3 ln d)
+			sigma0: float      | initial step size relative to the width of the bounds
+			restarts: str      | 'ipop', 'bipop' or None
+	"""
+
+	# thresholds for restarting a run
+	TOL_FUN  = 1e-12
+	TOL_X    = 1e-12
+	MAX_COND = 1e14
+
+	def __init__(self, x_init, lower, upper, max_iter, popsize = None, sigma0 = 0.3, restarts = 'bipop'):
+		AskTellOptimizer.__init__(self)
+		self.lower           = np.array(lower, dtype = np.float64)
+		self.upper           = np.array(upper, dtype = np.float64)
+		self.span            = np.where(self.upper > self.lower, self.upper - self.lower, 1.)
+		self.num_dims        = len(self.lower)
+		self.max_iter        = max_iter
+		self.sigma0          = sigma0
+		self.restarts        = restarts
+		self.default_popsize = 4 + int(3 * np.log(self.num_dims))
+		self.base_popsize    = self.default_popsize if popsize is None else max(int(popsize), 2)
+		self.large_popsize   = self.base_popsize
+		self.evaluations     = {'large': 0, 'small': 0}
+		self.regime          = 'large'
+		self.num_restarts    = 0
+		self.generation      = 0
+		self.best_x          = np.array(x_init, dtype = np.float64)
+		self.best_loss       = np.inf
+		self.asked           = False
+		self.finished        = max_iter <= 0
+		self._start_run(self._normalize(x_init), self.base_popsize, self.sigma0)
+
+
+	def _normalize(self, x):
+		return np.clip((np.array(x, dtype = np.float64) - self.lower) / self.span, 0., 1.)
+
+
+	def _start_run(self, mean, popsize, sigma):
+		num_dims         = self.num_dims
+		self.mean        = mean
+		self.popsize     = popsize
+		self.sigma       = sigma
+		self.mu          = max(popsize // 2, 1)
+		weights          = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+		self.weights     = weights / np.sum(weights)
+		self.mueff       = 1. / np.sum(self.weights**2)
+		self.cc          = (4. + self.mueff / num_dims) / (num_dims + 4. + 2. * self.mueff / num_dims)
+		self.cs          = (self.mueff + 2.) / (num_dims + self.mueff + 5.)
+		self.c1          = 2. / ((num_dims + 1.3)**2 + self.mueff)
+		self.cmu         = min(1. - self.c1, 2. * (self.mueff - 2. + 1. / self.mueff) / ((num_dims + 2.)**2 + self.mueff))
+		self.damps       = 1. + 2. * max(0., np.sqrt((self.mueff - 1.) / (num_dims + 1.)) - 1.) + self.cs
+		self.chi_n       = np.sqrt(num_dims) * (1. - 1. / (4. * num_dims) + 1. / (21. * num_dims**2))
+		self.pc          = np.zeros(num_dims)
+		self.ps          = np.zeros(num_dims)
+		self.B           = np.eye(num_dims)
+		self.D           = np.ones(num_dims)
+		self.C           = np.eye(num_dims)
+		self.run_generation = 0
+		self.run_best_losses = []
+		self.history_length  = 10 + int(np.ceil(30. * num_dims / popsize))
+		self.samples     = None
+		self.clipped     = None
+		self.losses      = np.zeros(popsize)
+		self.received    = np.zeros(popsize, dtype = bool)
+
+
+	def ask(self):
+		if self.finished or self.asked: return []
+		self.asked   = True
+		normal       = np.random.normal(0., 1., (self.popsize, self.num_dims))
+		self.samples = self.mean + self.sigma * np.dot(normal * self.D, self.B.T)
+		self.clipped = np.clip(self.samples, 0., 1.)
+		self.received[:] = False
+		return [((self.generation, index), self.lower + sample * self.span) for index, sample in enumerate(self.clipped)]
+
+
+	def tell(self, point_id, loss, gradient = None):
+		generation, index = point_id
+		if generation != self.generation or not self.asked or self.received[index]: return
+		self.losses[index]   = loss
+		self.received[index] = True
+		if np.all(self.received):
+			self._update()
+
+
+	def _update(self):
+		best = np.argmin(self.losses)
+		if self.losses[best] < self.best_loss:
+			self.best_loss = self.losses[best]
+			self.best_x    = self.lower + self.clipped[best] * self.span
+
+		# unclipped samples are ranked by their penalized loss
+		spread    = np.subtract(*np.percentile(self.losses, [75, 25]))
+		penalties = (spread if spread > 0. else 1.) * np.sum((self.samples - self.clipped)**2, axis = 1)
+		order     = np.argsort(self.losses + penalties)
+		selected  = self.samples[order[:self.mu]]
+
+		# mean and evolution paths
+		old_mean     = self.mean
+		self.mean    = np.dot(self.weights, selected)
+		mean_shift   = (self.mean - old_mean) / self.sigma
+		inv_sqrt_C   = np.dot(self.B / self.D, self.B.T)
+		self.ps      = (1. - self.cs) * self.ps + np.sqrt(self.cs * (2. - self.cs) * self.mueff) * np.dot(inv_sqrt_C, mean_shift)
+		ps_norm      = np.linalg.norm(self.ps) / np.sqrt(1. - (1. - self.cs)**(2 * (self.run_generation + 1)))
+		hsig         = float(ps_norm / self.chi_n < 1.4 + 2. / (self.num_dims + 1.))
+		self.pc      = (1. - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2. - self.cc) * self.mueff) * mean_shift
+
+		# covariance matrix and step size
+		steps        = (selected - old_mean) / self.sigma
+		self.C       = (1. - self.c1 - self.cmu) * self.C \
+					 + self.c1 * (np.outer(self.pc, self.pc) + (1. - hsig) * self.cc * (2. - self.cc) * self.C) \
+					 + self.cmu * np.dot(steps.T * self.weights, steps)
+		self.sigma  *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1.))
+		self.C       = np.triu(self.C) + np.triu(self.C, 1).T
+		eigenvalues, self.B = np.linalg.eigh(self.C)
+		self.D       = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+		self.run_best_losses.append(self.losses[best])
+		self.evaluations[self.regime] += self.popsize
+		self.run_generation += 1
+		self.generation     += 1
+		self.asked           = False
+		if self.generation >= self.max_iter:
+			self.finished = True
+		elif self.restarts is not None and self._run_converged():
+			self._restart()
+
+
+	def _run_converged(self):
+		recent_losses = self.run_best_losses[-self.history_length:]
+		if len(recent_losses) == self.history_length:
+			if max(np.amax(recent_losses), np.amax(self.losses)) - min(np.amin(recent_losses), np.amin(self.losses)) < self.TOL_FUN:
+				return True
+		if self.sigma * max(np.amax(self.D), np.amax(np.abs(self.pc))) < self.TOL_X:
+			return True
+		return (np.amax(self.D) / np.amin(self.D))**2 > self.MAX_COND
+
+
+	def _restart(self):
+		self.num_restarts += 1
+		if self.restarts == 'bipop' and self.evaluations['small'] < self.evaluations['large']:
+			self.regime = 'small'
+			popsize     = int(self.base_popsize * (0.5 * self.large_popsize / self.base_popsize)**(np.random.uniform()**2))
+			sigma       = self.sigma0 * 10**(-2. * np.random.uniform())
+		else:
+			self.regime        = 'large'
+			self.large_popsize = 2 * self.large_popsize
+			popsize, sigma     = self.large_popsize, self.sigma0
+		self._start_run(np.random.uniform(0., 1., self.num_dims), max(popsize, 2), sigma)
+
+#====================================================
+
+class BayesianOptimizer(AskTellOptimizer):
+	"""
+		Batched Bayesian optimization on a Gaussian process surrogate. Up to batch_size points are in
+		flight at any time, whenever losses are reported the freed slots are refilled right away.
+
+		Batches are selected with the Kriging believer heuristic: each selected point and each point in
+		flight is assumed to return the posterior mean, which leaves the mean unchanged and shrinks the
+		variance around the point, such that the next point of the batch is drawn to a different region.
+		The variance updates are rank one updates over the candidate set, the surrogate is not refitted
+		while a batch is assembled.
+
+		Acquisition functions are optimized over candidates drawn with sample_candidates and over local
+		perturbations of the best observed points. Entries which are exactly zero stay zero in the
+		perturbations, i.e. components which are switched off remain switched off.
+
+		Parameters:
+			lower: np.ndarray         | lower bounds
+			upper: np.ndarray         | upper bounds
+			max_iter: int             | number of batches, i.e. max_iter * batch_size evaluations
+			batch_size: int           | maximum number of points in flight
+			sample_candidates: func   | (optional) returns n random points (default: uniform in the bounds)
+			observations: tuple       | (optional) (points, losses) of prior evaluations
+			num_candidates: int       | number of candidates for each batch
+			num_initial: int          | number of random points before the surrogate is used (default: batch_size)
+			acquisition: str          | 'ei' (expected improvement) or 'lcb' (lower confidence bound)
+	"""
+
+	# exploration parameters of the acquisition functions, in units of the standardized losses
+	XI    = 0.01
+	KAPPA = 2.
+	# relative step size of local candidates and number of observed points they are drawn around
+	LOCAL_STEP = 0.05
+	NUM_LOCAL  = 5
+
+	def __init__(self, lower, upper, max_iter, batch_size, sample_candidates = None, observations = None,
+				 num_candidates = 512, num_initial = None, acquisition = 'ei'):
+		AskTellOptimizer.__init__(self)
+		self.lower             = np.array(lower, dtype = np.float64)
+		self.upper             = np.array(upper, dtype = np.float64)
+		self.span              = np.where(self.upper > self.lower, self.upper - self.lower, 1.)
+		self.max_evaluations   = max_iter * batch_size
+		self.batch_size        = max(int(batch_size), 1)
+		self.sample_candidates = sample_candidates
+		self.num_candidates    = num_candidates
+		self.num_initial       = self.batch_size if num_initial is None else num_initial
+		self.acquisition       = acquisition
+		self.surrogate         = GaussianProcess(len(self.lower))
+		self.in_flight         = {}
+		self.num_proposed      = 0
+		self.num_evaluated     = 0
+		self.best_x            = None
+		self.best_loss         = np.inf
+		self.finished          = self.max_evaluations <= 0
+		if observations is not None:
+			for x, loss in zip(*observations):
+				self._observe(np.array(x, dtype = np.float64), loss)
+
+
+	def _normalize(self, x):
+		return (x - self.lower) / self.span
+
+
+	def _observe(self, x, loss):
+		self.surrogate.add(self._normalize(x), loss)
+		if loss < self.best_loss:
+			self.best_x, self.best_loss = x, loss
+
+
+	def _draw_candidates(self, num_points):
+		if self.sample_candidates is None:
+			return self.lower + np.random.uniform(0., 1., (num_points, len(self.lower))) * self.span
+		return np.array(self.sample_candidates(num_points), dtype = np.float64)
+
+
+	def _local_candidates(self, num_points):
+		X, losses = self.surrogate.X, self.surrogate.losses
+		if len(losses) == 0: return np.zeros((0, len(self.lower)))
+		centers = self.lower + X[np.argsort(losses)[:self.NUM_LOCAL]] * self.span
+		centers = centers[np.random.randint(len(centers), size = num_points)]
+		steps   = np.random.normal(0., self.LOCAL_STEP, centers.shape) * self.span * (centers != 0.)
+		return np.where(centers != 0., np.clip(centers + steps, self.lower, self.upper), 0.)
+
+
+	def _score(self, mean, std):
+		if self.acquisition == 'lcb':
+			return - mean + self.KAPPA * std
+		improvement = self.surrogate.best_target() - mean - self.XI
+		z = improvement / np.maximum(std, 1e-12)
+		return np.where(std > 1e-12, improvement * norm.cdf(z) + std * norm.pdf(z), np.maximum(improvement, 0.))
+
+
+	def _select_batch(self, num_points):
+		candidates = np.concatenate([self._draw_candidates(self.num_candidates // 2),
+									 self._local_candidates(self.num_candidates - self.num_candidates // 2)])
+		pending    = np.array(list(self.in_flight.values())).reshape((-1, len(self.lower)))
+		points     = self._normalize(np.concatenate([candidates, pending]))
+		mean, V    = self.surrogate.predict(points)
+		variance   = self.surrogate.prior_variance() - np.sum(V**2, axis = 0)
+		updates    = []
+
+		def condition(index):
+			# posterior covariance with the believed point, minus the updates of earlier believed points
+			cov = self.surrogate.kernel(points, points[index : index + 1])[:, 0] - np.dot(V.T, V[:, index])
+			for update in updates:
+				cov -= update * update[index]
+			update = cov / np.sqrt(max(variance[index], 1e-12))
+			updates.append(update)
+			variance[:] = np.maximum(variance - update**2, 0.)
+
+		for index in range(len(candidates), len(points)):
+			condition(index)
+		selected  = []
+		available = np.ones(len(candidates), dtype = bool)
+		for _ in range(min(num_points, len(candidates))):
+			scores = self._score(mean[:len(candidates)], np.sqrt(variance[:len(candidates)]))
+			scores[np.logical_not(available)] = -np.inf
+			index  = int(np.argmax(scores))
+			available[index] = False
+			selected.append(index)
+			condition(index)
+		return candidates[selected]
+
+
+	def ask(self):
+		num_points = min(self.batch_size - len(self.in_flight), self.max_evaluations - self.num_proposed)
+		if self.finished or num_points <= 0: return []
+		num_random = min(max(self.num_initial - self.surrogate.get_num_observations() - len(self.in_flight), 0), num_points)
+		if self.surrogate.get_num_observations() == 0:
+			num_random = num_points
+		points = list(self._draw_candidates(num_random))
+		if num_points > num_random:
+			points.extend(self._select_batch(num_points - num_random))
+
+		proposals = []
+		for x in points:
+			self.in_flight[self.num_proposed] = x
+			proposals.append((self.num_proposed, x))
+			self.num_proposed += 1
+		return proposals
+
+
+	def tell(self, point_id, loss, gradient = None):
+		if not point_id in self.in_flight: return
+		self._observe(self.in_flight.pop(point_id), loss)
+		self.num_evaluated += 1
+		self.finished = self.num_evaluated >= self.max_evaluations
+
+#====================================================
+
+class GridSweep(AskTellOptimizer):
+	"""
+		Exhaustive sweep over a regular grid. Grid points are enumerated lazily in chunks and handed out
+		as soon as points in flight are evaluated, at most batch_size at a time.
+
+		Progress is recorded in a checkpoint file every checkpoint_interval results and at the end of the
+		sweep: the index below which all points have been evaluated and the evaluated indices above it.
+		A sweep started with an existing checkpoint of the same grid continues from there, points which
+		were in flight or evaluated after the last checkpoint are evaluated again.
+
+		Parameters:
+			axes: list               | grid values along each axis
+			batch_size: int          | maximum number of points in flight
+			max_points: int          | (optional) number of grid points to evaluate, in grid order (default: all)
+			entry_axes: list         | (optional) axis each entry of a point takes its value from, entries
+			                           sharing an axis are tied together (default: one axis per entry)
+			checkpoint_file: str     | (optional) pickle file to resume from and to record progress in
+			checkpoint_interval: int | number of results between two checkpoints
+	"""
+
+	def __init__(self, axes, batch_size, max_points = None, entry_axes = None, checkpoint_file = None, checkpoint_interval = 100):
+		AskTellOptimizer.__init__(self)
+		self.axes            = [np.array(axis, dtype = np.float64) for axis in axes]
+		self.shape           = tuple([len(axis) for axis in self.axes])
+		self.num_points      = int(np.prod(self.shape)) if max_points is None else min(int(np.prod(self.shape)), int(max_points))
+		self.batch_size      = max(int(batch_size), 1)
+		self.entry_axes      = np.arange(len(self.axes)) if entry_axes is None else np.array(entry_axes, dtype = int)
+		self.checkpoint_file = checkpoint_file
+		self.checkpoint_interval = max(int(checkpoint_interval), 1)
+		self.num_unsaved         = 0
+		self.completed_index = 0
+		self.completed       = set()
+		self.in_flight       = {}
+		self.queue           = deque()
+		self.best_x          = None
+		self.best_loss       = np.inf
+		self._load_checkpoint()
+		self.chunks          = iterate_grid(self.axes, start = self.completed_index, stop = self.num_points, chunk_size = max(self.batch_size, 1024))
+		self.finished        = self.completed_index >= self.num_points
+
+
+	def _load_checkpoint(self):
+		if self.checkpoint_file is None or not os.path.isfile(self.checkpoint_file): return
+		with open(self.checkpoint_file, 'rb') as content:
+			checkpoint = pickle.load(content)
+		if checkpoint['shape'] != self.shape or checkpoint.get('num_points', None) != self.num_points:
+			print('# WARNING | ... checkpoint %s belongs to a different grid, starting over ...' % self.checkpoint_file)
+			return
+		self.completed_index = checkpoint['completed_index']
+		self.completed       = set(checkpoint['completed'])
+		print('# LOG | ... resuming grid sweep at %d (%d) ...' % (self.completed_index, self.num_points))
+
+
+	def _save_checkpoint(self):
+		self.num_unsaved = 0
+		if self.checkpoint_file is None: return
+		checkpoint = {'shape': self.shape, 'num_points': self.num_points, 'completed_index': self.completed_index, 'completed': sorted(self.completed)}
+		dir_name   = os.path.dirname(os.path.abspath(self.checkpoint_file))
+		handle, temp_name = tempfile.mkstemp(dir = dir_name, suffix = '.tmp')
+		with os.fdopen(handle, 'wb') as content:
+			pickle.dump(checkpoint, content)
+		os.replace(temp_name, self.checkpoint_file)
+
+
+	def ask(self):
+		proposals = []
+		while len(self.in_flight) < self.batch_size:
+			if len(self.queue) == 0:
+				try:
+					indices, points = next(self.chunks)
+				except StopIteration:
+					break
+				self.queue.extend([(index, point) for index, point in zip(indices, points) if not index in self.completed])
+				continue
+			index, point = self.queue.popleft()
+			x = point[self.entry_axes]
+			self.in_flight[int(index)] = x
+			proposals.append((int(index), x))
+		return proposals
+
+
+	def tell(self, point_id, loss, gradient = None):
+		if not point_id in self.in_flight: return
+		x = self.in_flight.pop(point_id)
+		if loss < self.best_loss:
+			self.best_x, self.best_loss = x, loss
+
+		# advance the index below which all points are evaluated
+		self.completed.add(point_id)
+		while self.completed_index in self.completed:
+			self.completed.remove(self.completed_index)
+			self.completed_index += 1
+		self.finished     = self.completed_index >= self.num_points
+		self.num_unsaved += 1
+		if self.finished or self.num_unsaved >= self.checkpoint_interval:
+			self._save_checkpoint()
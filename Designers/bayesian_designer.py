@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+#====================================================
+
+import numpy as np
+
+from Designers            import AbstractDesigner
+from Designers.ask_tell   import BayesianOptimizer
+
+#====================================================
+
+class BayesianDesigner(AbstractDesigner):
+
+	USES_ASK_TELL = True
+	# flux offsets are not modeled by the surrogate
+	DRAWS_PHIOFFS = True
+
+	optimizer_name = 'Bayesian'
+
+	# number of circuits in flight (default: max_concurrent)
+	batch_size     = None
+	# number of candidate circuits the acquisition function is evaluated on for each batch
+	num_candidates = 512
+	# acquisition function: 'ei' or 'lcb'
+	acquisition    = 'ei'
+
+	def __init__(self, general_settings, param_settings, options, *args, **kwargs):
+
+		AbstractDesigner.__init__(self, general_settings, param_settings, options)
+
+
+	def _losses_received(self, sim_id, point_id):
+		optimizer = self.optimizers[sim_id]
+		self.sim_info_dicts[sim_id]['task_id_index'] = optimizer.num_evaluated // optimizer.batch_size
+
+
+	def _sample_candidates(self, num_points):
+		# random circuits respect the sparsity settings of the component specs
+		circuits = self._design_random_circuits(num_points)
+		return np.array([self._construct_array_from_dict(circuit)[0] for circuit in circuits])
+
+
+	def _get_prior_observations(self, observations):
+		points, losses = [], []
+		for observation in observations:
+			if not 'loss' in observation: continue
+			x = self._construct_array_from_dict(observation)[0]
+			if len(x) != len(self.bounds): continue
+			points.append(x)
+			losses.append(observation['loss'])
+		return points, losses
+
+
+	def prepare_optimizer_instances(self, task_ids, observations):
+		# a single surrogate covers the entire parameter space, prior observations are its training data
+		x_init = self._construct_array_from_dict(self._design_random_circuit())[0]
+		self._register_instance(task_ids, 0, x_init, np.ones(len(x_init)))
+
+
+	def create_optimizer(self, sim_info_dict, settings, observations):
+		batch_size = self.batch_size
+		if batch_size is None:
+			max_concurrent = settings.get('max_concurrent', np.inf)
+			batch_size     = 1 if np.isinf(max_concurrent) else int(max_concurrent)
+		return BayesianOptimizer(self.bounds[:, 0], self.bounds[:, 1], settings['max_iters'], batch_size,
+								 sample_candidates = self._sample_candidates,
+								 observations = self._get_prior_observations(observations),
+								 num_candidates = self.num_candidates, acquisition = self.acquisition)
+
+
+#====================================================
@@ -8,6 +8,7 @@ import pickle
 
 from Utilities import FileLogger
 from Utilities.decorators import thread
+from Utilities.events     import NOTIFIER
 
 #========================================================================
 
@@ -23,6 +24,7 @@ class CircuitDesigner(object):
 	def __init__(self, settings_general, settings_params):
 
 		self.designers        = {}
+		self.task_set_ids     = {}
 		self.settings_general = settings_general
 		self.settings_params  = settings_params
 
@@ -34,6 +36,12 @@ class CircuitDesigner(object):
 			from Designers import ScipyMinimizeDesigner as SelectedDesigner
 		elif keyword == 'random':
 			from Designers import RandomDesigner as SelectedDesigner
+		elif keyword == 'CMAES':
+			from Designers import CMAESDesigner as SelectedDesigner
+		elif keyword in ['phoenics', 'bayesian']:
+			from Designers import BayesianDesigner as SelectedDesigner
+		elif keyword == 'grid':
+			from Designers import GridDesigner as SelectedDesigner
 		else:
 			raise NotImplementedError()
 
@@ -45,6 +53,11 @@ class CircuitDesigner(object):
 		self.designers[name_id] = SelectedDesigner(self.settings_general, self.settings_params, options, kind = keyword)
 
 
+	def get_num_primer_tasks(self, task_set):
+		designer = self.designers[task_set.settings['name']]
+		return designer.get_num_primer_tasks(task_set.settings['designer_options'])
+
+
 	def is_busy(self, task_set_dict):
 		name_id = task_set_dict.settings['name']
 		return self.designers[name_id].is_busy()
@@ -74,7 +87,7 @@ class CircuitDesigner(object):
 			conditions = pickle.load(open(conditions_file, 'rb'))
 		if len(conditions[0]) > 0:
 			for condition in conditions:
-				condition_dict = {'circuit_values': condition}
+				condition_dict = {'circuit_values': condition, 'task_set_id': self.task_set_ids[self.ACTIVE_DESIGNERS[job_id]]}
 				self.DESIGNED_CIRCUITS.append(condition_dict)
 
 		# clean up
@@ -82,6 +95,7 @@ class CircuitDesigner(object):
 		self.designers[self.ACTIVE_DESIGNERS[job_id]].set_available()
 		del self.ACTIVE_DESIGNERS[job_id]
 		del self.FILE_LOGGERS[job_id]
+		NOTIFIER.notify('designer')
 
 
 	def get_requested_tasks(self, task_set):
@@ -97,6 +111,9 @@ class CircuitDesigner(object):
 	def provide_observations(self, task_set, observations): 
 		self.OBSERVATION_CONTAINER[task_set.settings['name']] = observations
 		designer = self.designers[task_set.settings['name']]
+		if designer.USES_ASK_TELL:
+			self._ask_and_tell(designer, task_set, observations)
+			return
 		for observation in observations:
 			if not 'circuit_id' in observation: continue
 			if isinstance(observation['circuit_id'], dict):
@@ -104,31 +121,69 @@ class CircuitDesigner(object):
 			designer.RECEIVED_OBSERVATIONS[observation['circuit_id']] = observation
 
 
+	def _ask_and_tell(self, designer, task_set, observations):
+		# reported losses advance the optimizers, which may then propose new circuits right away
+		designer.tell(observations)
+		circuits = designer.ask()
+		for circuit in circuits:
+			self.DESIGNED_CIRCUITS.append({'circuit_values': circuit, 'task_set_id': task_set.task_set_id})
+		if len(circuits) > 0:
+			NOTIFIER.notify('designer')
+
+
 	def designer_terminated(self, task_set):
-		if hasattr(self.designers[task_set.settings['name']], 'SCIPY_OPTIMIZERS_FINISHED'):
-			result = True
-			for index, element in self.designers[task_set.settings['name']].SCIPY_OPTIMIZERS_FINISHED.items():
-				result = result and element 
-			return result
-		if hasattr(self.designers[task_set.settings['name']], 'PS_OPTIMIZERS_FINISHED'):
-			result = True
-			for index, element in self.designers[task_set.settings['name']].PS_OPTIMIZERS_FINISHED.items():
-				result = result and element 
-			return result
-		else:
-			return self.designers[task_set.settings['name']].OPTIMIZERS_FINISHED
+		designer = self.designers[task_set.settings['name']]
+		if designer.USES_ASK_TELL:
+			return designer.optimizers_finished()
+		return designer.OPTIMIZERS_FINISHED
+
+
+	def close_designer(self, task_set):
+		designer = self.designers[task_set.settings['name']]
+		if designer.USES_ASK_TELL:
+			designer.close_optimizers()
+
+
+	def close(self):
+		for designer in self.designers.values():
+			if designer.USES_ASK_TELL:
+				designer.close_optimizers()
+
+
+	def _design_in_memory(self, designer, task_set, num_circuits):
+		circuits = designer.design_circuits(num_circuits)
+		for circuit in circuits:
+			self.DESIGNED_CIRCUITS.append({'circuit_values': circuit, 'task_set_id': task_set.task_set_id})
+		designer.set_available()
+		NOTIFIER.notify('designer')
 
 
 	@thread
-	def design_new_circuits(self, task_set, observations = None, tasks = None):
+	def design_new_circuits(self, task_set, observations = None, tasks = None, num_circuits = None):
 		start = time.time()
-		if observations: self.provide_observations(task_set, observations)
 
 		# reserve designer
 		name_id  = task_set.settings['name']
 		designer = self.designers[name_id]
+		self.task_set_ids[name_id] = task_set.task_set_id
+		if observations and not designer.USES_ASK_TELL: self.provide_observations(task_set, observations)
 		designer.set_busy()
 
+		# optimizers are created on first demand and advanced on this thread, they never block
+		if designer.USES_ASK_TELL:
+			observations = observations or []
+			with designer.ask_tell_lock:
+				if not designer.is_initialized():
+					designer.initialize_optimizers(task_set, copy.deepcopy(observations))
+			self._ask_and_tell(designer, task_set, observations)
+			designer.set_available()
+			return
+
+		# designers which do not depend on observations skip the conditions file
+		if getattr(designer, 'DESIGNS_IN_MEMORY', False):
+			self._design_in_memory(designer, task_set, num_circuits)
+			return
+
 		# create circuit listener
 		job_id      = str(uuid.uuid4())
 		self.ACTIVE_DESIGNERS[job_id]   = name_id
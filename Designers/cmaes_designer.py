@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+#====================================================
+
+import numpy as np
+
+from Designers            import AbstractDesigner
+from Designers.ask_tell   import CMAESOptimizer
+
+#====================================================
+
+class CMAESDesigner(AbstractDesigner):
+
+	USES_ASK_TELL = True
+
+	# population size of the first run of each optimizer (default: sized to max_concurrent)
+	popsize  = None
+	# initial step size relative to the width of the bounds
+	sigma0   = 0.3
+	# restart strategy: 'ipop', 'bipop' or None
+	restarts = 'bipop'
+
+	optimizer_name = 'CMA-ES'
+
+	def __init__(self, general_settings, param_settings, options, *args, **kwargs):
+
+		AbstractDesigner.__init__(self, general_settings, param_settings, options)
+
+
+	def _losses_received(self, sim_id, point_id):
+		self.sim_info_dicts[sim_id]['task_id_index'] = self.optimizers[sim_id].generation
+
+
+	def get_popsize(self, max_concurrent):
+		# generations of all optimizers together fill the available worker slots
+		if self.popsize is not None:
+			return self.popsize
+		if np.isinf(max_concurrent):
+			return None
+		return max(int(max_concurrent) // max(len(self.running_instance_ids), 1), 2)
+
+
+	def create_optimizer(self, sim_info_dict, settings, observations):
+		popsize = self.get_popsize(settings.get('max_concurrent', np.inf))
+		bounds  = sim_info_dict['bounds_squeezed']
+		return CMAESOptimizer(sim_info_dict['x_init_squeezed'], bounds[:, 0], bounds[:, 1], settings['max_iters'],
+							  popsize = popsize, sigma0 = self.sigma0, restarts = self.restarts)
+
+
+#====================================================
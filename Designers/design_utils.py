@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+""" Utilities shared by designers, validator and submitter for handling circuit parameter arrays """
+
+import warnings
+import itertools
+import numpy as np
+
+try:
+	from scipy.stats import qmc
+except ImportError:
+	qmc = None
+
+#====================================================
+
+# circuit values which are stored as flattened upper triangular matrices over the circuit nodes
+COMPONENT_KEYS = ['capacities', 'junctions', 'inductances']
+
+# 4-node circuits have no connection between nodes 2 and 4 (zero-based 1 and 3)
+FORBIDDEN_PAIRS = {4: (1, 3)}
+
+# solvers whose output does not depend on the labeling of the circuit nodes; JJcircuitSimV3 sweeps
+# the flux through the first biased loop, which is chosen by node labels
+LABEL_INVARIANT_SOLVERS = ['2-node']
+
+# strategies for drawing points in the unit hypercube
+SAMPLING_METHODS = ['uniform', 'latin_hypercube', 'sobol']
+
+_PERMUTATIONS = {}
+_INDEX_MAPS   = {}
+
+#====================================================
+
+def get_num_nodes(num_entries):
+	# number of nodes n of a flattened upper triangular matrix (with diagonal) of length n(n+1)/2
+	return int(np.sqrt(2 * num_entries + 0.25) - 0.5)
+
+
+def get_node_permutations(num_nodes):
+	"""
+		Node relabelings which map circuits onto equivalent circuits. For 4-node circuits only those
+		relabelings are allowed which keep the forbidden 2-4 connection in place.
+	"""
+	if not num_nodes in _PERMUTATIONS:
+		permutations = []
+		for permutation in itertools.permutations(range(num_nodes)):
+			if num_nodes in FORBIDDEN_PAIRS:
+				node_0, node_1 = FORBIDDEN_PAIRS[num_nodes]
+				if set([permutation[node_0], permutation[node_1]]) != set([node_0, node_1]): continue
+			permutations.append(np.array(permutation))
+		_PERMUTATIONS[num_nodes] = permutations
+	return _PERMUTATIONS[num_nodes]
+
+
+def get_triu_index_maps(num_nodes):
+	"""
+		Index arrays which relabel flattened upper triangular matrices, i.e. array[index_map] is the
+		flattened matrix of the relabeled circuit for each allowed node permutation.
+	"""
+	if not num_nodes in _INDEX_MAPS:
+		rows, cols = np.triu_indices(num_nodes)
+		positions  = np.zeros((num_nodes, num_nodes), dtype = np.int64)
+		positions[rows, cols] = np.arange(len(rows))
+		index_maps = []
+		for permutation in get_node_permutations(num_nodes):
+			new_rows, new_cols = permutation[rows], permutation[cols]
+			index_maps.append(positions[np.minimum(new_rows, new_cols), np.maximum(new_rows, new_cols)])
+		_INDEX_MAPS[num_nodes] = np.array(index_maps)
+	return _INDEX_MAPS[num_nodes]
+
+
+def is_permutation_invariant(circuit_values):
+	# relabeling nodes can change which loop receives which flux offset; only uniform offsets are safe
+	phiOffs = circuit_values.get('phiOffs', None)
+	if phiOffs is None: return True
+	phiOffs = np.array(phiOffs, dtype = np.float64).flatten()
+	return len(phiOffs) == 0 or np.all(phiOffs == phiOffs[0])
+
+
+def canonicalize_circuit(circuit_values):
+	"""
+		Maps a circuit onto the representative of its class of node relabelings, i.e. the relabeling with
+		the lexicographically smallest concatenated (capacities, junctions, inductances) array.
+
+		Parameters:
+			circuit_values: dict | capacities, junctions, inductances (may be None) and phiOffs of a circuit
+
+		Returns:
+			canonical_values: dict | copy of circuit_values with relabeled component arrays
+			canonical_key: bytes   | identical for all equivalent circuits
+	"""
+	canonical_values = dict(circuit_values)
+	arrays = [np.array(circuit_values[key], dtype = np.float64) for key in COMPONENT_KEYS if circuit_values.get(key, None) is not None]
+	if not is_permutation_invariant(circuit_values):
+		return canonical_values, np.concatenate(arrays).tobytes()
+
+	# all relabelings at once, rows are compared lexicographically with the first column as primary key
+	index_maps = get_triu_index_maps(get_num_nodes(len(arrays[0])))
+	candidates = np.concatenate([array[index_maps] for array in arrays], axis = 1)
+	best_index = np.lexsort(candidates.T[::-1])[0]
+	best_arrays = [array[index_maps[best_index]] for array in arrays]
+
+	array_index = 0
+	for key in COMPONENT_KEYS:
+		if circuit_values.get(key, None) is None: continue
+		canonical_values[key] = best_arrays[array_index]
+		array_index += 1
+	return canonical_values, np.concatenate(best_arrays).tobytes()
+
+
+def get_canonical_key(circuit_values):
+	return canonicalize_circuit(circuit_values)[1]
+
+
+def get_exact_key(circuit_values):
+	# identical only for identical component arrays and flux offsets
+	arrays  = [np.array(circuit_values[key], dtype = np.float64).flatten() for key in COMPONENT_KEYS if circuit_values.get(key, None) is not None]
+	phiOffs = circuit_values.get('phiOffs', None)
+	if phiOffs is not None:
+		arrays.append(np.array(phiOffs, dtype = np.float64).flatten())
+	return np.concatenate(arrays).tobytes()
+
+#====================================================
+
+class UnitCubeSampler(object):
+	"""
+		Draws batches of points in the unit hypercube. Sobol sequences are continued across batches,
+		latin hypercubes are stratified within each batch.
+
+		Parameters:
+			num_dims: int  | dimension of the hypercube
+			sampling: str  | one of SAMPLING_METHODS
+			seed: int      | (optional) seed of the sampler
+	"""
+
+	def __init__(self, num_dims, sampling = 'uniform', seed = None):
+		if not sampling in SAMPLING_METHODS:
+			raise NotImplementedError('unknown sampling method %s' % sampling)
+		if sampling == 'sobol' and qmc is None:
+			print('# WARNING | ... sobol sampling requires scipy >= 1.7, using latin hypercube sampling instead ...')
+			sampling = 'latin_hypercube'
+		self.num_dims = num_dims
+		self.sampling = sampling
+		self.random   = np.random if seed is None else np.random.RandomState(seed)
+		if self.sampling == 'sobol':
+			self.sobol = qmc.Sobol(d = max(num_dims, 1), scramble = True, seed = seed)
+
+
+	def draw(self, num_samples):
+		if self.sampling == 'uniform':
+			return self.random.uniform(0., 1., (num_samples, self.num_dims))
+		elif self.sampling == 'latin_hypercube':
+			strata = np.argsort(self.random.uniform(0., 1., (self.num_dims, num_samples)), axis = 1).T
+			return (strata + self.random.uniform(0., 1., (num_samples, self.num_dims))) / num_samples
+		elif self.sampling == 'sobol':
+			# batch sizes follow the free worker slots and are rarely powers of two
+			with warnings.catch_warnings():
+				warnings.simplefilter('ignore')
+				return self.sobol.random(num_samples)[:, :self.num_dims]
+
+#====================================================
+
+def iterate_grid(axes, start = 0, stop = None, chunk_size = 1024):
+	"""
+		Enumerates the points of a regular grid in chunks, without holding the grid in memory.
+
+		Parameters:
+			axes: list       | grid values along each axis, the last axis varies fastest
+			start: int       | index of the first point
+			stop: int        | (optional) index after the last point (default: end of the grid)
+			chunk_size: int  | number of points per chunk
+
+		Yields:
+			indices: np.ndarray | flat indices of the points in the chunk
+			points: np.ndarray  | (chunk_size, num_axes) grid points
+	"""
+	axes       = [np.array(axis, dtype = np.float64) for axis in axes]
+	shape      = tuple([len(axis) for axis in axes])
+	num_points = int(np.prod(shape)) if stop is None else min(int(np.prod(shape)), stop)
+	for chunk_start in range(start, num_points, chunk_size):
+		indices = np.arange(chunk_start, min(chunk_start + chunk_size, num_points))
+		points  = np.zeros((len(indices), len(axes)))
+		for axis_index, axis_indices in enumerate(np.unravel_index(indices, shape)):
+			points[:, axis_index] = axes[axis_index][axis_indices]
+		yield indices, points
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+""" Gaussian process surrogate which is updated incrementally as losses arrive """
+
+import numpy as np
+
+from scipy.linalg   import cho_solve, solve_triangular
+from scipy.optimize import minimize as sp_minimize
+
+#====================================================
+
+class GaussianProcess(object):
+	"""
+		Gaussian process regression with an anisotropic Matern 5/2 kernel on points in the unit hypercube.
+		New observations extend the Cholesky factor of the kernel matrix by one row, which costs O(n^2)
+		instead of the O(n^3) of a new factorization. Hyperparameters are fitted to the marginal likelihood
+		only when the number of observations has grown by refit_factor since the last fit, the factor is
+		then computed from scratch.
+
+		Losses are standardized before they enter the model. Losses of failed evaluations (MAX_LOSS) would
+		dominate the fit and are replaced by the worst regular loss.
+
+		Parameters:
+			num_dims: int        | dimension of the points
+			refit_factor: float  | relative growth of the data set which triggers a hyperparameter fit
+			min_refit: int       | number of observations before the first hyperparameter fit
+	"""
+
+	MAX_LOSS = 10**6
+	JITTER   = 1e-8
+
+	# bounds of the log hyperparameters: length scales, amplitude and noise
+	LENGTH_BOUNDS    = (np.log(1e-2), np.log(1e1))
+	AMPLITUDE_BOUNDS = (np.log(5e-2), np.log(2e1))
+	NOISE_BOUNDS     = (np.log(1e-4), np.log(1e0))
+
+	def __init__(self, num_dims, refit_factor = 1.5, min_refit = 8):
+		self.num_dims      = num_dims
+		self.refit_factor  = refit_factor
+		self.next_refit    = min_refit
+		self.log_lengths   = np.zeros(num_dims) + np.log(0.3)
+		self.log_amplitude = 0.
+		self.log_noise     = np.log(1e-2)
+		self.X             = np.zeros((0, num_dims))
+		self.losses        = np.zeros(0)
+		self.L             = np.zeros((0, 0))
+		self.alpha         = None
+
+
+	def get_num_observations(self):
+		return len(self.losses)
+
+
+	def _kernel(self, X1, X2, log_lengths, log_amplitude):
+		scaled_diffs = (X1[:, None, :] - X2[None, :, :]) / np.exp(log_lengths)
+		dists        = np.sqrt(5. * np.sum(scaled_diffs**2, axis = 2))
+		return np.exp(2. * log_amplitude) * (1. + dists + dists**2 / 3.) * np.exp(-dists)
+
+
+	def kernel(self, X1, X2):
+		return self._kernel(X1, X2, self.log_lengths, self.log_amplitude)
+
+
+	def prior_variance(self):
+		return np.exp(2. * self.log_amplitude)
+
+
+	def _targets(self):
+		losses  = np.array(self.losses)
+		regular = losses < self.MAX_LOSS
+		if np.any(regular):
+			losses = np.minimum(losses, np.amax(losses[regular]))
+		std = np.std(losses)
+		if std <= 0.: std = 1.
+		return (losses - np.mean(losses)) / std
+
+
+	def add(self, x, loss):
+		"""
+			Parameters:
+				x: np.ndarray | observed point
+				loss: float   | observed loss
+		"""
+		x = np.array(x, dtype = np.float64)
+		self.X      = np.concatenate([self.X, x[None, :]])
+		self.losses = np.append(self.losses, loss)
+		self.alpha  = None
+		if len(self.losses) >= self.next_refit:
+			self.next_refit = int(np.ceil(self.refit_factor * len(self.losses)))
+			self.fit()
+			return
+
+		# append one row to the Cholesky factor
+		cross = self.kernel(self.X[:-1], x[None, :])[:, 0]
+		row   = solve_triangular(self.L, cross, lower = True) if len(cross) > 0 else cross
+		diag  = self.prior_variance() + np.exp(2. * self.log_noise) + self.JITTER - np.dot(row, row)
+		L     = np.zeros((len(self.losses), len(self.losses)))
+		L[:-1, :-1] = self.L
+		L[-1, :-1]  = row
+		L[-1, -1]   = np.sqrt(max(diag, self.JITTER))
+		self.L = L
+
+
+	def _factorize(self, log_lengths, log_amplitude, log_noise):
+		K = self._kernel(self.X, self.X, log_lengths, log_amplitude)
+		K[np.diag_indices_from(K)] += np.exp(2. * log_noise) + self.JITTER
+		return K, np.linalg.cholesky(K)
+
+
+	def _negative_log_likelihood(self, params, targets):
+		log_lengths, log_amplitude, log_noise = params[:self.num_dims], params[self.num_dims], params[self.num_dims + 1]
+		try:
+			K, L = self._factorize(log_lengths, log_amplitude, log_noise)
+		except np.linalg.LinAlgError:
+			return 1e10, np.zeros(len(params))
+		alpha = cho_solve((L, True), targets)
+		value = 0.5 * np.dot(targets, alpha) + np.sum(np.log(np.diag(L)))
+
+		# gradient from 0.5 tr((K^-1 - alpha alpha^T) dK)
+		W        = cho_solve((L, True), np.eye(len(targets))) - np.outer(alpha, alpha)
+		gradient = np.zeros(len(params))
+		scaled_diffs = (self.X[:, None, :] - self.X[None, :, :]) / np.exp(log_lengths)
+		dists    = np.sqrt(5. * np.sum(scaled_diffs**2, axis = 2))
+		radial   = np.exp(2. * log_amplitude) * 5. / 3. * (1. + dists) * np.exp(-dists)
+		for dim in range(self.num_dims):
+			gradient[dim] = 0.5 * np.sum(W * radial * scaled_diffs[:, :, dim]**2)
+		noise_variance = np.exp(2. * log_noise)
+		gradient[self.num_dims]     = np.sum(W * (K - np.eye(len(targets)) * (noise_variance + self.JITTER)))
+		gradient[self.num_dims + 1] = np.trace(W) * noise_variance
+		return value, gradient
+
+
+	def fit(self):
+		""" fits the hyperparameters to the marginal likelihood and refactorizes the kernel matrix """
+		targets = self._targets()
+		params  = np.concatenate([self.log_lengths, [self.log_amplitude, self.log_noise]])
+		bounds  = [self.LENGTH_BOUNDS for _ in range(self.num_dims)] + [self.AMPLITUDE_BOUNDS, self.NOISE_BOUNDS]
+		try:
+			res = sp_minimize(self._negative_log_likelihood, params, args = (targets,), jac = True, method = 'L-BFGS-B',
+							  bounds = bounds, options = {'maxiter': 100})
+			if np.all(np.isfinite(res.x)) and res.fun < self._negative_log_likelihood(params, targets)[0]:
+				params = res.x
+		except (np.linalg.LinAlgError, ValueError):
+			pass
+		self.log_lengths, self.log_amplitude, self.log_noise = params[:self.num_dims], params[self.num_dims], params[self.num_dims + 1]
+		self.L     = self._factorize(self.log_lengths, self.log_amplitude, self.log_noise)[1]
+		self.alpha = None
+
+
+	def predict(self, points):
+		"""
+			Parameters:
+				points: np.ndarray | (m, num_dims) points
+
+			Returns:
+				mean: np.ndarray | posterior means of the standardized losses
+				V: np.ndarray    | (n, m) array L^-1 k(X, points), the posterior covariance of two points
+				                   a and b is k(a, b) - V[:, a] V[:, b]
+		"""
+		if len(self.losses) == 0:
+			return np.zeros(len(points)), np.zeros((0, len(points)))
+		if self.alpha is None:
+			self.alpha = cho_solve((self.L, True), self._targets())
+		cross = self.kernel(self.X, points)
+		return np.dot(cross.T, self.alpha), solve_triangular(self.L, cross, lower = True)
+
+
+	def best_target(self):
+		return np.amin(self._targets())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+#====================================================
+
+import os
+import numpy as np
+
+from Designers            import AbstractDesigner
+from Designers.ask_tell   import GridSweep
+from Utilities.events     import NOTIFIER
+
+#====================================================
+
+class GridDesigner(AbstractDesigner):
+
+	USES_ASK_TELL = True
+	# flux offsets are not part of the grid
+	DRAWS_PHIOFFS = True
+
+	optimizer_name = 'grid'
+
+	# grid points per entry of the combined (c, j, l) array, 0 switches an entry off and a single point
+	# takes the lower bound; an int applies to all entries
+	num_points          = 10
+	# groups of entries which share their values, e.g. [[0, 2], [3, 5]] for symmetric 2-node circuits
+	tied                = []
+	# number of circuits in flight (default: max_concurrent)
+	batch_size          = None
+	# progress of the sweep (default: grid_<task name>.pkl in the scratch directory)
+	checkpoint_file     = None
+	# number of results between two checkpoints
+	checkpoint_interval = 100
+
+	def __init__(self, general_settings, param_settings, options, *args, **kwargs):
+
+		AbstractDesigner.__init__(self, general_settings, param_settings, options)
+
+		# max_iters caps the sweep, the first max_iters grid points are evaluated
+		self.grid  = self.construct_grid()
+		num_points = int(np.prod([len(axis) for axis in self.grid[0]]))
+		if options.get('max_iters', num_points) > num_points:
+			raise ValueError('max_iters (%d) exceeds the number of grid points (%d)' % (options['max_iters'], num_points))
+
+
+	def _proposals_made(self, sim_id, proposals):
+		# grid indices are unique, hence they also serve as execution indices
+		info_dict = self.sim_info_dicts[sim_id]
+		for point_id, point in proposals:
+			self._append_task(info_dict, info_dict['task_ids'][0], point_id + 1)
+		NOTIFIER.notify('designer')
+
+
+	def _get_forbidden_entries(self):
+		# Case of 4-node circuit: forbidden connection 2-4 in each component array
+		forbidden, offset = [], 0
+		for specs in [self.c_specs, self.j_specs, self.l_specs]:
+			if specs is None: continue
+			if specs['dimension'] == 9:
+				forbidden.append(offset + 6)
+				offset += 1
+			offset += specs['dimension']
+		return forbidden
+
+
+	def construct_grid(self):
+		"""
+			Returns:
+				axes: list            | grid values along each axis
+				entry_axes: list      | axis of each entry which is switched on
+				x_mask: np.ndarray    | entries of the combined array which are switched on
+		"""
+		num_entries = len(self.bounds)
+		counts      = np.zeros(num_entries, dtype = int) + self.num_points if np.isscalar(self.num_points) else np.array(self.num_points, dtype = int)
+		counts[self._get_forbidden_entries()] = 0
+		roots = {}
+		for group in self.tied:
+			for entry in group:
+				roots[entry] = group[0]
+
+		axes, root_axes, entry_axes = [], {}, []
+		x_mask = np.zeros(num_entries)
+		for entry in range(num_entries):
+			root = roots.get(entry, entry)
+			if counts[root] == 0: continue
+			if not root in root_axes:
+				root_axes[root] = len(axes)
+				axes.append(np.linspace(self.bounds[root, 0], self.bounds[root, 1], counts[root]))
+			entry_axes.append(root_axes[root])
+			x_mask[entry] = 1.
+		return axes, entry_axes, x_mask
+
+
+	def _get_batch_size(self, designer_options):
+		if self.batch_size is not None:
+			return self.batch_size
+		max_concurrent = designer_options.get('max_concurrent', np.inf)
+		return 1 if np.isinf(max_concurrent) else int(max_concurrent)
+
+
+	def get_num_primer_tasks(self, designer_options):
+		# each proposed grid point requests its own task, primers only fill the first batch
+		return min(self._get_batch_size(designer_options), designer_options['max_iters'])
+
+
+	def prepare_optimizer_instances(self, task_ids, observations):
+		# the sweep covers the entire grid, observations are not used
+		axes, entry_axes, x_mask = self.grid
+		self._register_instance(task_ids, 0, np.zeros(len(x_mask)), x_mask)
+
+
+	def initialize_optimizers(self, task_set, observations):
+		if self.checkpoint_file is None:
+			self.checkpoint_file = os.path.join(self.general.scratch_dir, 'grid_%s.pkl' % task_set.settings['name'])
+		AbstractDesigner.initialize_optimizers(self, task_set, observations)
+
+
+	def create_optimizer(self, sim_info_dict, settings, observations):
+		axes, entry_axes, x_mask = self.grid
+		optimizer = GridSweep(axes, self._get_batch_size(settings), max_points = settings['max_iters'], entry_axes = entry_axes,
+							  checkpoint_file = self.checkpoint_file, checkpoint_interval = self.checkpoint_interval)
+		print('# LOG | ... initializing grid sweep over %d circuits ...' % optimizer.num_points)
+		return optimizer
+
+
+#====================================================
@@ -9,7 +9,7 @@ import threading
 import time
 
 from Designers import AbstractDesigner
-from Utilities.decorators import thread, delayed
+from Utilities.decorators import thread
 
 #====================================================
 
@@ -17,6 +17,9 @@ class RandomDesigner(AbstractDesigner):
 	
 	batch_size = 1
 
+	# circuits are handed to the circuit designer directly instead of through a conditions file
+	DESIGNS_IN_MEMORY = True
+
 	def __init__(self, general_settings, param_settings, options, *args, **kwargs):
 		# likely that we need to pass variable settings to designers
 		AbstractDesigner.__init__(self, general_settings, param_settings, options)
@@ -25,16 +28,22 @@ class RandomDesigner(AbstractDesigner):
 		self.OPTIMIZERS_FINISHED = True
 
 
-	@thread
-	@delayed(0.1)
-	def _draw_circuit(self, condition_file):
+	def design_circuits(self, num_circuits = None):
+		"""
+			Parameters:
+				num_circuits: int | (optional) number of free worker slots, batches are at least batch_size large
 
-		drawn_circuits = []
-		for batch_iteration in range(self.batch_size):
+			Returns:
+				circuits: list | circuit dictionaries drawn with the selected sampling method
+		"""
+		if num_circuits is None:
+			num_circuits = self.batch_size
+		return self._design_random_circuits(max(int(num_circuits), self.batch_size))
 
-			circuit = self._design_random_circuit()
-			drawn_circuits.append(circuit)
 
+	@thread
+	def _draw_circuit(self, condition_file):
+		drawn_circuits = self.design_circuits()
 		with open(condition_file, 'wb') as content:
 			pickle.dump(drawn_circuits, content)
 
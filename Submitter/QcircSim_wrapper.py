@@ -6,16 +6,22 @@
 from Submitter import solver_JJcircuitSimV3
 from Submitter import solver_2node
 
-def solve_circuit(solver, Carr, Larr, Jarr, phiExt=0, phiOffs=[0.5,0.5,0.5]):
+def solve_circuit(solver, Carr, Larr, Jarr, phiExt=0, phiOffs=[0.5,0.5,0.5], num_levels=None, truncation=6, gradients=False, work_dir='.'):
 
 	if solver == 'JJcircuitSimV3':
-		results = solver_JJcircuitSimV3(Carr, Larr, Jarr, fluxSweep=True, phiOffs=phiOffs)
+		results = solver_JJcircuitSimV3(Carr, Larr, Jarr, fluxSweep=True, phiOffs=phiOffs, work_dir=work_dir)
 
 	elif solver == '2-node':
 		# Larr must be None
-		eigenspec = solver_2node(Carr, Larr, Jarr, phiExt=phiExt, qExt=[0,0], n=6, normalized=True)
+		# num_levels switches to the sparse eigensolver, which only computes the lowest levels
 		timeout_bool = False
-		results = (eigenspec, timeout_bool) 
+		if gradients:
+			# eigenvalue derivatives with respect to [Carr, Jarr] are passed on as third entry
+			eigenspec, eigengrads = solver_2node(Carr, Larr, Jarr, phiExt=phiExt, qExt=[0,0], n=truncation, normalized=True, num_levels=num_levels, gradients=True)
+			results = (eigenspec, timeout_bool, eigengrads)
+		else:
+			eigenspec = solver_2node(Carr, Larr, Jarr, phiExt=phiExt, qExt=[0,0], n=truncation, normalized=True, num_levels=num_levels)
+			results = (eigenspec, timeout_bool) 
 
 	else:
 		raise NotImplementedError("Desired circuit solver '{}' not implemented".format(solver))
@@ -38,6 +38,29 @@ class AbstractSubmitter(object):
 			loss = np.nan
 		
 
+	def create_job_dict(self, circuit, job_id):
+		# circuits requested by merit functions come with their own evaluation function and parameters
+		job_name = 'job_%s' % job_id
+		if 'general_params' in circuit:
+			job_dict = {'evaluation_function': circuit['evaluation_function'],
+						'general_params':      circuit['general_params'],
+						'circuit':             circuit['circuit'],
+						'merit_re-eval':       True,
+						'task_set_id':         circuit.get('task_set_id', None),
+						'job_name':            job_name,}
+		else:
+			job_dict = {'evaluation_function': self.evaluation_function,
+						'general_params':      self.general_params,
+						'circuit':             circuit,
+						'job_name':            job_name,}
+		return job_dict
+
+
+	def close(self):
+		# submitters holding computing resources release them here
+		pass
+
+
 	def get_results(self):
 		results = copy.deepcopy(self.RECEIVED_RESULTS)
 		for result in results:
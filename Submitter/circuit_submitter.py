@@ -11,9 +11,12 @@ import threading
 
 from Submitter import LocalSubmitter
 from Submitter import solve_circuit
+from Submitter.execute        import store_results
+from Submitter.spectrum_cache import SpectrumCache, get_cache_key
 from Utilities import FileLogger
 
 from Utilities.decorators import thread
+from Utilities.events     import NOTIFIER
 
 #====================================================
 
@@ -36,6 +39,12 @@ class CircuitSubmitter(object):
         self.general_params = general_params
         self.submitters     = {}
 
+        # identical circuits are only solved once; general_params['spectrum_cache'] = False disables the cache
+        self.spectrum_cache = None
+        if self.general_params.get('spectrum_cache', True):
+            self.spectrum_cache = SpectrumCache(path = getattr(settings, 'spectrum_cache_dir', None),
+                                                max_entries = getattr(settings, 'spectrum_cache_size', 4096))
+
 
     def add_submitter(self, keyword):
         if not keyword in self.submitters:
@@ -53,6 +62,7 @@ class CircuitSubmitter(object):
             data = pickle.load(content)
 
         self.RECEIVED_RESULTS.append(data)
+        NOTIFIER.notify('submitter')
         os.remove(file_name)
         file_name = file_name.replace('proc_', '')
         os.remove(file_name)
@@ -77,7 +87,48 @@ class CircuitSubmitter(object):
         return submitter.is_available()
 
 
+    def _get_cache_key(self, job_dict):
+        return get_cache_key(job_dict['general_params'], job_dict['circuit']['circuit_values'])
+
+
+    def _submit_from_cache(self, submitter, circuit, job_id):
+        # on a cache hit the job is completed right away, without running the solver
+        if self.spectrum_cache is None: return False
+        job_dict = submitter.create_job_dict(circuit, job_id)
+        results  = self.spectrum_cache.get(self._get_cache_key(job_dict))
+        if results is None: return False
+        job_dict = store_results(job_dict, results)
+        job_dict['cache_hit'] = True
+        self.RECEIVED_RESULTS.append(job_dict)
+        NOTIFIER.notify('submitter')
+        return True
+
+
+    def _store_in_cache(self, computed_circuits):
+        if self.spectrum_cache is None: return
+        for computed_circuit in computed_circuits:
+            if computed_circuit.get('cache_hit', False): continue
+            results = computed_circuit['results']
+            # timeouts and failed simulations are not cached
+            if results[0] is None or results[1]: continue
+            self.spectrum_cache.put(self._get_cache_key(computed_circuit), results)
+
+
+    def get_cache_statistics(self):
+        if self.spectrum_cache is None: return {}
+        return self.spectrum_cache.get_statistics()
+
+
     def _submit(self, submitter, circuit, task_set, job_id):
+        if self._submit_from_cache(submitter, circuit, job_id):
+            self.successes[job_id] = True
+            return
+
+        # worker pool submitters hand back results directly
+        if getattr(submitter, 'USES_WORKER_POOL', False):
+            self.successes[job_id] = submitter.submit(circuit, task_set, job_id)
+            return
+
         file_logger = FileLogger(action = self.parse_calculation_results, path = self.settings.scratch_dir, pattern = '*job*%s*' % (job_id))
         self.FILE_LOGGERS[job_id] = file_logger
         file_logger.start()
@@ -99,8 +150,17 @@ class CircuitSubmitter(object):
         self.successes = {}
         job_ids, threads = [], []
 
+        # Case 0: queue submission to a worker pool is cheap, no need for submission threads
+        if getattr(submitter, 'USES_WORKER_POOL', False):
+            if type(circuits) == dict:
+                circuits = [circuits]
+            for circuit in circuits:
+                job_id = str(uuid.uuid4())
+                job_ids.append(job_id)
+                self._submit(submitter, circuit, task_set, job_id)
+
         # Case 1: there is just one circuit to be submitted (avoid enumerating dict entries)
-        if type(circuits) == dict:
+        elif type(circuits) == dict:
             circuit = circuits
             job_id = str(uuid.uuid4())
             job_ids.append(job_id)
@@ -123,8 +183,20 @@ class CircuitSubmitter(object):
 
 
     def get_computed_circuits(self):
+        # collect results handed back directly by the submitters
+        for submitter in self.submitters.values():
+            self.RECEIVED_RESULTS.extend(submitter.get_results())
+
         # return all results collected from prior submission
         computed_circuits = copy.deepcopy(self.RECEIVED_RESULTS)
         for computed_circuit in computed_circuits:
             self.RECEIVED_RESULTS.pop(0)
+        self._store_in_cache(computed_circuits)
         return computed_circuits
+
+
+    def close(self):
+        # shuts down the computing resources, e.g. the worker processes of the local submitter
+        for keyword, submitter in self.submitters.items():
+            submitter.close()
+        self.submitters = {}
@@ -1,79 +1,98 @@
-#!/usr/bin/env python 
+#!/usr/bin/env python
 
 """ Executes the circuit solver wrapper """
 
 import os
-import sys 
+import sys
 import uuid
-import pickle 
+import pickle
 import shutil
 
 sys.path.append(os.getcwd())
 
 #====================================================
 
-process_index = int(sys.argv[2])
+# solvers which exchange data with external programs through files in their working directory
+FILE_BASED_SOLVERS = ['JJcircuitSimV3']
 
 #====================================================
 
+def process_job(data, scratch_base = '.'):
+	"""
+		Runs the circuit solver wrapper on a job dictionary and stores the results in it
+
+		Parameters:
+			data: dict         | job dictionary with evaluation function, general parameters and circuit
+			scratch_base: str  | directory in which temporary solver directories are created
+
+		Returns:
+			data: dict | job dictionary with 'results' and 'measurements'
+	"""
+	function         = data['evaluation_function']
+	general_params   = data['general_params']
+	solver           = general_params['solver']
+	phiExt           = general_params['phiExt']
+	num_levels       = general_params.get('num_levels', None)
+	truncation       = general_params.get('truncation', 6)
+	gradients        = general_params.get('gradients', False)
+	params           = data['circuit']['circuit_values']
+	carr, jarr, larr = params['capacities'], params['junctions'], params['inductances']
+
+	kwargs = {'phiExt': phiExt, 'num_levels': num_levels, 'truncation': truncation, 'gradients': gradients}
+
+	# Pass flux offsets in other loops to simulator
+	if 'phiOffs' in params:
+		kwargs['phiOffs'] = params['phiOffs']
+
+	# File based solvers get their own scratch directory, the working directory of the process is left unchanged
+	scratch_dir = None
+	if solver in FILE_BASED_SOLVERS:
+		scratch_dir = os.path.join(scratch_base, '.scratch_dir_%s' % str(uuid.uuid4()))
+		os.mkdir(scratch_dir)
+		kwargs['work_dir'] = scratch_dir
+
+	# Circuit solver wrapper is called here
+	try:
+		result_dict = function(solver, carr, larr, jarr, **kwargs)
+	finally:
+		# Clean up
+		if scratch_dir is not None:
+			shutil.rmtree(scratch_dir, ignore_errors = True)
+
+	return store_results(data, result_dict)
+
+
+def store_results(data, result_dict):
+	"""
+		Stores the output of the circuit solver wrapper as results and measurements of a job dictionary
+	"""
+	data['results']  = result_dict
+	data['measurements'] = {'eigen_spectrum': data['results'][0], 'timeout': data['results'][1]}
+
+	# Save number of flux biases and maximum outer level pop if that information is available
+	if len(result_dict)==4:
+		data['measurements']['num_biases'] = data['results'][2]
+		data['measurements']['max_pop'] = data['results'][3]
+
+	# Save eigenvalue derivatives if the solver computed them
+	if len(result_dict)==3:
+		data['measurements']['eigen_gradients'] = data['results'][2]
+
+	return data
 
-job_id   = sys.argv[1].split('_')[-1].split('.')[0]
-
-# Load information about circuit, solver, sweep
-
-with open(sys.argv[1], 'rb') as content:
-	data = pickle.load(content)
-
-function         = data['evaluation_function']
-general_params   = data['general_params']
-solver           = general_params['solver']
-phiExt           = general_params['phiExt']
-params           = data['circuit']['circuit_values']
-carr, jarr, larr = params['capacities'], params['junctions'], params['inductances']
-
-# Pass flux offsets in other loops to simulator
-phiOffs_bool = False
-if 'phiOffs' in params:
-	phiOffs_bool = True
-	phiOffs = params['phiOffs']
-
-# Navigate into scratch directory before calling function
-scratch_dir = '.scratch_dir_%s' % str(uuid.uuid4())
-os.mkdir(scratch_dir)
-os.chdir(scratch_dir)
-
-# Circuit solver wrapper is called here
-if phiOffs_bool:
-	result_dict = function(solver, carr, larr, jarr, phiExt=phiExt, phiOffs=phiOffs)
-else:
-	result_dict = function(solver, carr, larr, jarr, phiExt=phiExt)
-os.chdir('../')
-
-data['results']  = result_dict
-data['measurements'] = {'eigen_spectrum': data['results'][0], 'timeout': data['results'][1]}
-
-# Save number of flux biases and maximum outer level pop if that information is available
-if len(result_dict)==4:
-	data['measurements']['num_biases'] = data['results'][2]
-	data['measurements']['max_pop'] = data['results'][3]
-
-processed_file_name = sys.argv[1].replace(job_id, 'proc_%s' % job_id)
-
-with open(processed_file_name, 'wb') as content:
-	pickle.dump(data, content)
-
-# Clean up 
-try:
-	shutil.rmtree(scratch_dir)
-except:
-	pass
-
-
-
-
-
+#====================================================
 
+if __name__ == '__main__':
 
+	process_index = int(sys.argv[2])
+	job_id        = sys.argv[1].split('_')[-1].split('.')[0]
 
+	# Load information about circuit, solver, sweep
+	with open(sys.argv[1], 'rb') as content:
+		data = pickle.load(content)
 
+	data = process_job(data)
 
+	processed_file_name = sys.argv[1].replace(job_id, 'proc_%s' % job_id)
+	with open(processed_file_name, 'wb') as content:
+		pickle.dump(data, content)
@@ -1,26 +1,24 @@
 #!/usr/bin/env python 
 
-""" Creates a subprocess to execute the circuit solver wrapper """
+""" Executes the circuit solver wrapper in a pool of persistent worker processes """
 
-### Toggle line 11, 29, 38 comments to switch between MacOS and Odyssey computing cluster ###
+### Toggle line 9, 26, 35 comments to switch between MacOS and Odyssey computing cluster ###
 
 #====================================================
 
-import os
-import pickle
 # import multiprocessing #comment for MacOS / uncomment for Odyssey
-import subprocess
-import uuid
+# import subprocess     #comment for MacOS / uncomment for Odyssey
 
-import numpy as np
-
-from Submitter import AbstractSubmitter
+from Submitter             import AbstractSubmitter
+from Submitter.worker_pool import WorkerPool
+from Utilities.events      import NOTIFIER
 
 #====================================================
 
 class LocalSubmitter(AbstractSubmitter):
 
-    FILE_LOGGERS = []
+    # results are handed back by the worker pool, no file loggers needed
+    USES_WORKER_POOL = True
 
 
     def __init__(self, settings, general_params, evaluation_function):
@@ -31,7 +29,7 @@ class LocalSubmitter(AbstractSubmitter):
         # print('NUM_CORES', self.num_cores)
         # print('\n\n')
         self.get_available_cpus()
-        self.next_process = {}
+        self.pool = WorkerPool(self.cpu_list, self._receive_result, scratch_base = self.settings.scratch_dir)
 	
     def get_available_cpus(self):
         scratch_name = 'scratch_file'
@@ -50,43 +48,20 @@ class LocalSubmitter(AbstractSubmitter):
         print('\n\nCPU_LIST: %s\n\n' % str(self.cpu_list))
 
 
-    def get_process_index(self, task_set):
-        task_name      = task_set.settings['name']
-        max_concurrent = task_set.settings['designer_options']['max_concurrent']
-
-        if not task_name in self.next_process:
-            next_process = self.cpu_list[0]
-            self.next_process[task_name] = 1
-        else:
-            next_process = self.cpu_list[self.next_process[task_name]]
-            self.next_process[task_name] = (self.next_process[task_name] + 1) % len(self.cpu_list)
-        return next_process
+    def _receive_result(self, data):
+        self.RECEIVED_RESULTS.append(data)
+        NOTIFIER.notify('submitter')
 
 
     def submit(self, circuit, task_set, job_id):
 
-        process_index = self.get_process_index(task_set)
-
-        job_name = 'job_%s' % job_id
-        if 'general_params' in circuit:
-            job_dict = {'evaluation_function': circuit['evaluation_function'],
-                        'general_params':      circuit['general_params'],
-                        'circuit':             circuit['circuit'],
-                        'merit_re-eval':       True,
-                        'job_name':            job_name,}
-        else:
-            job_dict = {'evaluation_function': self.evaluation_function,
-                        'general_params':      self.general_params,
-                        'circuit':             circuit,
-                        'job_name':            job_name,}
+        job_dict = self.create_job_dict(circuit, job_id)
 
-        file_name = '%s/%s.pkl' % (self.settings.scratch_dir, job_name)
-        with open(file_name, 'wb') as content:
-            pickle.dump(job_dict, content)
-
-        FNULL = open(os.devnull, 'w')
+        # idle workers pick up jobs from the shared queue
+        self.pool.submit(job_dict)
+        return True
 
-        subprocess.call('python Submitter/execute.py %s %d &' % (file_name, process_index), shell = True) #debug: show subprocess output
 
-        return True
+    def close(self):
+        self.pool.close()
 
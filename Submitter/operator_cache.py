@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+""" Per-process cache of charge basis operators for the charge-basis circuit solvers """
+
+import threading
+import numpy as np
+import scipy as sp
+import scipy.sparse
+
+from collections import OrderedDict
+
+#====================================================
+
+class OperatorCache(object):
+	"""
+		Least recently used cache of charge basis operators. Entries are keyed by the number of nodes,
+		the truncation n and the matrix format, such that the Hamiltonian of a circuit reduces to a
+		weighted sum of cached operators.
+
+		Note: cached operators are shared between calls and must not be modified in place.
+	"""
+
+	def __init__(self, max_entries = 4):
+		self.max_entries = max_entries
+		self.entries     = OrderedDict()
+		self.lock        = threading.Lock()
+		self.hits, self.misses, self.evictions = 0, 0, 0
+
+
+	def get(self, num_nodes, n, sparse = False):
+		key = (num_nodes, n, bool(sparse))
+		with self.lock:
+			if key in self.entries:
+				self.entries.move_to_end(key)
+				self.hits += 1
+				return self.entries[key]
+			self.misses += 1
+
+		ops = _build_charge_basis_operators(num_nodes, n, sparse)
+
+		with self.lock:
+			self.entries[key] = ops
+			self.entries.move_to_end(key)
+			while len(self.entries) > self.max_entries:
+				self.entries.popitem(last = False)
+				self.evictions += 1
+		return ops
+
+
+	def clear(self):
+		with self.lock:
+			self.entries = OrderedDict()
+
+
+	def get_statistics(self):
+		return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self.entries)}
+
+#====================================================
+
+def _build_charge_basis_operators(num_nodes, n, sparse = False):
+	"""
+		Charge basis operators of a circuit with num_nodes nodes, i.e. Kronecker products of charge (Q),
+		squared charge and displacement (Dp, Dm) operators. Node indices in the keys start at 1.
+
+		Parameters:
+			num_nodes: int | number of circuit nodes
+			n: int         | sets 2n+1 charge basis states per node (integer)
+			sparse: bool   | return scipy.sparse (csr) matrices instead of dense arrays
+
+		Returns:
+			ops: dict | operators on the (2n+1)^num_nodes dimensional product space
+				'Q_i'       | charge of node i
+				'QQ_i'      | squared charge of node i
+				'QQ_ij'     | product of charges of nodes i < j
+				'D_i'       | Dp + Dm on node i
+				'DpDm_ij'   | Dp on node i times Dm on node j (i != j)
+	"""
+	if sparse:
+		eye, diag = sp.sparse.identity, sp.sparse.diags
+		kron      = lambda a, b: sp.sparse.kron(a, b, format = 'csr')
+	else:
+		eye, diag, kron = np.eye, np.diag, np.kron
+
+	I  = eye(2*n+1) #identity matrix
+	Q  = diag(np.arange(-n,n+1).astype(float)) #charge operator
+	Dp = diag(np.ones((2*n+1)-1), 1)
+	Dm = diag(np.ones((2*n+1)-1), -1)
+
+	def embed(single_ops):
+		# Kronecker product over all nodes, with identities on nodes not in single_ops
+		op = single_ops.get(0, I)
+		for node in range(1, num_nodes):
+			op = kron(op, single_ops.get(node, I))
+		return op
+
+	ops = {}
+	for i in range(num_nodes):
+		ops['Q_%d' % (i+1)]  = embed({i: Q})
+		ops['QQ_%d' % (i+1)] = embed({i: Q.dot(Q)})
+		ops['D_%d' % (i+1)]  = embed({i: Dp + Dm})
+		for j in range(num_nodes):
+			if j == i: continue
+			ops['DpDm_%d%d' % (i+1, j+1)] = embed({i: Dp, j: Dm})
+			if j > i:
+				ops['QQ_%d%d' % (i+1, j+1)] = embed({i: Q, j: Q})
+
+	if sparse:
+		ops = {key: op.tocsr() for key, op in ops.items()}
+	else:
+		for op in ops.values():
+			op.setflags(write = False)
+	return ops
+
+#====================================================
+
+OPERATOR_CACHE = OperatorCache()
+
+def charge_basis_operators(num_nodes, n, sparse = False):
+	return OPERATOR_CACHE.get(num_nodes, n, sparse)
@@ -5,11 +5,15 @@
 import numpy as np 
 import numpy.linalg
 import scipy as sp
+import scipy.sparse
+import scipy.sparse.linalg
 import csv
 import os
 
+from Submitter.operator_cache import charge_basis_operators
 
-def solver_2node(Carr, Larr, Jarr, phiExt=0, qExt=[0,0], n=40, normalized=True):
+
+def solver_2node(Carr, Larr, Jarr, phiExt=0, qExt=[0,0], n=40, normalized=True, num_levels=None, gradients=False):
 	"""
 		Calculates flux or charge spectrum of 2-node circuit containing junctions and capacitances. If
 		flux or charge offset is given as a list, a sweep over the list will be performed. However, only
@@ -22,9 +26,15 @@ def solver_2node(Carr, Larr, Jarr, phiExt=0, qExt=[0,0], n=40, normalized=True):
 			phiExt: float or m-dim list | external flux (in fraction of flux quanta)
 			qExt: 2-dim or 2xm-dim list | charge offsets for nodes 1 and 2 (in fraction of Cooper pairs)
 			n: int                      | sets 2n+1 charge basis states (integer)
+			num_levels: int or None     | number of lowest eigenvalues to compute with the sparse solver
+			                              (all eigenvalues with the dense solver if None)
+			gradients: bool             | also return derivatives of the eigenvalues with respect to all
+			                              entries of Carr and Jarr (Hellmann-Feynman theorem)
 
 		Returns:
-			spec: mxn-dim array | Eigenvalues of circuit for each point along sweep (in GHz)
+			spec: mxn-dim array   | Eigenvalues of circuit for each point along sweep (in GHz)
+			grads: mxnxp-dim array | only if gradients is True; derivatives of spec with respect to the
+			                        p = len(Carr) + len(Jarr) entries of [Carr, Jarr] (in GHz/fF, GHz/GHz)
 
 		Note: Only one sweep allowed, i.e. sweep either flux or one of the two node charges.
 	"""
@@ -42,36 +52,48 @@ def solver_2node(Carr, Larr, Jarr, phiExt=0, qExt=[0,0], n=40, normalized=True):
 	valid = (len([s for s in sweep_list if s==True]) <= 1)
 	assert valid, "Only one sweep allowed - sweep either flux OR one of the two node charges."
 
-	# Initialize spectrum
-	spec = []
-
-	# Calculate spectrum for swept parameter
+	# Collect the flux and charge offsets of every point along the sweep
 	if sweep_phi:
-		for p in phiExt:
-			spec.append( _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=p, qExt_fix=qExt, n=n) )
-	elif sweep_q1 or sweep_q2:
-		if sweep_q1:
-			qSweep = [[q,qExt[1]] for q in qExt[0]]
-		else:
-			qSweep = [[qExt[0],q] for q in qExt[1]]
-		for qv in qSweep:
-			spec.append( _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=phiExt, qExt_fix=qv, n=n) )
+		phiSweep = np.asarray(phiExt, dtype=float)
+		q1Sweep  = np.full(len(phiSweep), float(qExt[0]))
+		q2Sweep  = np.full(len(phiSweep), float(qExt[1]))
+	elif sweep_q1:
+		q1Sweep  = np.asarray(qExt[0], dtype=float)
+		q2Sweep  = np.full(len(q1Sweep), float(qExt[1]))
+		phiSweep = np.full(len(q1Sweep), float(phiExt))
+	elif sweep_q2:
+		q2Sweep  = np.asarray(qExt[1], dtype=float)
+		q1Sweep  = np.full(len(q2Sweep), float(qExt[0]))
+		phiSweep = np.full(len(q2Sweep), float(phiExt))
+	else:
+		phiSweep, q1Sweep, q2Sweep = np.array([phiExt], dtype=float), np.array([qExt[0]], dtype=float), np.array([qExt[1]], dtype=float)
+
+	# Calculate spectrum for all points of the sweep at once
+	if gradients:
+		spec, grads = _eigs_2node_sweep(Carr, Larr, Jarr, phiSweep, q1Sweep, q2Sweep, n=n, num_levels=num_levels, gradients=True)
 	else:
-		spec = _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=phiExt, qExt_fix=qExt, n=n)
+		spec = _eigs_2node_sweep(Carr, Larr, Jarr, phiSweep, q1Sweep, q2Sweep, n=n, num_levels=num_levels)
+	if not (sweep_phi or sweep_q1 or sweep_q2):
+		spec = spec[0]
+		if gradients:
+			grads = grads[0]
 
 	spec = np.array(spec)
 
 	# Normalize spectrum by ground state if desired
 	if normalized:
-		e0 = np.array([spec[i][0] for i in range(len(spec))])
-		spec = (spec.T - e0).T
+		spec = (spec.T - spec.T[0]).T
+		if gradients:
+			grads = grads - grads[..., :1, :]
 
 	end = time.time()
 	new_line= '$$$$$ took: %.4f s $$$$$$$\n' % (end - start)
+	if gradients:
+		return spec, grads
 	return spec
 
 
-def _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=0, qExt_fix=[0,0], n=6):
+def _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=0, qExt_fix=[0,0], n=6, num_levels=None):
 	"""
 		Eigenenergies of 2-node circuit containing capacitances and junctions for fixed flux and charge
 		offset. Note: Adds junction capacitance.
@@ -83,9 +105,43 @@ def _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=0, qExt_fix=[0,0], n=6):
 			phiExt_fix: float      | external flux (in fraction of flux quanta)
 			qExt_fix:  2-dim array | charge offset vector for nodes 1 and 2 (in fraction of Cooper pairs)
 			n: int                 | sets 2n+1 charge basis states (integer)
+			num_levels: int or None | number of lowest eigenvalues to compute (all if None)
 
 		Returns:
-			evals: array | 2n+1 eigenvalues of circuit (in GHz)
+			evals: array | (2n+1)^2 (or num_levels) eigenvalues of circuit (in GHz)
+	"""
+	evals = _eigs_2node_sweep(Carr, Larr, Jarr, np.array([phiExt_fix], dtype=float), np.array([qExt_fix[0]], dtype=float),
+							  np.array([qExt_fix[1]], dtype=float), n=n, num_levels=num_levels)
+	return evals[0]
+
+
+# Upper bound on the memory of one stack of dense Hamiltonians passed to the batched eigensolver (in bytes)
+MAX_BATCH_BYTES = 2**27
+
+def _eigs_2node_sweep(Carr, Larr, Jarr, phiSweep, q1Sweep, q2Sweep, n=6, num_levels=None, gradients=False):
+	"""
+		Eigenenergies of 2-node circuit containing capacitances and junctions for m points of a flux or
+		charge sweep. The capacitance inversion is computed once and the operator products are taken
+		from the per-process operator cache. Only the coefficients of the flux and charge offset dependent
+		terms change along the sweep, such that the dense Hamiltonians are stacked into (m, d, d) arrays
+		and diagonalized with batched calls. Note: Adds junction capacitance. If num_levels is set, the
+		Hamiltonians are assembled as sparse matrices and only the lowest num_levels eigenvalues are
+		computed.
+
+		Parameters:
+			Carr: array             | flattened capacitance matrix (in fF)
+			Jarr: array             | flattened junction matrix (in GHz)
+			Larr: None              | NOT YET SUPPORTED, SET TO 'None'
+			phiSweep: m-dim array   | external flux (in fraction of flux quanta)
+			q1Sweep: m-dim array    | charge offsets of node 1 (in fraction of Cooper pairs)
+			q2Sweep: m-dim array    | charge offsets of node 2 (in fraction of Cooper pairs)
+			n: int                  | sets 2n+1 charge basis states (integer)
+			num_levels: int or None | number of lowest eigenvalues to compute (all if None)
+			gradients: bool         | also return derivatives of the eigenvalues
+
+		Returns:
+			evals: mxk-dim array   | k = (2n+1)^2 (or num_levels) eigenvalues for each point (in GHz)
+			grads: mxkxp-dim array | only if gradients is True, see _hellmann_feynman_2node
 	"""
 
 	assert Larr==None, "Linear inductors not supported in 2-node solver - set Larr to 'None'"
@@ -102,39 +158,127 @@ def _eigs_2node_singleflux(Carr, Larr, Jarr, phiExt_fix=0, qExt_fix=[0,0], n=6):
 	# Capacitance matrix C (not to be confused with Capacitance connectivity matrix Cmat)
 	C = np.diag(np.sum(Cmat, axis=0)) + np.diag(np.diag(Cmat)) - Cmat
 	C = C * 10.**(-15) #convert fF -> F
+	Cinv = np.linalg.inv(C)
+	Jmat = Jmat * 10.**9 #convert GHz -> Hz
+
+	# Sparse assembly pays off only if a proper subset of the spectrum is requested
+	dim = (2*n+1)**len(C)
+	use_sparse = num_levels is not None and num_levels < dim - 1
+	ops = charge_basis_operators(len(C), n, use_sparse) #cached per process
 
-	# Capacitive (kinetic) part of Hamiltonian
+	# Charging energy prefactor
 	e = 1.60217662 * 10**(-19) #elementary charge
 	h = 6.62607004 * 10**(-34) #Planck constant
-	T = np.zeros( ((2*n+1)**len(C), (2*n+1)**len(C)) ) #kinetic part of Hamiltonian
-	Cinv = np.linalg.inv(C)
-	I = np.eye(2*n+1) #identity matrix
-	Q = np.diag(np.arange(-n,n+1)) #Charge operator
-	Q1 = Q + qExt_fix[0]*I
-	Q2 = Q + qExt_fix[1]*I
-	# More simple construction specific to flux qubit
-	T += 0.5*Cinv[0,0] * np.kron(Q1.dot(Q1), I)
-	T += 0.5*Cinv[1,1] * np.kron(I, Q2.dot(Q2))
-	T += Cinv[0,1] * np.kron(Q1, Q2)
-	T *= 4*e**2/h
-
-	# Josephson potential part (specific to flux qubit)
-	Jmat = Jmat * 10.**9 #convert GHz -> Hz
-	U = np.zeros(((2*n+1)**len(C),(2*n+1)**len(C))) #potential part of Hamiltonian
-	Dp = np.diag(np.ones((2*n+1)-1), k=1)
-	Dm = np.diag(np.ones((2*n+1)-1), k=-1)
-	# Add displacement operator terms that were obtained from cosines
-	U = U - Jmat[0,0]/2 * np.kron((Dp + Dm),I)
-	U = U - Jmat[1,1]/2 * np.kron(I, (Dp + Dm))
-	U = U - Jmat[0,1]/2 * ( np.exp(-2*np.pi*1j*phiExt_fix) * np.kron(Dp,Dm) + np.exp(2*np.pi*1j*phiExt_fix) * np.kron(Dm,Dp) )
+	EC = 4*e**2/h
+
+	# Sweep independent part: kinetic terms without charge offsets and cosines of the single junctions
+	H0 = EC * (0.5*Cinv[0,0] * ops['QQ_1'] + 0.5*Cinv[1,1] * ops['QQ_2'] + Cinv[0,1] * ops['QQ_12'])
+	H0 = H0 - Jmat[0,0]/2 * ops['D_1'] - Jmat[1,1]/2 * ops['D_2']
+
+	# Sweep dependent coefficients: charge offsets shift (Q + q) and the flux enters the coupling junction
+	#   0.5*C00*(Q1+q1)^2 + 0.5*C11*(Q2+q2)^2 + C01*(Q1+q1)*(Q2+q2) = (sweep independent) + a*Q1 + b*Q2 + c
+	a = EC * (Cinv[0,0]*q1Sweep + Cinv[0,1]*q2Sweep)
+	b = EC * (Cinv[1,1]*q2Sweep + Cinv[0,1]*q1Sweep)
+	c = EC * (0.5*Cinv[0,0]*q1Sweep**2 + 0.5*Cinv[1,1]*q2Sweep**2 + Cinv[0,1]*q1Sweep*q2Sweep)
+	z = - Jmat[0,1]/2 * np.exp(-2*np.pi*1j*phiSweep)
+	q1diag, q2diag = ops['Q_1'].diagonal(), ops['Q_2'].diagonal()
+
+	evals, grads = [], []
+	if use_sparse:
+		for index in range(len(phiSweep)):
+			H = H0 + z[index] * ops['DpDm_12'] + np.conj(z[index]) * ops['DpDm_21']
+			H = H + sp.sparse.diags(a[index]*q1diag + b[index]*q2diag + c[index])
+			if gradients:
+				evals_point, evecs_point = sp.sparse.linalg.eigsh(H.tocsr(), k=num_levels, which='SA')
+				order = np.argsort(evals_point)
+				evals.append(evals_point[order])
+				point = slice(index, index + 1)
+				grads.append(_hellmann_feynman_2node(ops, evecs_point[None, :, order], Cinv, EC, phiSweep[point], q1Sweep[point], q2Sweep[point]))
+			else:
+				evals_point = sp.sparse.linalg.eigsh(H.tocsr(), k=num_levels, which='SA', return_eigenvectors=False)
+				evals.append(np.sort(evals_point))
+		evals = np.array(evals)
+	else:
+		diag_indices = np.arange(dim)
+		batch_size   = max(1, MAX_BATCH_BYTES // (16 * dim**2))
+		for start in range(0, len(phiSweep), batch_size):
+			batch = slice(start, start + batch_size)
+			H = H0 + z[batch, None, None] * ops['DpDm_12'] + np.conj(z[batch, None, None]) * ops['DpDm_21']
+			H[:, diag_indices, diag_indices] += a[batch, None]*q1diag + b[batch, None]*q2diag + c[batch, None]
+			if gradients:
+				evals_batch, evecs_batch = np.linalg.eigh(H)
+				evals.append(evals_batch)
+				grads.append(_hellmann_feynman_2node(ops, evecs_batch[:, :, :num_levels], Cinv, EC, phiSweep[batch], q1Sweep[batch], q2Sweep[batch]))
+			else:
+				evals.append(np.linalg.eigvalsh(H))
+		evals = np.concatenate(evals, axis=0)
+		if num_levels is not None:
+			evals = evals[:, :num_levels]
+	evals = evals / 1e9 #convert to GHz
+
+	if gradients:
+		return evals, np.concatenate(grads, axis=0)
+	return evals
+
 
-	# Assemble Hamiltonian
-	H = T + U
+def _hellmann_feynman_2node(ops, evecs, Cinv, EC, phiSweep, q1Sweep, q2Sweep):
+	"""
+		Derivatives of the eigenenergies with respect to all capacitances and junctions from the
+		Hellmann-Feynman theorem, dE_k/dp = <k|dH/dp|k>, evaluated with the eigenvectors of the
+		diagonalization. Junction derivatives include the added junction capacitance. Derivatives of
+		degenerate levels are not well defined.
 
-	evals = np.linalg.eigh(H)[0]
-	evals /= 1e9 #convert to GHz
+		Parameters:
+			ops: dict                | charge basis operators of the 2-node circuit
+			evecs: mxdxk-dim array   | eigenvectors of the k lowest levels for each of the m points
+			Cinv: 2x2-dim array      | inverse capacitance matrix (in 1/F)
+			EC: float                | charging energy prefactor 4e^2/h
+			phiSweep, q1Sweep, q2Sweep: m-dim arrays | flux and charge offsets of each point
 
-	return evals
+		Returns:
+			grads: mxkxp-dim array | derivatives with respect to the p = len(Carr) + len(Jarr) entries of
+			                         the flattened capacitance (in GHz/fF) and junction (in GHz/GHz) arrays
+	"""
+	# Expectation values of all operators entering the Hamiltonian
+	num_points, dim, num_levels = evecs.shape
+	probs = np.abs(evecs)**2
+	def expect_diagonal(op):
+		return np.einsum('mdk,d->mk', probs, op.diagonal())
+	def expect(op):
+		flat = evecs.transpose(1, 0, 2).reshape(dim, num_points * num_levels)
+		op_evecs = op.dot(flat).reshape(dim, num_points, num_levels).transpose(1, 0, 2)
+		return np.sum(np.conj(evecs) * op_evecs, axis=1)
+
+	q1, q2 = q1Sweep[:, None], q2Sweep[:, None]
+	Q1, Q2 = expect_diagonal(ops['Q_1']), expect_diagonal(ops['Q_2'])
+	QQ1 = expect_diagonal(ops['QQ_1']) + 2*q1*Q1 + q1**2         #<(Q1+q1)^2>
+	QQ2 = expect_diagonal(ops['QQ_2']) + 2*q2*Q2 + q2**2         #<(Q2+q2)^2>
+	QQ12 = expect_diagonal(ops['QQ_12']) + q2*Q1 + q1*Q2 + q1*q2 #<(Q1+q1)(Q2+q2)>
+	D = [np.real(expect(ops['D_1'])), np.real(expect(ops['D_2']))]
+	coupling = np.real(np.exp(-2*np.pi*1j*phiSweep)[:, None] * expect(ops['DpDm_12']))
+
+	grads_C, grads_J = [], []
+	N = len(Cinv)
+	for i, j in zip(*np.triu_indices(N, k=0)):
+		# derivative of the capacitance matrix with respect to the connectivity matrix entry (i,j)
+		dC = np.zeros((N,N))
+		dC[i,i] += 1.
+		if i != j:
+			dC[j,j] += 1.
+			dC[i,j] = dC[j,i] = -1.
+		dC = dC * 10.**(-15) #convert fF -> F
+		dCinv = - Cinv.dot(dC).dot(Cinv)
+		grad_C = EC * (0.5*dCinv[0,0] * QQ1 + 0.5*dCinv[1,1] * QQ2 + dCinv[0,1] * QQ12) / 1e9
+		grads_C.append(grad_C)
+
+		# junctions contribute their capacitance and the displacement operator terms
+		if i == j:
+			grad_J = 1/26.6 * grad_C - 0.5 * D[i]
+		else:
+			grad_J = 1/26.6 * grad_C - coupling
+		grads_J.append(grad_J)
+
+	return np.stack(grads_C + grads_J, axis=-1)
 
 
 ####### Testing #######
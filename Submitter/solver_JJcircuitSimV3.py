@@ -9,8 +9,11 @@ import csv
 import numpy as np
 import re
 
+# the Mathematica script is expected in the root directory of the package
+SCRIPT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Mathematica_scriptV2-JJsimV3.wl')
 
-def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, timeout=600, fluxSweep=True, phiOffs=[0.5,0.5,0.5,0.5]):
+
+def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, timeout=600, fluxSweep=True, phiOffs=[0.5,0.5,0.5,0.5], work_dir='.', script_file=None):
 	"""
 		Returns:
 		eigenspec - 10-dim numpy array of the circuit eigenspectrum at fixed flux. If fluxSweep=True,
@@ -27,6 +30,9 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 		nLin, nNol, nJos, nIsl - truncation of linear, non-linear, Josephson and island modes
 		timeout - timeout for Mathematica simulation in seconds
 		fluxBool - perform flux sweep if set to True
+		work_dir - directory for the Mathematica input and log files. The working directory of the
+			calling process is not changed
+		script_file - path to the Mathematica script (default: SCRIPT_FILE in the package root)
 
 		Note: The components matrices are entered as 1-dim numpy arrays stepping through the
 		upper triangular matrix row-wise, e.g. np.array([c11, c12, c13, c22, c23, c33])
@@ -34,7 +40,9 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 
 	print('Running circuit simulation...')
 
-	if not os.path.exists('../Mathematica_scriptV2-JJsimV3.wl'):
+	if script_file is None:
+		script_file = SCRIPT_FILE
+	if not os.path.exists(script_file):
 		raise NotImplementedError('JJcircuitSim module not available')
 
 	tA = time.time()
@@ -44,17 +52,17 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 	tstart = time.time()
 
 	# Write parameters to text file, for Mathematica to read
-	Carr.astype('float32').tofile('Carr.dat')
-	Larr.astype('float32').tofile('Larr.dat')
-	JJarr.astype('float32').tofile('JJarr.dat')
+	Carr.astype('float32').tofile(os.path.join(work_dir, 'Carr.dat'))
+	Larr.astype('float32').tofile(os.path.join(work_dir, 'Larr.dat'))
+	JJarr.astype('float32').tofile(os.path.join(work_dir, 'JJarr.dat'))
 	phiOffs = np.array(phiOffs)
-	phiOffs.astype('float32').tofile('phiOffs.dat') #flux biases for loops
+	phiOffs.astype('float32').tofile(os.path.join(work_dir, 'phiOffs.dat')) #flux biases for loops
 
 	# Subprocess to run Mathematica script
 	try:
-		run(["wolframscript", "-file", "../Mathematica_scriptV2-JJsimV3.wl",
+		run(["wolframscript", "-file", script_file,
 			str(nLin), str(nNol), str(nJos), str(nIsl), str(int(fluxSweep))],
-			timeout=timeout, stdout=open(os.devnull, 'wb'))
+			timeout=timeout, stdout=open(os.devnull, 'wb'), cwd=work_dir)
 	except TimeoutExpired:
 		print('ERROR: timeout expired')
 		timeout_bool = True
@@ -62,11 +70,11 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 
 	# Extract eigenspectrum from file
 	eigenspec = []
-	if not os.path.isfile('log_eigenspectrum.csv'):
+	if not os.path.isfile(os.path.join(work_dir, 'log_eigenspectrum.csv')):
 		return None, timeout_bool
 
 	try: #try opening and reading spectrum file
-		with open('log_eigenspectrum.csv', 'r') as datafile:
+		with open(os.path.join(work_dir, 'log_eigenspectrum.csv'), 'r') as datafile:
 			if fluxSweep:
 				reader = csv.reader(datafile, delimiter=',')
 				for row in reader:
@@ -80,7 +88,7 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 	# Determine number of flux biases and outermost level population
 	try:
 		## Number of flux biases ##
-		with open('log_biasinfo.txt', 'r') as datafile:
+		with open(os.path.join(work_dir, 'log_biasinfo.txt'), 'r') as datafile:
 			content = datafile.read()
 		start_indices = [m.start() for m in re.finditer('Fb', content)]
 		matches = [content[i:i+3] for i in start_indices] #assumes no more than 9 biases
@@ -89,7 +97,7 @@ def solver_JJcircuitSimV3(Carr, Larr, JJarr, nLin=6, nNol=8, nJos=11, nIsl=1, ti
 		print('# Found {} flux biases'.format(num_biases))
 
 		## Maximum outermost level population of eigenstates ##
-		with open('log_diagonalization.txt', 'r') as datafile:
+		with open(os.path.join(work_dir, 'log_diagonalization.txt'), 'r') as datafile:
 			content = datafile.read()
 		# Find indices of level pop information for each mode
 		start_indices = np.array([m.start() for m in re.finditer('Max level probs', content)])
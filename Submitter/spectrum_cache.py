@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+""" Content-addressed cache of circuit solver results """
+
+import os
+import copy
+import pickle
+import hashlib
+import tempfile
+import threading
+import numpy as np
+
+from collections import OrderedDict
+
+from Designers.design_utils import canonicalize_circuit, LABEL_INVARIANT_SOLVERS
+
+#====================================================
+
+# general parameters which change the solver output
+KEY_PARAMS  = ['solver', 'phiExt', 'truncation', 'num_levels', 'gradients']
+# circuit values which change the solver output
+KEY_VALUES  = ['capacities', 'junctions', 'inductances', 'phiOffs']
+
+#====================================================
+
+def _update_hash(sha, value):
+	# encodes types and shapes along with the raw data, such that different inputs cannot collide
+	if value is None:
+		sha.update(b'none;')
+	elif isinstance(value, (np.ndarray, list, tuple)) or np.isscalar(value) and not isinstance(value, str):
+		array = np.ascontiguousarray(value, dtype = np.float64)
+		sha.update(('array%s;' % str(array.shape)).encode())
+		sha.update(array.tobytes())
+	else:
+		sha.update(('%s:%s;' % (type(value).__name__, repr(value))).encode())
+
+
+def get_cache_key(general_params, circuit_values):
+	"""
+		Parameters:
+			general_params: dict | solver settings of the job
+			circuit_values: dict | capacities, junctions, inductances and optional phiOffs of the circuit
+
+		Returns:
+			key: str | sha1 digest of all quantities determining the solver output
+
+		Note: equivalent node relabelings share a key for solvers in LABEL_INVARIANT_SOLVERS. Eigenvalue
+		gradients depend on the labeling, hence circuits are not canonicalized when gradients are requested.
+	"""
+	if general_params.get('solver', None) in LABEL_INVARIANT_SOLVERS and not general_params.get('gradients', False):
+		circuit_values = canonicalize_circuit(circuit_values)[0]
+	sha = hashlib.sha1()
+	for name in KEY_PARAMS:
+		sha.update(name.encode())
+		_update_hash(sha, general_params.get(name, None))
+	for name in KEY_VALUES:
+		sha.update(name.encode())
+		_update_hash(sha, circuit_values.get(name, None))
+	return sha.hexdigest()
+
+#====================================================
+
+class SpectrumCache(object):
+	"""
+		Two-tier cache of solver results: an in-memory LRU tier and an optional on-disk tier with one
+		pickle file per key, written atomically, which is shared by all processes using the same path.
+
+		Parameters:
+			path: str          | directory of the on-disk tier (None disables it)
+			max_entries: int   | capacity of the in-memory tier
+	"""
+
+	def __init__(self, path = None, max_entries = 4096):
+		self.path        = path
+		self.max_entries = max_entries
+		self.entries     = OrderedDict()
+		self.lock        = threading.Lock()
+		self.statistics  = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'stores': 0}
+		if self.path is not None and not os.path.isdir(self.path):
+			os.makedirs(self.path, exist_ok = True)
+
+
+	def _file_name(self, key):
+		return os.path.join(self.path, key[:2], '%s.pkl' % key)
+
+
+	def _remember(self, key, results):
+		# caller holds the lock
+		self.entries[key] = results
+		self.entries.move_to_end(key)
+		while len(self.entries) > self.max_entries:
+			self.entries.popitem(last = False)
+			self.statistics['evictions'] += 1
+
+
+	def get(self, key):
+		with self.lock:
+			if key in self.entries:
+				self.entries.move_to_end(key)
+				self.statistics['memory_hits'] += 1
+				return copy.deepcopy(self.entries[key])
+
+		results = None
+		if self.path is not None:
+			try:
+				with open(self._file_name(key), 'rb') as content:
+					results = pickle.load(content)
+			except (OSError, EOFError, pickle.UnpicklingError):
+				results = None
+
+		with self.lock:
+			if results is None:
+				self.statistics['misses'] += 1
+				return None
+			self.statistics['disk_hits'] += 1
+			self._remember(key, results)
+		return copy.deepcopy(results)
+
+
+	def put(self, key, results):
+		results = copy.deepcopy(results)
+		with self.lock:
+			self._remember(key, results)
+			self.statistics['stores'] += 1
+		if self.path is None: return
+
+		# write to a temporary file first, readers never see partially written entries
+		dir_name = os.path.dirname(self._file_name(key))
+		try:
+			os.makedirs(dir_name, exist_ok = True)
+			handle, temp_name = tempfile.mkstemp(dir = dir_name, suffix = '.tmp')
+			with os.fdopen(handle, 'wb') as content:
+				pickle.dump(results, content)
+			os.replace(temp_name, self._file_name(key))
+		except OSError:
+			print('WARNING: could not write spectrum cache entry %s' % key)
+
+
+	def get_statistics(self):
+		with self.lock:
+			statistics = dict(self.statistics)
+			statistics['entries'] = len(self.entries)
+		return statistics
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+""" Pool of long-lived worker processes executing circuit solver jobs """
+
+import os
+import sys
+import time
+import queue
+import itertools
+import threading
+import traceback
+import multiprocessing
+
+#====================================================
+
+def _worker_loop(cpu, job_queue, result_queue, scratch_base, current_job):
+	# pin worker to its cpu if the platform supports it
+	if cpu is not None and hasattr(os, 'sched_setaffinity'):
+		try:
+			os.sched_setaffinity(0, {cpu})
+		except OSError:
+			pass
+
+	# numpy, scipy and the solvers are imported only once per worker
+	from Submitter.execute import process_job
+
+	while True:
+		entry = job_queue.get()
+		if entry is None: break
+		# shared memory is written immediately, the pool can tell which job a crashed worker held
+		job_index, job = entry
+		current_job.value = job_index
+		try:
+			data = process_job(job, scratch_base)
+		except Exception:
+			print('ERROR: job %s failed in worker on cpu %s' % (job.get('job_name'), str(cpu)))
+			traceback.print_exc()
+			data = job
+			data['results']      = (None, False)
+			data['measurements'] = {'eigen_spectrum': None, 'timeout': False}
+		result_queue.put((job_index, data))
+
+#====================================================
+
+class WorkerPool(object):
+	"""
+		Starts one worker process per cpu which receives jobs over a shared queue. Processed jobs are
+		handed to the callback from a collector thread in the parent process.
+
+		The collector also checks the workers every MONITOR_INTERVAL seconds. Workers which died (e.g.
+		segfault or out of memory in a solver) are replaced, the job they held is reported as failed.
+
+		Parameters:
+			cpu_list: list      | cpus the workers are pinned to (one worker per entry)
+			callback: callable  | called with each processed job dictionary
+			scratch_base: str   | directory in which workers create temporary solver directories
+	"""
+
+	MONITOR_INTERVAL = 1.
+
+	# workers which do not finish their current job within this time [s] after close are terminated
+	JOIN_TIMEOUT     = 10.
+
+	def __init__(self, cpu_list, callback, scratch_base = '.'):
+		self.cpu_list     = list(cpu_list)
+		self.callback     = callback
+		self.scratch_base = scratch_base
+
+		# spawned workers do not inherit threads or locks of the parent process
+		self.context      = multiprocessing.get_context('spawn')
+		self.job_queue    = self.context.Queue()
+		self.result_queue = self.context.Queue()
+
+		# jobs which were submitted but not returned, by job index
+		self.pending      = {}
+		self.job_counter  = itertools.count(1)
+		self.lock         = threading.Lock()
+		self.closing      = False
+
+		self.current_jobs = [self.context.Value('l', 0) for cpu in self.cpu_list]
+		self.workers      = [self._start_worker(slot) for slot in range(len(self.cpu_list))]
+
+		self.collector = threading.Thread(target = self._collect)
+		self.collector.daemon = True
+		self.collector.start()
+
+
+	def _start_worker(self, slot):
+		self.current_jobs[slot].value = 0
+		worker = self.context.Process(target = _worker_loop, args = (self.cpu_list[slot], self.job_queue, self.result_queue,
+																	  self.scratch_base, self.current_jobs[slot]))
+		worker.daemon = True
+		worker.start()
+		return worker
+
+
+	def _replace_dead_workers(self):
+		for slot, worker in enumerate(self.workers):
+			if self.closing: return
+			if worker.is_alive(): continue
+			with self.lock:
+				job = self.pending.pop(self.current_jobs[slot].value, None)
+			print('ERROR: worker on cpu %s died with exit code %s, starting a new worker' % (str(self.cpu_list[slot]), str(worker.exitcode)))
+			self.workers[slot] = self._start_worker(slot)
+			if job is None: continue
+			print('ERROR: job %s was lost with the worker' % job.get('job_name'))
+			job['results']      = (None, False)
+			job['measurements'] = {'eigen_spectrum': None, 'timeout': False}
+			self.callback(job)
+
+
+	def _collect(self):
+		last_check = time.time()
+		while True:
+			try:
+				entry = self.result_queue.get(timeout = self.MONITOR_INTERVAL)
+			except queue.Empty:
+				entry = False
+			if entry is None: break
+			if time.time() - last_check > self.MONITOR_INTERVAL:
+				self._replace_dead_workers()
+				last_check = time.time()
+			if entry is False: continue
+
+			# results of jobs which were already reported as failed are dropped
+			job_index, data = entry
+			with self.lock:
+				if self.pending.pop(job_index, None) is None: continue
+			self.callback(data)
+
+
+	def submit(self, job_dict):
+		with self.lock:
+			job_index = next(self.job_counter)
+			self.pending[job_index] = job_dict
+		self.job_queue.put((job_index, job_dict))
+
+
+	def close(self):
+		if self.closing: return
+		self.closing = True
+		for worker in self.workers:
+			self.job_queue.put(None)
+		for worker in self.workers:
+			worker.join(self.JOIN_TIMEOUT)
+			if worker.is_alive():
+				worker.terminate()
+				worker.join()
+		self.result_queue.put(None)
+		self.collector.join()
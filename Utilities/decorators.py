@@ -1,11 +1,13 @@
-#!/usr/bin/env python 
+#!/usr/bin/env python
 
 #========================================================================
 
 import time
+import functools
 
 from multiprocessing import Process
-from threading       import Thread
+
+from Utilities.executors import get_executor
 
 #========================================================================
 
@@ -19,16 +21,26 @@ def delayed(time_delay = 1.0):
 
 #========================================================================
 
+def _run_process(function, args, kwargs):
+	background_process = Process(target = function, args = args, kwargs = kwargs)
+	background_process.start()
+	background_process.join()
+
+
 def process(function):
+	# processes are started from the 'processes' pool, which bounds the number of running processes
+	@functools.wraps(function)
 	def wrapper(*args, **kwargs):
-		background_process = Process(target = function, args = args, kwargs = kwargs)
-		background_process.start()
+		get_executor('processes').submit(_run_process, function, args, kwargs)
 	return wrapper
 
+
 def thread(function):
+	# calls run on the pool of the module defining the function, see Utilities.executors
+	name = function.__module__ if function.__module__ != '__main__' else 'default'
+	@functools.wraps(function)
 	def wrapper(*args, **kwargs):
-		background_thread = Thread(target = function, args = args, kwargs = kwargs)
-		background_thread.start()
+		get_executor(name).submit(function, *args, **kwargs)
 	return wrapper
 
 #========================================================================
@@ -6,7 +6,9 @@ _HOME = os.getcwd()
 
 SETTINGS = {
 	
-	'general': {'scratch_dir': '.scratch'
+	'general': {'scratch_dir':         '.scratch',
+				'spectrum_cache_dir':  '%s/.spectrum_cache' % _HOME,
+				'spectrum_cache_size': 4096,
 		},
 
 	'databases': [{'name': 'master',   'db_name': 'master',   'db_type': 'sqlite', 'db_path': '%s/Experiments/master.db'   % _HOME},
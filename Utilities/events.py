@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+#==============================================================
+
+import threading
+
+#==============================================================
+
+class EventNotifier(object):
+	"""
+		Collects completion events of the pipeline stages (designer, validator, submitter, critic) and
+		wakes up the scheduler waiting for new input instead of polling at a fixed interval.
+	"""
+
+	def __init__(self):
+		self.condition = threading.Condition()
+		self.pending   = {}
+
+
+	def notify(self, stage):
+		with self.condition:
+			self.pending[stage] = self.pending.get(stage, 0) + 1
+			self.condition.notify_all()
+
+
+	def wait(self, timeout = None):
+		"""
+			Blocks until at least one event is pending or the timeout expires
+
+			Parameters:
+				timeout: float | maximum waiting time in seconds (None waits indefinitely)
+
+			Returns:
+				events: dict | number of events per stage received since the last call
+		"""
+		with self.condition:
+			if len(self.pending) == 0:
+				self.condition.wait(timeout)
+			events, self.pending = self.pending, {}
+		return events
+
+#==============================================================
+
+NOTIFIER = EventNotifier()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+""" Named, bounded thread pools for the background work of all components """
+
+import sys
+import time
+import threading
+import traceback
+
+from collections import deque
+
+#====================================================
+
+# pools are named after the module of the decorated function, unknown names get the default limits
+# max_workers: number of threads of the pool
+# max_queue:   number of waiting calls before callers block (None for no limit)
+EXECUTOR_LIMITS = {
+	'default':                          {'max_workers': 8,  'max_queue': 256},
+	# merit evaluations may wait for extra tasks which are submitted by the main loop, hence the main loop
+	# must never block on this pool
+	'CircuitQuantifier.circuit_critic': {'max_workers': 16, 'max_queue': None},
+	'DatabaseHandler.sqlite_interface': {'max_workers': 8,  'max_queue': 256},
+	'DatabaseHandler.db_werkzeug':      {'max_workers': 8,  'max_queue': 256},
+	'Designers.circuit_designer':       {'max_workers': 8,  'max_queue': 64},
+	'Utilities.scratch_dir_watcher':    {'max_workers': 8,  'max_queue': 1024},
+	'processes':                        {'max_workers': 4,  'max_queue': None},
+}
+
+_EXECUTORS      = {}
+_EXECUTORS_LOCK = threading.Lock()
+_CURRENT        = threading.local()
+
+#====================================================
+
+class BoundedExecutor(object):
+	"""
+		Thread pool with a bounded number of workers and a bounded queue. Callers block while the queue
+		is full (backpressure), except for calls issued by workers of the same pool, which could
+		otherwise wait for themselves. Workers are started on demand and exit after IDLE_TIMEOUT seconds
+		without work, such that idle pools hold no threads and do not keep the interpreter alive.
+
+		Parameters:
+			name: str         | name of the pool
+			max_workers: int  | maximum number of worker threads
+			max_queue: int    | maximum number of waiting calls (None for no limit)
+	"""
+
+	IDLE_TIMEOUT = 1.
+
+	def __init__(self, name, max_workers = 8, max_queue = None):
+		self.name         = name
+		self.max_workers  = max(int(max_workers), 1)
+		self.max_queue    = max_queue
+		self.queue        = deque()
+		self.condition    = threading.Condition()
+		self.num_workers  = 0
+		self.num_idle     = 0
+		self.statistics   = {'submitted': 0, 'completed': 0, 'failed': 0, 'blocked': 0,
+							 'max_queue_length': 0, 'wait_time': 0., 'max_wait_time': 0., 'run_time': 0., 'max_run_time': 0.}
+
+
+	def submit(self, function, *args, **kwargs):
+		with self.condition:
+			if self.max_queue is not None and getattr(_CURRENT, 'name', None) != self.name:
+				if len(self.queue) >= self.max_queue:
+					self.statistics['blocked'] += 1
+				while len(self.queue) >= self.max_queue:
+					self.condition.wait()
+			self.queue.append((function, args, kwargs, time.time()))
+			self.statistics['submitted'] += 1
+			self.statistics['max_queue_length'] = max(self.statistics['max_queue_length'], len(self.queue))
+			self.condition.notify_all()
+			if self.num_idle < len(self.queue) and self.num_workers < self.max_workers:
+				self.num_workers += 1
+				worker = threading.Thread(target = self._work, name = '%s-%d' % (self.name, self.num_workers))
+				worker.start()
+
+
+	def _work(self):
+		_CURRENT.name = self.name
+		while True:
+			with self.condition:
+				self.num_idle += 1
+				deadline = time.time() + self.IDLE_TIMEOUT
+				while len(self.queue) == 0 and time.time() < deadline:
+					self.condition.wait(deadline - time.time())
+				self.num_idle -= 1
+				if len(self.queue) == 0:
+					self.num_workers -= 1
+					return
+				function, args, kwargs, submission_time = self.queue.popleft()
+				# callers waiting for space in the queue can continue
+				self.condition.notify_all()
+
+			start = time.time()
+			failed = False
+			try:
+				function(*args, **kwargs)
+			except Exception:
+				failed = True
+				sys.stderr.write('# ERROR | ... call in executor %s failed ...\n%s' % (self.name, traceback.format_exc()))
+			end = time.time()
+
+			with self.condition:
+				self.statistics['failed' if failed else 'completed'] += 1
+				self.statistics['wait_time']    += start - submission_time
+				self.statistics['max_wait_time'] = max(self.statistics['max_wait_time'], start - submission_time)
+				self.statistics['run_time']     += end - start
+				self.statistics['max_run_time']  = max(self.statistics['max_run_time'], end - start)
+
+
+	def get_statistics(self):
+		with self.condition:
+			statistics = dict(self.statistics)
+			statistics['queue_length'] = len(self.queue)
+			statistics['workers']      = self.num_workers
+			statistics['running']      = self.num_workers - self.num_idle
+		num_finished = max(statistics['completed'] + statistics['failed'], 1)
+		statistics['mean_wait_time'] = statistics['wait_time'] / num_finished
+		statistics['mean_run_time']  = statistics['run_time'] / num_finished
+		return statistics
+
+#====================================================
+
+def get_executor(name):
+	with _EXECUTORS_LOCK:
+		if not name in _EXECUTORS:
+			limits = EXECUTOR_LIMITS.get(name, EXECUTOR_LIMITS['default'])
+			_EXECUTORS[name] = BoundedExecutor(name, limits['max_workers'], limits['max_queue'])
+		return _EXECUTORS[name]
+
+
+def configure_executor(name, max_workers = None, max_queue = -1):
+	"""
+		Changes the limits of a pool, takes effect for calls submitted afterwards
+
+		Parameters:
+			name: str        | name of the pool
+			max_workers: int | (optional) maximum number of worker threads
+			max_queue: int   | (optional) maximum number of waiting calls, None for no limit
+	"""
+	limits = dict(EXECUTOR_LIMITS.get(name, EXECUTOR_LIMITS['default']))
+	if max_workers is not None:
+		limits['max_workers'] = max_workers
+	if max_queue != -1:
+		limits['max_queue'] = max_queue
+	EXECUTOR_LIMITS[name] = limits
+	executor = get_executor(name)
+	with executor.condition:
+		executor.max_workers = max(int(limits['max_workers']), 1)
+		executor.max_queue   = limits['max_queue']
+		executor.condition.notify_all()
+
+
+def get_statistics():
+	with _EXECUTORS_LOCK:
+		executors = list(_EXECUTORS.values())
+	return {executor.name: executor.get_statistics() for executor in executors}
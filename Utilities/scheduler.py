@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+""" Priority scheduling of validated circuits onto free task slots """
+
+import time
+import heapq
+import itertools
+import threading
+import numpy as np
+
+#====================================================
+
+# FIFO:                circuits are submitted in the order they were validated
+# OPTIMIZER_FIRST:     circuits requested by optimizer instances (with sim_id) precede random circuits
+# SHORTEST_JOB_FIRST:  circuits with the shortest expected solver time are submitted first
+# FAIR_SHARE:          optimizer instances (and random circuits as one group) are served in turns
+FIFO               = 'fifo'
+OPTIMIZER_FIRST    = 'optimizer_first'
+SHORTEST_JOB_FIRST = 'shortest_job_first'
+FAIR_SHARE         = 'fair_share'
+
+SCHEDULING_POLICIES = [FIFO, OPTIMIZER_FIRST, SHORTEST_JOB_FIRST, FAIR_SHARE]
+
+#====================================================
+
+class TaskScheduler(object):
+	"""
+		Priority queue of validated circuits waiting for a free task slot. Priorities are computed by
+		the selected policy when a circuit is queued; fair share priorities depend on how many circuits
+		of the same group have been served and are re-evaluated lazily when they reach the top.
+
+		Expected solver times for shortest job first are running means over completed circuits with
+		the same number of nodes and components; unknown sizes get the mean over all completed circuits.
+
+		Parameters:
+			policy: str | one of SCHEDULING_POLICIES
+	"""
+
+	def __init__(self, policy = OPTIMIZER_FIRST):
+		if not policy in SCHEDULING_POLICIES:
+			raise NotImplementedError('unknown scheduling policy %s' % policy)
+		self.policy    = policy
+		self.heap      = []
+		self.queued    = {}
+		self.counter   = itertools.count()
+		self.served    = {}
+		self.submitted = {}
+		self.durations = {}
+		self.lock      = threading.Lock()
+
+
+	def _get_group(self, circuit):
+		return circuit['circuit_values'].get('sim_id', None)
+
+
+	def _get_size(self, circuit):
+		values = circuit['circuit_values']
+		size   = [len(values['capacities'])]
+		for key in ['capacities', 'junctions', 'inductances']:
+			if values.get(key, None) is None: continue
+			size.append(int(np.sum(np.array(values[key]) > 0.)))
+		return tuple(size)
+
+
+	def _expected_duration(self, circuit):
+		total, count = self.durations.get(self._get_size(circuit), (0., 0))
+		if count > 0:
+			return total / count
+		all_durations = list(self.durations.values())
+		if len(all_durations) == 0:
+			return 0.
+		return sum([entry[0] for entry in all_durations]) / max(sum([entry[1] for entry in all_durations]), 1)
+
+
+	def _get_priority(self, circuit):
+		if self.policy == FIFO:
+			return 0.
+		elif self.policy == OPTIMIZER_FIRST:
+			return 0. if self._get_group(circuit) is not None else 1.
+		elif self.policy == SHORTEST_JOB_FIRST:
+			return self._expected_duration(circuit)
+		elif self.policy == FAIR_SHARE:
+			return float(self.served.get(self._get_group(circuit), 0))
+
+
+	def add_circuits(self, circuits):
+		"""
+			Parameters:
+				circuits: list | validated circuits, circuits which are already queued are skipped
+		"""
+		with self.lock:
+			for circuit in circuits:
+				if circuit['circuit_id'] in self.queued: continue
+				self.queued[circuit['circuit_id']] = circuit
+				heapq.heappush(self.heap, (self._get_priority(circuit), next(self.counter), circuit['circuit_id']))
+
+
+	def get_num_queued(self):
+		return len(self.queued)
+
+
+	def pop_circuits(self, num_circuits):
+		"""
+			Parameters:
+				num_circuits: int | number of free task slots
+
+			Returns:
+				circuits: list | up to num_circuits circuits in order of their priority
+		"""
+		circuits = []
+		with self.lock:
+			while len(circuits) < num_circuits and len(self.heap) > 0:
+				priority, index, circuit_id = heapq.heappop(self.heap)
+				if not circuit_id in self.queued: continue
+				circuit = self.queued[circuit_id]
+
+				# fair share priorities only grow, outdated entries are queued again with their current priority
+				if self.policy == FAIR_SHARE:
+					current_priority = self._get_priority(circuit)
+					if current_priority > priority:
+						heapq.heappush(self.heap, (current_priority, index, circuit_id))
+						continue
+
+				del self.queued[circuit_id]
+				group = self._get_group(circuit)
+				self.served[group] = self.served.get(group, 0) + 1
+				self.submitted[circuit_id] = (self._get_size(circuit), time.time())
+				circuits.append(circuit)
+		return circuits
+
+
+	def report_completed(self, circuit_ids):
+		with self.lock:
+			for circuit_id in circuit_ids:
+				if not circuit_id in self.submitted: continue
+				size, submission_time = self.submitted.pop(circuit_id)
+				total, count = self.durations.get(size, (0., 0))
+				self.durations[size] = (total + time.time() - submission_time, count + 1)
+
+
+	def clear(self):
+		with self.lock:
+			self.heap   = []
+			self.queued = {}
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+
+""" Shared watcher dispatching new files in a scratch directory to registered callbacks """
+
+#==============================================================
+
+import os
+import re
+import sys
+import time
+import uuid
+import ctypes
+import ctypes.util
+import select
+import struct
+import fnmatch
+import threading
+
+from Utilities.decorators import thread
+
+#==============================================================
+
+# inotify event masks (see inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_IGNORED     = 0x00008000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = os.O_NONBLOCK
+
+_WATCH_MASK    = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER      = struct.Struct('iIII')
+_POLL_MIN_INTERVAL = 0.005
+_POLL_MAX_INTERVAL = 0.5
+
+#==============================================================
+
+def _load_inotify():
+	if not sys.platform.startswith('linux'): return None
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno = True)
+		libc.inotify_init1
+		libc.inotify_add_watch
+	except (OSError, AttributeError):
+		return None
+	return libc
+
+def _longest_literal(pattern):
+	# longest part of a glob pattern which has to appear verbatim in every match
+	return max(re.split(r'[\*\?\[\]]', pattern), key = len)
+
+#==============================================================
+
+class ScratchDirWatcher(object):
+	"""
+		Watches a directory and all of its subdirectories with one dispatcher thread. Names of new files
+		are matched against the registered patterns and the files are handed to the corresponding
+		callbacks, each file at most once per registration. Uses inotify where available, with one watch
+		per directory, and falls back to polling with exponential backoff.
+
+		Parameters:
+			path: str             | directory to watch
+			use_inotify: bool     | try inotify before falling back to polling
+	"""
+
+	def __init__(self, path, use_inotify = True):
+		self.path          = path
+		self.registrations = {}
+		self.lock          = threading.Lock()
+		self.wake_up       = threading.Event()
+		self.libc          = _load_inotify() if use_inotify else None
+		self.inotify_fd    = None
+		self.watched_dirs  = {}
+		self.dispatcher    = None
+
+
+	def register(self, pattern, callback):
+		ident = str(uuid.uuid4())
+		with self.lock:
+			self.registrations[ident] = {'pattern': pattern, 'callback': callback, 'dispatched': set(),
+										 'literal': _longest_literal(pattern), 'match': re.compile(fnmatch.translate(pattern)).match}
+			if self.dispatcher is None:
+				self._start()
+
+		# files written before the registration are not reported by the dispatcher
+		self._dispatch(self._list_files(), idents = [ident])
+		self.wake_up.set()
+		return ident
+
+
+	def unregister(self, ident):
+		with self.lock:
+			if ident in self.registrations:
+				del self.registrations[ident]
+
+
+	def _list_files(self, sub_dir = ''):
+		# paths of all files below sub_dir, relative to the watched directory
+		file_names = []
+		for root, dir_names, names in os.walk(os.path.join(self.path, sub_dir)):
+			rel_root = os.path.relpath(root, self.path)
+			for name in names:
+				file_names.append(name if rel_root == os.curdir else os.path.join(rel_root, name))
+		return file_names
+
+
+	def _add_watches(self, sub_dir = ''):
+		# watches sub_dir and the directories below it, returns the files which are already there
+		file_names = []
+		for root, dir_names, names in os.walk(os.path.join(self.path, sub_dir)):
+			rel_root = os.path.relpath(root, self.path)
+			rel_root = '' if rel_root == os.curdir else rel_root
+			wd = self.libc.inotify_add_watch(self.inotify_fd, os.fsencode(root), _WATCH_MASK)
+			if wd < 0: continue
+			self.watched_dirs[wd] = rel_root
+			file_names.extend([os.path.join(rel_root, name) for name in names])
+		return file_names
+
+
+	def _start(self):
+		if self.libc is not None:
+			fd = self.libc.inotify_init1(IN_NONBLOCK)
+			if fd >= 0:
+				wd = self.libc.inotify_add_watch(fd, os.fsencode(self.path), _WATCH_MASK)
+				if wd >= 0:
+					self.inotify_fd = fd
+					self.watched_dirs[wd] = ''
+					# subdirectories which exist already, their files are reported by register
+					for dir_name in os.listdir(self.path):
+						if os.path.isdir(os.path.join(self.path, dir_name)):
+							self._add_watches(dir_name)
+				else:
+					os.close(fd)
+		if self.inotify_fd is not None:
+			target = self._watch_inotify
+		else:
+			target = self._watch_polling
+		self.dispatcher = threading.Thread(target = target)
+		self.dispatcher.daemon = True
+		self.dispatcher.start()
+
+
+	def _dispatch(self, file_names, idents = None):
+		matches = []
+		with self.lock:
+			if idents is None:
+				idents = list(self.registrations.keys())
+			for ident in idents:
+				if not ident in self.registrations: continue
+				registration = self.registrations[ident]
+				literal, match = registration['literal'], registration['match']
+				for file_name in file_names:
+					# patterns apply to the name of the file, cheap substring test before the full match
+					base_name = os.path.basename(file_name)
+					if not literal in base_name or not match(base_name): continue
+					if file_name in registration['dispatched']: continue
+					registration['dispatched'].add(file_name)
+					matches.append((registration['callback'], os.path.join(self.path, file_name)))
+		for callback, file_path in matches:
+			self._execute(callback, file_path)
+		return len(matches)
+
+
+	@thread
+	def _execute(self, callback, file_path):
+		callback(file_path)
+
+
+	def _watch_inotify(self):
+		while True:
+			readable, _, _ = select.select([self.inotify_fd], [], [])
+			if not readable: continue
+			try:
+				buf = os.read(self.inotify_fd, 65536)
+			except BlockingIOError:
+				continue
+			file_names, offset = [], 0
+			while offset + _EVENT_HEADER.size <= len(buf):
+				wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+				offset += _EVENT_HEADER.size
+				name    = buf[offset : offset + length].rstrip(b'\0')
+				offset += length
+				if mask & IN_IGNORED:
+					self.watched_dirs.pop(wd, None)
+				if not name or not wd in self.watched_dirs: continue
+				file_name = os.path.join(self.watched_dirs[wd], os.fsdecode(name))
+				if mask & IN_ISDIR:
+					# new directories are watched right away, files written before are picked up by the scan
+					file_names.extend(self._add_watches(file_name))
+				elif not mask & IN_CREATE:
+					file_names.append(file_name)
+			self._dispatch(file_names)
+
+
+	def _watch_polling(self):
+		seen_files = set()
+		interval   = _POLL_MIN_INTERVAL
+		while True:
+			if len(self.registrations) == 0:
+				self.wake_up.wait()
+			file_names = set(self._list_files())
+			new_files  = file_names - seen_files
+			seen_files = file_names
+			# give writers a moment to complete the file
+			if new_files: time.sleep(_POLL_MIN_INTERVAL)
+			if self._dispatch(list(new_files)) > 0:
+				interval = _POLL_MIN_INTERVAL
+			else:
+				interval = min(2 * interval, _POLL_MAX_INTERVAL)
+			# new registrations reset the backoff
+			if self.wake_up.wait(interval):
+				interval = _POLL_MIN_INTERVAL
+			self.wake_up.clear()
+
+#==============================================================
+
+WATCHERS      = {}
+_WATCHER_LOCK = threading.Lock()
+
+def get_watcher(path):
+	key = os.path.abspath(path)
+	with _WATCHER_LOCK:
+		if not key in WATCHERS:
+			WATCHERS[key] = ScratchDirWatcher(path)
+		return WATCHERS[key]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+""" Simulated wall time, worker utilization and best loss of the synchronous and asynchronous
+	particle swarms on a worker pool with random evaluation times
+
+	Usage: python benchmarks/async_swarm.py
+"""
+
+import os
+import sys
+import heapq
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Designers.ask_tell import ParticleSwarmOptimizer, AsyncParticleSwarmOptimizer
+
+#====================================================
+
+def _benchmark(optimizer_class, num_workers, max_iter, durations, seed = 100691):
+	"""
+		Simulates a pool of num_workers worker slots evaluating proposals of one swarm with random
+		evaluation times. Returns the simulated wall time, worker utilization and best loss.
+	"""
+	np.random.seed(seed)
+	num_dims  = 6
+	init_pos  = np.random.uniform(-5., 5., (num_workers, num_dims))
+	lower     = np.zeros(num_dims) - 5.
+	upper     = np.zeros(num_dims) + 5.
+	optimizer = optimizer_class(init_pos, lower, upper, {'c1': 0.5, 'c2': 0.3, 'w': 0.9}, max_iter)
+
+	def loss_function(x):
+		# Rastrigin function
+		return 10 * len(x) + np.sum(x**2 - 10 * np.cos(2 * np.pi * x))
+
+	clock, busy_time, queue, running, best_loss = 0., 0., [], [], np.inf
+	while not optimizer.is_finished():
+		queue.extend(optimizer.ask())
+		while len(queue) > 0 and len(running) < num_workers:
+			point_id, x = queue.pop(0)
+			duration    = durations()
+			busy_time  += duration
+			heapq.heappush(running, (clock + duration, point_id, loss_function(x)))
+		clock, point_id, loss = heapq.heappop(running)
+		best_loss = min(best_loss, loss)
+		optimizer.tell(point_id, loss)
+	return clock, busy_time / (clock * num_workers), best_loss
+
+
+if __name__ == '__main__':
+
+	# evaluation times of JJcircuitSimV3 jobs: log-normal around one minute, 5 % run into the 600 s timeout
+	def durations():
+		if np.random.uniform() < 0.05: return 600.
+		return min(np.random.lognormal(np.log(60.), 0.7), 600.)
+
+	print('%-10s %-14s %14s %14s %12s' % ('workers', 'swarm', 'wall time [s]', 'utilization', 'best loss'))
+	for num_workers in [4, 16, 64]:
+		for label, optimizer_class in [('synchronous', ParticleSwarmOptimizer), ('asynchronous', AsyncParticleSwarmOptimizer)]:
+			wall_time, utilization, best_loss = _benchmark(optimizer_class, num_workers, 50, durations)
+			print('%-10d %-14s %14.0f %14.2f %12.3f' % (num_workers, label, wall_time, utilization, best_loss))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+""" CPU usage of the shared scratch directory watcher (inotify and polling) against one polling
+	thread per job, as previously started by the submitters
+
+	Usage: python benchmarks/scratch_dir_watcher.py
+"""
+
+import os
+import sys
+import time
+import uuid
+import shutil
+import fnmatch
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utilities.scratch_dir_watcher import ScratchDirWatcher, _load_inotify, _POLL_MAX_INTERVAL
+
+#==============================================================
+
+def _legacy_stream(path, pattern, state):
+	# per-job polling loop as previously implemented in native_event_handler
+	executed_matches = []
+	while state['run']:
+		for root, dir_name, file_names in os.walk(path):
+			for file_name in fnmatch.filter(file_names, pattern):
+				match = os.path.join(root, file_name)
+				if match in executed_matches: continue
+				executed_matches.append(match)
+
+
+def _benchmark(num_jobs, legacy = False, use_inotify = True, duration = 2.):
+	path    = tempfile.mkdtemp()
+	job_ids = [str(uuid.uuid4()) for job_index in range(num_jobs)]
+	results = []
+	state   = {'run': True}
+
+	if legacy:
+		threads = [threading.Thread(target = _legacy_stream, args = (path, '*job*%s*' % job_id, state)) for job_id in job_ids]
+		for background_thread in threads: background_thread.start()
+	else:
+		watcher = ScratchDirWatcher(path, use_inotify = use_inotify)
+		for job_id in job_ids:
+			watcher.register('*job*%s*' % job_id, results.append)
+
+	# jobs complete evenly spread over the benchmark duration
+	start_wall, start_cpu = time.time(), time.process_time()
+	for job_index, job_id in enumerate(job_ids):
+		time.sleep(max(0., start_wall + duration * (job_index + 1) / (num_jobs + 1) - time.time()))
+		with open(os.path.join(path, 'job_proc_%s.pkl' % job_id), 'wb') as content:
+			content.write(b'0')
+	time.sleep(max(0., start_wall + duration - time.time()))
+	wall, cpu = time.time() - start_wall, time.process_time() - start_cpu
+
+	# let the last callbacks complete before counting
+	time.sleep(_POLL_MAX_INTERVAL)
+	state['run'] = False
+	if legacy:
+		for background_thread in threads: background_thread.join()
+	shutil.rmtree(path)
+	return 100. * cpu / wall, len(results)
+
+
+if __name__ == '__main__':
+
+	# starting hundreds of busy polling threads alone takes minutes (each start waits for the GIL)
+	MAX_LEGACY_JOBS = 64
+
+	print('%-10s %-26s %10s %10s' % ('jobs', 'watcher', 'cpu [%]', 'received'))
+	for num_jobs in [1, 64, 512]:
+		for label, kwargs in [('shared (inotify)', {'use_inotify': True}), ('shared (polling)', {'use_inotify': False}), ('per-job polling threads', {'legacy': True})]:
+			if 'use_inotify' in kwargs and kwargs['use_inotify'] and _load_inotify() is None: continue
+			if 'legacy' in kwargs and num_jobs > MAX_LEGACY_JOBS:
+				print('%-10d %-26s %10s %10s' % (num_jobs, label, 'skipped', '-'))
+				continue
+			usage, received = _benchmark(num_jobs, **kwargs)
+			print('%-10d %-26s %10.1f %10s' % (num_jobs, label, usage, str(received) if not 'legacy' in kwargs else '-'))
@@ -6,6 +6,8 @@ import numpy as np
 import threading
 import pickle
 
+from collections import OrderedDict
+
 from Submitter            import CircuitSubmitter
 from CircuitQuantifier    import CircuitCritic, CircuitValidator
 from DatabaseHandler      import DatabaseHandler
@@ -15,6 +17,9 @@ from Utilities            import Settings
 
 from Utilities            import defaults
 from Utilities.decorators import thread
+from Utilities.events     import NOTIFIER
+from Utilities.scheduler  import TaskScheduler
+from Utilities.executors  import get_statistics as get_executor_statistics
 
 
 #====================================================
@@ -32,6 +37,9 @@ class CircuitSearcher(object):
 		API for SCILLA functionalities.
 	"""
 
+	# maximum time [s] the main loop idles without a completion event from any component
+	EVENT_TIMEOUT = 0.5
+
 	def __init__(self, circuit_params = None, general_params = None, database_path = None, settings = None):
 		if settings is None:
 			self.settings       = Settings(defaults.SETTINGS)
@@ -45,7 +53,7 @@ class CircuitSearcher(object):
 
 		self.db_handler        = DatabaseHandler(self.settings.databases, database_path)
 		self.circuit_submitter = CircuitSubmitter(self.settings.general, self.general_params)
-		self.circuit_validator = CircuitValidator()
+		self.circuit_validator = CircuitValidator(self.circuit_params, self.general_params)
 		self.circuit_critic    = CircuitCritic(self.circuit_params)
 		self.circuit_designer  = CircuitDesigner(self.settings.general, self.circuit_params)
 
@@ -54,7 +62,11 @@ class CircuitSearcher(object):
 					   designer = 'random_search', designer_options = {'max_iters': 10, 'max_concurrent': np.inf},
 					   merit = 'DoubleWell', merit_options = {},
 					   observations = [], use_library = False, 
-					   computing_resource = 'local', computing_options = {}):
+					   computing_resource = 'local', computing_options = {}, depends_on = None):
+		"""
+			depends_on: list | (optional) names of the task sets which need to be completed before this
+			                   task set starts (default: the previously added task set)
+		"""
 
 		# copy settings from kwargs
 		settings = {}
@@ -62,10 +74,20 @@ class CircuitSearcher(object):
 			if key in ['self', 'settings']: continue
 			settings[key] = value
 
+		# task sets run one after another unless dependencies are declared
+		known_names = [task_set.task_set_name for task_set in self.task_sets]
+		if depends_on is None:
+			depends_on = known_names[-1:]
+		settings['depends_on'] = [dependency if isinstance(dependency, str) else dependency.task_set_name for dependency in depends_on]
+		for dependency in settings['depends_on']:
+			if not dependency in known_names:
+				raise ValueError('task "%s" depends on unknown task "%s"' % (name, dependency))
+
 		# add task set based on defined designer
-		if designer in ['random', 'particle_swarms', 'phoenics','grid','CMAES','LBFGS', 'scipy']:
+		if designer in ['random', 'particle_swarms', 'phoenics', 'bayesian', 'grid','CMAES','LBFGS', 'scipy']:
 			task_set = CalculationTaskSet(settings)
 			self.circuit_designer.add_designer(name, designer, designer_options)
+			task_set.max_exec = self.circuit_designer.get_num_primer_tasks(task_set)
 			self.circuit_submitter.add_submitter(computing_resource)
 		elif designer in ['filter_db']:
 			task_set = FilteringTaskSet(settings)
@@ -76,243 +98,192 @@ class CircuitSearcher(object):
 		return task_set
 
 
-	def _run_calculation(self, task_set):
+	def _start_calculation(self, task_set, num_active):
 		# fetch task_set_id for easy access
 		task_set_id = task_set.task_set_id
 
 		# generate all primary tasks (i.e. primers for optimization iterations)
 		all_tasks = task_set.generate_all_tasks()
-		task_ids  = [task['task_id'] for task in task_set.generated_tasks]
-		self.db_handler.refresh()
+		if num_active == 0:
+			self.db_handler.refresh()
 		self.db_handler.add_tasks(all_tasks)
 
+		state = {'task_set': task_set, 'start_time': time.time(), 'prior_observations': []}
+
 		# check if we build on prior results
 		if task_set.settings['use_library']:
-			prior_observations = self.db_handler.get_prior_circuit_evaluations()
+			state['prior_observations'] = self.db_handler.get_prior_circuit_evaluations()
+
+		# validated circuits wait in a priority queue for free task slots
+		state['scheduler'] = TaskScheduler(task_set.settings['designer_options'].get('scheduling', 'optimizer_first'))
 
 		# check abortion criteria
-		task_set_completed  = self.db_handler.task_set_completed(task_set_id)
-		designer_terminated = self.circuit_designer.designer_terminated(task_set)
-
-		total_start = time.time()
-
-		# enter task execution loop
-
-		start_time = time.time()
-
-		iteration = 0
-		while not task_set_completed or not designer_terminated:
-
-			tic = time.time()
-			reported_times, reported_labels = [], []
-
-			# [x] fetch all tasks remaining for this task_set
-			start = time.time()
-			remaining_tasks = self.db_handler.fetch_remaining_tasks(task_set_id)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('fetching remaining tasks')
-
-			# [x] force designer to generate new parameters
-			start = time.time()
-			if not task_set_completed and designer_terminated:
-				num_from_optimizer = 0
-				for remaining_task in remaining_tasks:
-					if remaining_task['from_optimizer']:
-						num_from_optimizer += 1
-				if num_from_optimizer == len(remaining_tasks):
-					self.db_handler.set_tasks_to_redundant(remaining_tasks)
-
-
-			# [x] query parameters from designer
-			if task_set_completed and not designer_terminated:
-
-				# send new observations to designer, i.e. give designer the chance to update
-				observations = self.db_handler.get_circuit_evaluations(task_set_id)
-				if task_set.settings['use_library']:
-					observations.extend(prior_observations)
-				self.circuit_designer.provide_observations(task_set, observations)
-
-				# get new tasks from designer
-				new_tasks = self.circuit_designer.get_requested_tasks(task_set)
-				self.db_handler.add_tasks(new_tasks)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('processing special cases')			
-	
-
-			# give priority to tasks associated with currently running optimization iterations
-			sorted_tasks = remaining_tasks
-			print('# LOG | ... found %d remaining tasks ...' % len(sorted_tasks))
-
-
-			# [x] try to submit tasks to computing resources
-
-			# try to submit remaining tasks
-			start_0 = time.time()
-			num_available_resources = self.db_handler.get_num_available_resources(task_set)
-			if num_available_resources > 0:
-				submittable_tasks  = sorted_tasks[:num_available_resources]
-				available_circuits = self.db_handler.get_validated_circuits()
-
-				if len(available_circuits) == 0:
-					start = time.time()
-					# no valid circuits available --> tell designer to generate more circuit parameters
-					print('# LOG | ... could not find validated circuits ...')
-					if not self.circuit_designer.is_busy(task_set):
-						# send observations to designer
-						observations = self.db_handler.get_circuit_evaluations(task_set.task_set_id)
-						if task_set.settings['use_library']:
-							observations.extend(prior_observations)
-						# tell designer to make more circuits
-						self.circuit_designer.design_new_circuits(task_set, observations = observations)
-						print('# LOG | ... called circuit designer ...')
-					reported_times.append(time.time() - start)
-					reported_labels.append('\tpinging_designer')
-				else:
-					# fetch valid circuits and submit to computing resources
-					num_submissions = np.minimum(len(submittable_tasks), len(available_circuits))
-					tasks    = submittable_tasks[:num_submissions]
-					circuits = available_circuits[:num_submissions] 
-
-					# attempt to submit circuits
-					start = time.time()
-					self.db_handler.reserve_circuits(circuits)
-					reported_times.append(time.time() - start)
-					reported_labels.append('\tsubmitting_task_0')
-
-					start = time.time()
-					submitted, not_submitted = self.circuit_submitter.submit(circuits, task_set)
-					reported_times.append(time.time() - start)
-					reported_labels.append('\tsubmitting_task_1')
-
-					# record successfully submitted circuits
-					start = time.time()
-					submitted_tasks    = tasks
-					submitted_circuits = circuits
-					self.db_handler.set_tasks_to_submitted(submitted_tasks)
-					self.db_handler.link_submissions(submitted_tasks, submitted_circuits)
-					reported_times.append(time.time() - start)
-					reported_labels.append('\tsubmitting_task_3')
-
-			end_0 = time.time()
-			reported_times.append(end_0 - start_0)
-			reported_labels.append('processing remaining tasks')
-
-
-			# check if new circuits have been designed
-			start = time.time()
-			new_circuits = self.circuit_designer.get_circuits()
-			self.db_handler.add_new_circuits(new_circuits)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('getting circuits from designer')
-
-			# query validator for validated circuits
-			start = time.time()
-			validated_circuits = self.circuit_validator.get_validated_circuits()
-			self.db_handler.store_validated_circuits(validated_circuits)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('getting circuits from validator')
-
-			# submit new circuits to validator
-			start_0 = time.time()
-			new_circuits = self.db_handler.get_new_circuits()
-			end_0 = time.time()
-			reported_times.append(end_0 - start_0)
-			reported_labels.append('\tsubmitting circuits to validator 0')
-
-			start_1 = time.time()
-			print('# LOG | ... processing %d new circuits ...' % len(new_circuits))
-			self.circuit_validator.validate_circuits(new_circuits)
-			end_1 = time.time()
-			reported_times.append(end_1 - start_1)
-			reported_labels.append('submitting circuits to validator 1')
-
-			# collect criticized circuits
-			start = time.time()
-			criticized_circuit_results = self.circuit_critic.get_criticized_circuits()
-			criticized_circuits = [result[0] for result in criticized_circuit_results]
-			id_dicts            = [result[1] for result in criticized_circuit_results]
-			print('# LOG | ... found %d criticized circuits ...' % len(criticized_circuits))
-			self.db_handler.store_criticized_circuits(criticized_circuits, id_dicts)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('collecting circuits from critic')
-
-			# check if critic requires new tasks
-			start = time.time()
-			new_circuits = self.circuit_critic.get_requested_tasks()
-			for circuit in new_circuits:
-				self.circuit_submitter.submit(circuit, task_set)
-				self.db_handler.report_circuit_submission()
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('submitting tasks from critic')
-
-			# report progress
-			start = time.time()
-			progress_info = self.db_handler.get_task_set_progress_info(task_set, time.time() - start_time)
-			print('PROGRESS:\n%s (%.3f)' % (progress_info, time.time() - total_start))	
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('getting progress report')
-
-			iteration += 1
-
-			# update abortion criteria
-			start = time.time()
-			task_set_completed  = self.db_handler.task_set_completed(task_set_id)
-			designer_terminated = self.circuit_designer.designer_terminated(task_set)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('updating abortion criteria')
-
-			# check if the designer requests any new tasks
-			start = time.time()
-			new_tasks = self.circuit_designer.get_requested_tasks(task_set)
-			self.db_handler.add_tasks(new_tasks)
-			end = time.time()
-			reported_times.append(end - start)
-			reported_labels.append('getting tasks from designer')
-
-			# query submitter for received spectra
-			start = time.time()
-			merit_evaluation_circuits, newly_computed_circuits = [], []
-			computed_circuits = self.circuit_submitter.get_computed_circuits()
-			for circuit in computed_circuits:
-				if 'merit_re-eval' in circuit:
-					merit_evaluation_circuits.append(circuit)
-					self.db_handler.report_circuit_computation()
-				else:
-					newly_computed_circuits.append(circuit)
-
-			reported_times.append(time.time() - start)
-			reported_labels.append('\tprocessing merit evaluations 0')
-
-			unsuccessful = True
-			id_dicts = self.db_handler.set_tasks_to_computed(newly_computed_circuits)
-			while len(id_dicts) < len(newly_computed_circuits):
-				id_dicts = self.db_handler.set_tasks_to_computed(newly_computed_circuits)
+		state['task_set_completed']  = self.db_handler.task_set_completed(task_set_id)
+		state['designer_terminated'] = self.circuit_designer.designer_terminated(task_set)
+		return state
+
 
-			self.circuit_critic.criticize_circuits(newly_computed_circuits, task_set, id_dicts)
-			self.circuit_critic.report_reevaluations(merit_evaluation_circuits)
+	def _get_observations(self, state):
+		observations = self.db_handler.get_circuit_evaluations(state['task_set'].task_set_id)
+		if state['task_set'].settings['use_library']:
+			observations.extend(state['prior_observations'])
+		return observations
 
-			self.db_handler.print_pending_updates(time.time() - start_time)
-			self.db_handler.synchronize()
 
-			toc = time.time()
-			new_line = '@@@ Timing: %.5f @@@ | NUM_THREADS: %d\n' % ((toc - tic), threading.active_count())
-			print(new_line)
+	def _get_owner(self, circuit, states):
+		# circuits without a running task set, e.g. untagged circuits, are routed to the first task set only
+		task_set_id = circuit.get('task_set_id', None)
+		if task_set_id in states:
+			return task_set_id
+		return list(states.keys())[0]
+
+
+	def _submit_calculations(self, state, states):
+		task_set    = state['task_set']
+		task_set_id = task_set.task_set_id
+		scheduler   = state['scheduler']
+		made_progress = False
 
-			content = open('log_threads', 'a')
-			content.write('%.3f\t%d\n' % (time.time() - start_time, threading.active_count()))
-			content.close()
+		# [x] fetch all tasks remaining for this task_set
+		remaining_tasks = self.db_handler.fetch_remaining_tasks(task_set_id)
 
-			time.sleep(.2) # <== THIS SLEEP IS ESSENTIAL; DO NOT REMOVE
+		# [x] force designer to generate new parameters
+		if not state['task_set_completed'] and state['designer_terminated']:
+			num_from_optimizer = 0
+			for remaining_task in remaining_tasks:
+				if remaining_task['from_optimizer']:
+					num_from_optimizer += 1
+			if num_from_optimizer == len(remaining_tasks):
+				self.db_handler.set_tasks_to_redundant(remaining_tasks)
 
-		self.db_handler.set_circuits_to_unused()
+		# [x] query parameters from designer
+		if state['task_set_completed'] and not state['designer_terminated']:
+
+			# send new observations to designer, i.e. give designer the chance to update
+			self.circuit_designer.provide_observations(task_set, self._get_observations(state))
+
+			# get new tasks from designer
+			new_tasks = self.circuit_designer.get_requested_tasks(task_set)
+			self.db_handler.add_tasks(new_tasks)
+			made_progress = made_progress or len(new_tasks) > 0
+
+		# tasks are interchangeable slots, the scheduler decides which circuits fill them
+		print('# LOG | ... found %d remaining tasks for "%s" ...' % (len(remaining_tasks), task_set.task_set_name))
+
+		# [x] try to submit tasks to computing resources, at most max_concurrent per task set
+		num_available_resources = self.db_handler.get_num_available_resources(task_set)
+		if num_available_resources > 0:
+			submittable_tasks = remaining_tasks[:num_available_resources]
+			scheduler.add_circuits([circuit for circuit in self.db_handler.get_validated_circuits() if self._get_owner(circuit, states) == task_set_id])
+
+			if scheduler.get_num_queued() == 0:
+				# no valid circuits available --> tell designer to generate more circuit parameters
+				print('# LOG | ... could not find validated circuits ...')
+				if not self.circuit_designer.is_busy(task_set):
+					# tell designer to make more circuits, batches are sized to the number of free worker slots
+					self.circuit_designer.design_new_circuits(task_set, observations = self._get_observations(state), num_circuits = len(submittable_tasks))
+					print('# LOG | ... called circuit designer ...')
+			else:
+				# fetch valid circuits in order of their priority, circuits which were taken in the meantime are dropped
+				circuits = scheduler.pop_circuits(len(submittable_tasks))
+				circuits = self.db_handler.reserve_circuits(circuits)
+				tasks    = submittable_tasks[:len(circuits)]
+
+				# attempt to submit circuits
+				submitted, not_submitted = self.circuit_submitter.submit(circuits, task_set)
+				made_progress = made_progress or len(circuits) > 0
+
+				# record successfully submitted circuits
+				self.db_handler.set_tasks_to_submitted(tasks)
+				self.db_handler.link_submissions(tasks, circuits)
+		return made_progress
+
+
+	def _update_calculation(self, state):
+		task_set = state['task_set']
+		made_progress = False
+
+		# report progress
+		progress_info = self.db_handler.get_task_set_progress_info(task_set, time.time() - state['start_time'])
+		print('PROGRESS:\n%s' % progress_info)
+
+		# update abortion criteria
+		state['task_set_completed']  = self.db_handler.task_set_completed(task_set.task_set_id)
+		state['designer_terminated'] = self.circuit_designer.designer_terminated(task_set)
+
+		# check if the designer requests any new tasks
+		new_tasks = self.circuit_designer.get_requested_tasks(task_set)
+		self.db_handler.add_tasks(new_tasks)
+		made_progress = made_progress or len(new_tasks) > 0
+		return made_progress
+
+
+	def _process_shared_stages(self, states):
+		""" advances validator, critic and submitter, whose outputs are routed to the task sets by task_set_id """
+		made_progress = False
+		default_state = list(states.values())[0]
+
+		# check if new circuits have been designed
+		new_circuits = self.circuit_designer.get_circuits()
+		self.db_handler.add_new_circuits(new_circuits)
+		made_progress = made_progress or len(new_circuits) > 0
+
+		# query validator for validated circuits
+		validated_circuits = self.circuit_validator.get_validated_circuits()
+		self.db_handler.store_validated_circuits(validated_circuits)
+		made_progress = made_progress or len(validated_circuits) > 0
+
+		# submit new circuits to validator
+		new_circuits = self.db_handler.get_new_circuits()
+		print('# LOG | ... processing %d new circuits ...' % len(new_circuits))
+		self.circuit_validator.validate_circuits(new_circuits)
+
+		# collect criticized circuits
+		criticized_circuit_results = self.circuit_critic.get_criticized_circuits()
+		criticized_circuits = [result[0] for result in criticized_circuit_results]
+		id_dicts            = [result[1] for result in criticized_circuit_results]
+		print('# LOG | ... found %d criticized circuits ...' % len(criticized_circuits))
+		self.db_handler.store_criticized_circuits(criticized_circuits, id_dicts)
+		made_progress = made_progress or len(criticized_circuits) > 0
+
+		# check if critic requires new tasks
+		new_circuits = self.circuit_critic.get_requested_tasks()
+		for circuit in new_circuits:
+			task_set = states.get(circuit.get('task_set_id', None), default_state)['task_set']
+			self.circuit_submitter.submit(circuit, task_set)
+			self.db_handler.report_circuit_submission(task_set.task_set_id)
+		made_progress = made_progress or len(new_circuits) > 0
+
+
+		# query submitter for received spectra
+		merit_evaluation_circuits, newly_computed_circuits = [], []
+		computed_circuits = self.circuit_submitter.get_computed_circuits()
+		for state in states.values():
+			state['scheduler'].report_completed([circuit['circuit']['circuit_id'] for circuit in computed_circuits if 'circuit' in circuit])
+		for circuit in computed_circuits:
+			if 'merit_re-eval' in circuit:
+				merit_evaluation_circuits.append(circuit)
+				self.db_handler.report_circuit_computation(circuit['task_set_id'] if circuit.get('task_set_id', None) in states else default_state['task_set'].task_set_id)
+			else:
+				newly_computed_circuits.append(circuit)
+
+		id_dicts = self.db_handler.set_tasks_to_computed(newly_computed_circuits)
+		while len(id_dicts) < len(newly_computed_circuits):
+			id_dicts = self.db_handler.set_tasks_to_computed(newly_computed_circuits)
+
+		# each circuit is criticized with the merit of the task set it was computed for
+		for task_set_id, state in states.items():
+			circuits, tasks = [], []
+			for circuit, id_dict in zip(newly_computed_circuits, id_dicts):
+				if id_dict['task_set_id'] == task_set_id or (not id_dict['task_set_id'] in states and state is default_state):
+					circuits.append(circuit)
+					tasks.append(id_dict)
+			self.circuit_critic.criticize_circuits(circuits, state['task_set'], tasks)
+		self.circuit_critic.report_reevaluations(merit_evaluation_circuits)
+
+		self.db_handler.print_pending_updates(time.time() - default_state['start_time'])
+		self.db_handler.synchronize()
+		return made_progress
 
 
 	def _run_filtering(self, task_set):
@@ -323,25 +294,94 @@ class CircuitSearcher(object):
 		while self.db_handler.is_updating():
 			time.sleep(0.05)
 
-	
-	def execute(self):
-		
-		for task_set in self.task_sets:
-	
-			print('# LOG | ... starting task "%s" ...' % task_set.task_set_name)
-
-			if task_set.task_type == 'calculation':
-				self._run_calculation(task_set)
 
-			elif task_set.task_type == 'filtering':
-				self._run_filtering(task_set)
+	def _is_ready(self, task_set, completed_names):
+		return all([name in completed_names for name in task_set.settings['depends_on']])
 
-			elif task_set.task_type == 'db_query':
-				self._run_db_query(task_set)
 
-
-			print('# LOG | ... COMPLETED task "%s" ...' % task_set.task_set_name)
-			time.sleep(1)
+	def execute(self):
+		"""
+			Runs all task sets as soon as the task sets they depend on are completed. Calculations which
+			are ready at the same time share the computing resources, each within its max_concurrent.
+			Optimizers and worker processes are shut down when execute returns, also on errors.
+		"""
+		pending_task_sets = list(self.task_sets)
+		completed_names   = set()
+		states            = OrderedDict()
+
+		try:
+			while len(pending_task_sets) > 0 or len(states) > 0:
+
+				# start all task sets whose dependencies are completed, filtering is done right away
+				started = True
+				while started:
+					started = False
+					for task_set in list(pending_task_sets):
+						if not self._is_ready(task_set, completed_names): continue
+						pending_task_sets.remove(task_set)
+						started = True
+						print('# LOG | ... starting task "%s" ...' % task_set.task_set_name)
+
+						if task_set.task_type == 'calculation':
+							states[task_set.task_set_id] = self._start_calculation(task_set, len(states))
+							continue
+						elif task_set.task_type == 'filtering':
+							self._run_filtering(task_set)
+						elif task_set.task_type == 'db_query':
+							self._run_db_query(task_set)
+						completed_names.add(task_set.task_set_name)
+						print('# LOG | ... COMPLETED task "%s" ...' % task_set.task_set_name)
+				if len(states) == 0: continue
+
+				tic = time.time()
+
+				# iterations which hand work to the next stage are followed up immediately
+				made_progress = False
+				for state in states.values():
+					made_progress = self._submit_calculations(state, states) or made_progress
+				made_progress = self._process_shared_stages(states) or made_progress
+				for state in states.values():
+					made_progress = self._update_calculation(state) or made_progress
+
+				# retire completed calculations
+				for task_set_id, state in list(states.items()):
+					if not state['task_set_completed'] or not state['designer_terminated']: continue
+					del states[task_set_id]
+					self.circuit_designer.close_designer(state['task_set'])
+					if len(states) == 0:
+						self.db_handler.set_circuits_to_unused()
+					completed_names.add(state['task_set'].task_set_name)
+					print('# LOG | ... COMPLETED task "%s" ...' % state['task_set'].task_set_name)
+
+				toc = time.time()
+				new_line = '@@@ Timing: %.5f @@@ | NUM_THREADS: %d\n' % ((toc - tic), threading.active_count())
+				print(new_line)
+
+				content = open('log_threads', 'a')
+				content.write('%.3f\t%d\n' % (time.time() - tic, threading.active_count()))
+				content.close()
+
+				# idle until a component reports new output; the timeout only guards against missed events
+				if not made_progress and len(states) > 0:
+					NOTIFIER.wait(timeout = self.EVENT_TIMEOUT)
+
+			self._report_statistics()
+		finally:
+			self.close()
+
+
+	def close(self):
+		# running optimizers are stopped before their workers are shut down
+		self.circuit_designer.close()
+		self.circuit_submitter.close()
+
+
+	def _report_statistics(self):
+		# statistics of the run are reported once all task sets are completed
+		print('# LOG | ... spectrum cache: %s ...' % str(self.circuit_submitter.get_cache_statistics()))
+		print('# LOG | ... validator: %s ...' % str(self.circuit_validator.get_statistics()))
+		for name, statistics in get_executor_statistics().items():
+			print('# LOG | ... executor %s: %s ...' % (name, str(statistics)))
 
 
 	def query(self, kind = None, **kwargs):
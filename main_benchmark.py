@@ -16,6 +16,11 @@ if __name__ == '__main__':
 		general_params:
 			solver: string         | specifies circuit solver - 'JJcircuitSim' or '2-node'
 			phiExt: array		   | external fluxes for which to solve circuit
+			num_levels: int        | (optional) number of lowest levels computed with the sparse 2-node solver
+			truncation: int        | (optional) charge basis truncation n of the 2-node solver (default: 6)
+			gradients: bool        | (optional) compute eigenvalue derivatives with the 2-node solver, used by
+			                         designers with the 'use_gradients' option
+			spectrum_cache: bool   | (optional) reuse solver results of identical circuits (default: True)
 			target_spectrum: array | target flux spectrum of circuit (used by specific loss functions only)
 
 		Note: Task names are assumed to be unique.
@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+
+import os
+import sys
+
+# modules are imported relative to the repository root, as in the main scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from Designers.ask_tell import LBFGSBOptimizer, ScipyMinimizeOptimizer, ParticleSwarmOptimizer, AsyncParticleSwarmOptimizer, \
+							   CMAESOptimizer, BayesianOptimizer, GridSweep
+
+#====================================================
+
+NUM_DIMS = 4
+OPTIMUM  = np.linspace(0.2, 0.7, NUM_DIMS)
+LOWER    = np.zeros(NUM_DIMS)
+UPPER    = np.ones(NUM_DIMS)
+
+
+def sphere(x):
+	return float(np.sum((np.array(x) - OPTIMUM)**2))
+
+
+def run(optimizer, loss_function = sphere, seed = 0, max_evaluations = 100000):
+	"""
+		Reports the losses of proposed points in random order, like workers finishing at different times.
+		Returns the number of evaluations.
+	"""
+	random_state, in_flight, num_evaluations = np.random.RandomState(seed), [], 0
+	while not optimizer.is_finished():
+		in_flight.extend(optimizer.ask())
+		assert len(in_flight) > 0, 'optimizer is waiting for losses but has no points in flight'
+		point_id, x = in_flight.pop(random_state.randint(len(in_flight)))
+		optimizer.tell(point_id, loss_function(x))
+		num_evaluations += 1
+		assert num_evaluations < max_evaluations
+	return num_evaluations
+
+#====================================================
+
+def test_lbfgsb_converges_without_thread():
+	from scipy.optimize import minimize, rosen, rosen_der
+	x_init, bounds = np.array([-1.2, 1., 0.5, -0.3]), np.array([(-2., 2.)] * 4)
+	reference = minimize(rosen, x_init, method = 'L-BFGS-B', bounds = bounds)
+	for use_gradients in [False, True]:
+		optimizer = LBFGSBOptimizer(x_init, bounds, max_iter = 200, use_gradients = use_gradients)
+		run(optimizer, loss_function = rosen)
+		assert optimizer.result.success
+		assert optimizer.result.fun < 10 * reference.fun + 1e-10
+		assert optimizer.result.nit < 2 * reference.nit
+	assert not hasattr(optimizer, 'thread')
+
+
+def test_lbfgsb_respects_bounds_and_estimates_missing_gradients():
+	optimum   = np.array([1.5, -0.5, 0.3, 0.9])
+	optimizer = LBFGSBOptimizer(np.zeros(NUM_DIMS) + 0.5, np.array([LOWER, UPPER]).T, max_iter = 100, use_gradients = True)
+	while not optimizer.is_finished():
+		for point_id, x in optimizer.ask():
+			assert np.all(x >= LOWER) and np.all(x <= UPPER)
+			optimizer.tell(point_id, float(np.sum((x - optimum)**2)), None)
+	np.testing.assert_allclose(optimizer.result.x, np.clip(optimum, 0., 1.), atol = 1e-6)
+
+
+def test_scipy_minimize_converges():
+	optimizer = ScipyMinimizeOptimizer(np.zeros(NUM_DIMS) + 0.9, np.array([LOWER, UPPER]).T, max_iter = 100)
+	run(optimizer)
+	assert optimizer.result.fun < 1e-10
+	np.testing.assert_allclose(optimizer.result.x, OPTIMUM, atol = 1e-5)
+
+
+def test_scipy_minimize_uses_reported_gradients():
+	optimizer = ScipyMinimizeOptimizer(np.zeros(NUM_DIMS) + 0.9, np.array([LOWER, UPPER]).T, max_iter = 100, use_gradients = True)
+	while not optimizer.is_finished():
+		for point_id, x in optimizer.ask():
+			optimizer.tell(point_id, sphere(x), 2 * (x - OPTIMUM))
+	assert optimizer.result.fun < 1e-12
+
+
+def test_scipy_minimize_estimates_missing_gradients():
+	optimizer = ScipyMinimizeOptimizer(np.zeros(NUM_DIMS) + 0.9, np.array([LOWER, UPPER]).T, max_iter = 100, use_gradients = True)
+	while not optimizer.is_finished():
+		for point_id, x in optimizer.ask():
+			optimizer.tell(point_id, sphere(x), None)
+	assert optimizer.num_iterations > 1
+	assert optimizer.result.fun < 1e-10
+
+
+def test_scipy_minimize_close_ends_thread():
+	optimizer = ScipyMinimizeOptimizer(np.zeros(NUM_DIMS) + 0.9, np.array([LOWER, UPPER]).T, max_iter = 100)
+	assert len(optimizer.ask()) > 0
+	optimizer.close()
+	optimizer.thread.join(5.)
+	assert not optimizer.thread.is_alive()
+	assert optimizer.ask() == []
+
+
+def test_particle_swarms_improve():
+	for optimizer_class in [ParticleSwarmOptimizer, AsyncParticleSwarmOptimizer]:
+		np.random.seed(1)
+		init_pos  = np.random.uniform(0., 1., (8, NUM_DIMS))
+		optimizer = optimizer_class(init_pos, LOWER, UPPER, {'c1': 0.5, 'c2': 0.3, 'w': 0.9}, 40)
+		num_evaluations = run(optimizer)
+		assert num_evaluations == 8 * 40
+		assert optimizer.global_loss < min([sphere(x) for x in init_pos])
+		assert optimizer.global_loss < 1e-2
+
+
+def test_cmaes_converges_inside_and_on_the_bounds():
+	np.random.seed(2)
+	optimizer = CMAESOptimizer(np.zeros(NUM_DIMS) + 0.5, LOWER, UPPER, 80, popsize = 8, restarts = None)
+	run(optimizer)
+	assert optimizer.best_loss < 1e-8
+
+	# optimum outside the box, the best point lies on the upper bounds
+	np.random.seed(3)
+	optimizer = CMAESOptimizer(np.zeros(NUM_DIMS) + 0.5, LOWER, UPPER, 80, popsize = 8, restarts = None)
+	run(optimizer, loss_function = lambda x: float(np.sum((np.array(x) - 1.2)**2)))
+	np.testing.assert_allclose(optimizer.best_x, UPPER, atol = 1e-3)
+
+
+def test_cmaes_restarts():
+	np.random.seed(4)
+	optimizer = CMAESOptimizer(np.zeros(NUM_DIMS) + 0.5, LOWER, UPPER, 300, popsize = 6, restarts = 'bipop')
+	run(optimizer)
+	assert optimizer.num_restarts > 0
+	assert optimizer.best_loss < 1e-8
+
+
+def test_bayesian_optimizer_beats_random_search():
+	np.random.seed(5)
+	optimizer = BayesianOptimizer(LOWER, UPPER, 8, 4, num_candidates = 256)
+	num_evaluations = run(optimizer)
+	assert num_evaluations == 32
+	assert optimizer.best_loss < 0.05
+
+
+def test_grid_sweep_visits_all_points_and_resumes(tmp_path):
+	axes       = [np.linspace(0., 1., 5), np.linspace(0., 1., 3)]
+	checkpoint = str(tmp_path / 'grid.pkl')
+	optimizer  = GridSweep(axes, 4, checkpoint_file = checkpoint, checkpoint_interval = 2)
+	loss_function = lambda x: float((x[0] - 0.5)**2 + (x[1] - 1.)**2)
+	assert run(optimizer, loss_function = loss_function) == 15
+	assert optimizer.best_loss == 0.
+
+	# sweep stopped after some points continues after the last contiguous completed point
+	checkpoint = str(tmp_path / 'partial.pkl')
+	optimizer  = GridSweep(axes, 1, checkpoint_file = checkpoint, checkpoint_interval = 1)
+	for step in range(6):
+		(point_id, x), = optimizer.ask()
+		optimizer.tell(point_id, loss_function(x))
+	resumed = GridSweep(axes, 1, checkpoint_file = checkpoint, checkpoint_interval = 1)
+	assert run(resumed, loss_function = loss_function) == 9
+
+
+def test_grid_sweep_ties_entries():
+	optimizer = GridSweep([np.linspace(0., 1., 3)], 9, entry_axes = [0, 0])
+	points    = [x for point_id, x in optimizer.ask()]
+	assert len(points) == 3
+	assert all([x[0] == x[1] for x in points])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from Designers.design_utils              import canonicalize_circuit, get_canonical_key, get_triu_index_maps
+from Submitter.spectrum_cache            import get_cache_key
+from Submitter.solver_2node              import solver_2node
+from CircuitQuantifier.circuit_validator import CircuitValidator
+
+#====================================================
+
+def relabel(circuit_values, index_map):
+	relabeled = dict(circuit_values)
+	for key in ['capacities', 'junctions', 'inductances']:
+		if relabeled.get(key, None) is None: continue
+		relabeled[key] = np.array(relabeled[key])[index_map]
+	return relabeled
+
+
+def random_circuit(num_nodes, seed, inductances = True, phiOffs = None):
+	np.random.seed(seed)
+	num_entries = num_nodes * (num_nodes + 1) // 2
+	circuit = {'capacities': np.random.uniform(0., 100., num_entries), 'junctions': np.random.uniform(0., 100., num_entries),
+			   'inductances': np.random.uniform(0., 100., num_entries) if inductances else None, 'phiOffs': phiOffs}
+	return circuit
+
+#====================================================
+
+def test_relabelings_share_canonical_form():
+	for num_nodes in [2, 3, 4]:
+		circuit = random_circuit(num_nodes, seed = num_nodes)
+		canonical_values, canonical_key = canonicalize_circuit(circuit)
+		for index_map in get_triu_index_maps(num_nodes):
+			relabeled_values, relabeled_key = canonicalize_circuit(relabel(circuit, index_map))
+			assert relabeled_key == canonical_key
+			for key in ['capacities', 'junctions', 'inductances']:
+				np.testing.assert_array_equal(relabeled_values[key], canonical_values[key])
+
+
+def test_different_circuits_have_different_keys():
+	assert get_canonical_key(random_circuit(3, seed = 0)) != get_canonical_key(random_circuit(3, seed = 1))
+
+
+def test_non_uniform_flux_offsets_are_not_canonicalized():
+	circuit   = random_circuit(3, seed = 2, phiOffs = [0., 0.5])
+	relabeled = relabel(circuit, get_triu_index_maps(3)[-1])
+	assert get_canonical_key(circuit) != get_canonical_key(relabeled)
+
+
+def test_2node_spectrum_is_label_invariant():
+	circuit   = {'capacities': np.array([10., 20., 30.]), 'junctions': np.array([50., 10., 80.]), 'inductances': None}
+	relabeled = relabel(circuit, get_triu_index_maps(2)[1])
+	spec      = solver_2node(circuit['capacities'], None, circuit['junctions'], phiExt = [0.1, 0.4], n = 6, num_levels = 4)
+	spec_relabeled = solver_2node(relabeled['capacities'], None, relabeled['junctions'], phiExt = [0.1, 0.4], n = 6, num_levels = 4)
+	np.testing.assert_allclose(spec, spec_relabeled, rtol = 1e-8, atol = 1e-8)
+
+
+def test_cache_keys_are_canonical_for_label_invariant_solvers_only():
+	circuit   = random_circuit(2, seed = 3, inductances = False)
+	relabeled = relabel(circuit, get_triu_index_maps(2)[1])
+	general   = {'solver': '2-node', 'phiExt': [0., 0.5]}
+	assert get_cache_key(general, circuit) == get_cache_key(general, relabeled)
+
+	# eigenvalue gradients depend on the labeling
+	general_gradients = dict(general, gradients = True)
+	assert get_cache_key(general_gradients, circuit) != get_cache_key(general_gradients, relabeled)
+
+	# the flux sweep of JJcircuitSimV3 depends on the labeling
+	circuit   = random_circuit(3, seed = 4)
+	relabeled = relabel(circuit, get_triu_index_maps(3)[-1])
+	general   = {'solver': 'JJcircuitSimV3', 'phiExt': [0., 0.5]}
+	assert get_cache_key(general, circuit) != get_cache_key(general, relabeled)
+	assert get_cache_key(general, circuit) == get_cache_key(general, dict(circuit))
+
+
+def test_validator_drops_relabelings_for_label_invariant_solvers_only():
+	circuit   = random_circuit(2, seed = 5, inductances = False)
+	relabeled = relabel(circuit, get_triu_index_maps(2)[1])
+	validator = CircuitValidator(None, {'solver': '2-node', 'phiExt': [0., 0.5]})
+	assert not validator.is_duplicate({'circuit_values': circuit})
+	assert validator.is_duplicate({'circuit_values': relabeled})
+
+	validator = CircuitValidator(None, {'solver': 'JJcircuitSimV3', 'phiExt': [0., 0.5]})
+	assert not validator.is_duplicate({'circuit_values': circuit})
+	assert not validator.is_duplicate({'circuit_values': relabeled})
+	assert validator.is_duplicate({'circuit_values': dict(circuit)})
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+from circuit_searcher                import CircuitSearcher
+from DatabaseHandler.circuit_handler import CircuitHandler
+
+#====================================================
+
+class DBSettings(object):
+	db_type = 'sqlite'
+	db_name = 'circuits'
+
+	def __init__(self, db_path):
+		self.db_path = db_path
+
+
+def create_circuit(circuit_id, task_set_id = None):
+	circuit = {'circuit_id': circuit_id, 'circuit_values': {}, 'is_valid': True}
+	if task_set_id is not None:
+		circuit['task_set_id'] = task_set_id
+	return circuit
+
+#====================================================
+
+def test_untagged_circuits_are_routed_to_one_task_set():
+	searcher = CircuitSearcher.__new__(CircuitSearcher)
+	states   = {'first': {}, 'second': {}}
+	assert searcher._get_owner(create_circuit('a', 'second'), states) == 'second'
+	assert searcher._get_owner(create_circuit('b'), states) == 'first'
+	assert searcher._get_owner(create_circuit('c', 'retired'), states) == 'first'
+
+
+def test_reserving_taken_circuits_is_tolerated(tmp_path, monkeypatch):
+	handler = CircuitHandler(DBSettings(str(tmp_path / 'circuits.db')))
+	monkeypatch.setattr(handler, 'VALIDATED_CIRCUITS', {})
+	circuits = [create_circuit('a'), create_circuit('b')]
+	handler.store_validated_circuits(circuits)
+
+	# two schedulers holding the same circuit, only the first reservation gets it
+	assert [circuit['circuit_id'] for circuit in handler.reserve_circuits(circuits[:1])] == ['a']
+	assert [circuit['circuit_id'] for circuit in handler.reserve_circuits(circuits)] == ['b']
+	assert handler.reserve_circuits(circuits) == []
+	assert handler.get_validated_circuits() == []
@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+
+import pytest
+
+from circuit_searcher import CircuitSearcher
+
+#====================================================
+
+def test_unknown_dependencies_are_rejected():
+	searcher = CircuitSearcher.__new__(CircuitSearcher)
+	searcher.task_sets = []
+	with pytest.raises(ValueError, match = 'unknown task "missing"'):
+		searcher.add_task(name = 'task1', designer = 'random', depends_on = ['missing'])
+	assert searcher.task_sets == []
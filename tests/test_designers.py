@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+import pytest
+import tracemalloc
+
+from Designers                   import BayesianDesigner, CMAESDesigner, GridDesigner, ParticleSwarmDesigner, ScipyMinimizeDesigner
+from Designers.abstract_designer import AbstractDesigner
+from Designers.ask_tell          import GridSweep
+from TaskSets                    import CalculationTaskSet
+
+#====================================================
+
+class Settings(object):
+	scratch_dir = '.'
+
+
+class TaskSet(object):
+	def __init__(self, num_tasks, max_iters, max_concurrent = 4):
+		self.settings        = {'name': 'task_set', 'designer_options': {'max_iters': max_iters, 'max_concurrent': max_concurrent}}
+		self.generated_tasks = [{'task_id': 'task_%d' % index, 'execution_index': 0} for index in range(num_tasks)]
+
+
+PARAMS = {'c_specs': {'dimension': 3, 'low': 0., 'high': 100., 'keep_prob': 1.},
+		  'j_specs': {'dimension': 3, 'low': 0., 'high': 200., 'keep_num': 2},
+		  'l_specs': None, 'phiOffs_specs': None}
+
+
+def create_designer(designer_class = AbstractDesigner, options = {}, params = PARAMS):
+	return designer_class(Settings(), params, dict(options))
+
+#====================================================
+
+def test_optimizers_finished_requires_initialized_optimizers():
+	designer = create_designer()
+	assert not designer.optimizers_finished()
+	designer.optimizers['sim'] = GridSweep([np.linspace(0., 1., 2)], 2)
+	assert not designer.optimizers_finished()
+	designer.optimizers['sim'].finished = True
+	assert designer.optimizers_finished()
+
+
+@pytest.mark.parametrize('designer_class', [CMAESDesigner, ParticleSwarmDesigner, ScipyMinimizeDesigner])
+def test_ask_tell_designers_start_one_optimizer_per_observation(designer_class, tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	designer     = create_designer(designer_class)
+	observations = []
+	for circuit in designer._design_random_circuits(2):
+		observations.append({key: {'samples': value} for key, value in circuit.items() if key != 'phiOffs'})
+	designer.initialize_optimizers(TaskSet(3, 5), observations)
+	assert len(designer.optimizers) == 2
+	assert sorted([info_dict['observation_index'] for info_dict in designer.sim_info_dicts.values()]) == [0, 1]
+
+	# each proposed circuit comes with a new task of the task set, inactive components stay switched off
+	circuits = designer.ask()
+	assert len(circuits) > 0
+	assert len(designer.NEW_TASKS) == len(circuits)
+	assert all([task['from_optimizer'] and task['task_id'].startswith('task_') for task in designer.NEW_TASKS])
+	for circuit in circuits:
+		x_mask = designer.sim_info_dicts[circuit['sim_id']]['x_mask']
+		values = np.concatenate([circuit['capacities'], circuit['junctions']])
+		assert np.all(values[x_mask == 0.] == 0.)
+
+	designer.tell([{'circuit_id': circuit['circuit_id'], 'loss': 1.} for circuit in circuits])
+	assert len(designer.PENDING_EVALUATIONS) == 0
+	designer.close_optimizers()
+
+
+def test_bayesian_designer_draws_flux_offsets():
+	params   = dict(PARAMS, phiOffs_specs = {'dimension': 2, 'values': [0., 0.5]})
+	designer = create_designer(BayesianDesigner, {'num_candidates': 16}, params)
+	designer.initialize_optimizers(TaskSet(2, 4, max_concurrent = 2), [])
+	assert len(designer.optimizers) == 1
+
+	circuits = designer.ask()
+	assert len(circuits) == 2 and len(designer.NEW_TASKS) == 2
+	for circuit in circuits:
+		assert len(circuit['phiOffs']) == 2
+		assert set(circuit['phiOffs']) <= set([0., 0.5])
+
+
+def test_large_grid_generates_tasks_as_the_sweep_advances(tmp_path):
+	options = {'max_iters': 10**6, 'max_concurrent': 8, 'num_points': 10, 'checkpoint_file': str(tmp_path / 'grid.pkl')}
+
+	tracemalloc.start()
+	try:
+		designer = create_designer(GridDesigner, options)
+		task_set = CalculationTaskSet({'name': 'grid', 'designer_options': dict(options)})
+		task_set.max_exec = designer.get_num_primer_tasks(task_set.settings['designer_options'])
+		task_set.generate_all_tasks()
+		designer.initialize_optimizers(task_set, [])
+		assert designer.optimizers[designer.running_instance_ids[0]['sim_id']].num_points == 10**6
+
+		for iteration in range(100):
+			circuits = designer.ask()
+			designer.tell([{'circuit_id': circuit['circuit_id'], 'loss': 1.} for circuit in circuits])
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	# only the first batch is primed, further tasks are requested with each proposed grid point
+	assert len(task_set.generated_tasks) == 8
+	assert len(designer.NEW_TASKS) == 800
+	assert peak < 10 * 1024**2
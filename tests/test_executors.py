@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import time
+import threading
+
+from Utilities.executors import BoundedExecutor
+
+#====================================================
+
+def test_workers_and_queue_are_bounded():
+	executor = BoundedExecutor('test_bounded', max_workers = 2, max_queue = 3)
+	lock, running, peak = threading.Lock(), [], [0]
+
+	def job(index):
+		with lock:
+			running.append(index)
+			peak[0] = max(peak[0], len(running))
+		time.sleep(0.05)
+		with lock:
+			running.remove(index)
+
+	for index in range(10):
+		executor.submit(job, index)
+	deadline = time.time() + 5.
+	while executor.get_statistics()['completed'] < 10 and time.time() < deadline:
+		time.sleep(0.01)
+
+	statistics = executor.get_statistics()
+	assert statistics['completed'] == 10
+	assert peak[0] == 2
+	assert statistics['max_queue_length'] <= 3
+	assert statistics['blocked'] > 0
+
+
+def test_calls_from_own_workers_do_not_block():
+	executor = BoundedExecutor('test_reentrant', max_workers = 1, max_queue = 1)
+	done     = []
+
+	def outer():
+		for index in range(5):
+			executor.submit(done.append, index)
+
+	executor.submit(outer)
+	deadline = time.time() + 5.
+	while len(done) < 5 and time.time() < deadline:
+		time.sleep(0.01)
+	assert done == list(range(5))
+
+
+def test_failures_are_counted_and_idle_workers_exit():
+	executor = BoundedExecutor('test_failures', max_workers = 2, max_queue = None)
+	executor.IDLE_TIMEOUT = 0.1
+
+	def fail():
+		raise ValueError('expected failure')
+
+	executor.submit(fail)
+	executor.submit(lambda: None)
+	deadline = time.time() + 5.
+	while executor.get_statistics()['workers'] > 0 and time.time() < deadline:
+		time.sleep(0.01)
+	statistics = executor.get_statistics()
+	assert statistics['failed'] == 1 and statistics['completed'] == 1
+	assert statistics['workers'] == 0
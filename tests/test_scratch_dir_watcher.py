@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+import os
+import time
+import pytest
+
+from Utilities.scratch_dir_watcher import ScratchDirWatcher, _load_inotify
+
+#====================================================
+
+def wait_for(found, num_files, timeout = 10.):
+	deadline = time.time() + timeout
+	while len(found) < num_files and time.time() < deadline:
+		time.sleep(0.01)
+
+
+def write(path, content = 'data'):
+	with open(path, 'w') as stream:
+		stream.write(content)
+
+#====================================================
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_files_in_subdirectories_are_reported(tmp_path, use_inotify):
+	if use_inotify and _load_inotify() is None:
+		pytest.skip('inotify not available')
+	os.makedirs(str(tmp_path / 'existing'))
+	write(str(tmp_path / 'existing' / 'proc_before.pkl'))
+
+	found   = []
+	watcher = ScratchDirWatcher(str(tmp_path), use_inotify = use_inotify)
+	watcher.register('proc_*.pkl', found.append)
+	assert (watcher.inotify_fd is not None) == use_inotify
+
+	# files in existing, new and nested new directories, non-matching names are ignored
+	write(str(tmp_path / 'proc_top.pkl'))
+	write(str(tmp_path / 'existing' / 'proc_existing.pkl'))
+	os.makedirs(str(tmp_path / 'new' / 'nested'))
+	write(str(tmp_path / 'new' / 'nested' / 'proc_nested.pkl'))
+	write(str(tmp_path / 'new' / 'other.pkl'))
+	wait_for(found, 4)
+	time.sleep(0.1)
+
+	expected = [os.path.join(str(tmp_path), name) for name in ['existing/proc_before.pkl', 'existing/proc_existing.pkl',
+																 'new/nested/proc_nested.pkl', 'proc_top.pkl']]
+	assert sorted(found) == expected
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from Submitter.solver_2node import solver_2node
+
+#====================================================
+
+# flux qubit of the solver's own example
+CARR = np.array([0., 45., 0.])
+JARR = np.array([115., 50., 115.])
+
+# lowest levels of the solver before the sparse and batched solvers were introduced (n = 6, not normalized)
+BASELINE_FLUX_SWEEP = np.array([[-239.41137415,   -220.9300605104, -200.9960597356, -178.4476383129],
+								[-209.6910864117, -193.4911160397, -176.6023669223, -158.201921678 ],
+								[-146.2721476025, -141.2282431636, -135.1718118923, -128.4714735261]])
+BASELINE_SINGLE     = np.array([-113.19304582, -100.951411953, -92.4091006363, -88.79344298])
+
+#====================================================
+
+def test_flux_sweep_matches_baseline():
+	spec = solver_2node(CARR, None, JARR, phiExt = [0., 0.25, 0.5], n = 6, normalized = False)
+	assert spec.shape == (3, 169)
+	np.testing.assert_allclose(spec[:, :4], BASELINE_FLUX_SWEEP, rtol = 1e-8)
+
+
+def test_single_point_matches_baseline():
+	spec = solver_2node(np.array([10., 20., 30.]), None, np.array([50., 0., 80.]), phiExt = 0.3, qExt = [0.1, 0.2], n = 6, normalized = False)
+	np.testing.assert_allclose(spec[:4], BASELINE_SINGLE, rtol = 1e-8)
+
+
+def test_sparse_levels_match_dense():
+	dense  = solver_2node(CARR, None, JARR, phiExt = [0., 0.25, 0.5], n = 6, normalized = False)
+	sparse = solver_2node(CARR, None, JARR, phiExt = [0., 0.25, 0.5], n = 6, normalized = False, num_levels = 4)
+	assert sparse.shape == (3, 4)
+	np.testing.assert_allclose(sparse, dense[:, :4], rtol = 1e-8)
+
+
+def test_gradients_match_finite_differences():
+	carr, jarr = np.array([10., 20., 30.]), np.array([50., 10., 80.])
+	phiExt     = [0.1, 0.4]
+	spec, grads = solver_2node(carr, None, jarr, phiExt = phiExt, n = 6, num_levels = 3, gradients = True)
+	assert grads.shape == (2, 3, 6)
+
+	params = np.concatenate([carr, jarr])
+	step   = 1e-4
+	for index in range(len(params)):
+		upper, lower = np.copy(params), np.copy(params)
+		upper[index] += step
+		lower[index] -= step
+		spec_upper = solver_2node(upper[:3], None, upper[3:], phiExt = phiExt, n = 6, num_levels = 3)
+		spec_lower = solver_2node(lower[:3], None, lower[3:], phiExt = phiExt, n = 6, num_levels = 3)
+		np.testing.assert_allclose(grads[..., index], (spec_upper - spec_lower) / (2 * step), rtol = 1e-4, atol = 1e-6)
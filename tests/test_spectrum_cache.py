@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from Submitter.spectrum_cache import SpectrumCache, get_cache_key
+
+#====================================================
+
+GENERAL = {'solver': '2-node', 'phiExt': [0., 0.5], 'truncation': 6}
+CIRCUIT = {'capacities': np.array([10., 20., 30.]), 'junctions': np.array([50., 0., 80.]), 'inductances': None}
+
+#====================================================
+
+def test_keys_depend_on_solver_settings_and_values():
+	key = get_cache_key(GENERAL, CIRCUIT)
+	assert key == get_cache_key(dict(GENERAL), dict(CIRCUIT))
+	assert key != get_cache_key(dict(GENERAL, truncation = 8), CIRCUIT)
+	assert key != get_cache_key(dict(GENERAL, phiExt = [0., 0.25]), CIRCUIT)
+	assert key != get_cache_key(GENERAL, dict(CIRCUIT, capacities = np.array([10., 20., 31.])))
+
+
+def test_memory_tier_evicts_least_recently_used():
+	cache = SpectrumCache(max_entries = 2)
+	cache.put('a', (np.arange(3), False))
+	cache.put('b', (np.arange(4), False))
+	assert cache.get('a') is not None
+	cache.put('c', (np.arange(5), False))
+	assert cache.get('b') is None
+	np.testing.assert_array_equal(cache.get('a')[0], np.arange(3))
+	assert cache.get_statistics()['evictions'] == 1
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+	key = get_cache_key(GENERAL, CIRCUIT)
+	SpectrumCache(path = str(tmp_path)).put(key, (np.arange(3), False))
+	cache   = SpectrumCache(path = str(tmp_path))
+	results = cache.get(key)
+	np.testing.assert_array_equal(results[0], np.arange(3))
+	assert cache.get_statistics()['disk_hits'] == 1
+
+	# entries are copies, modifying them does not change the cache
+	results[0][0] = 10
+	assert cache.get(key)[0][0] == 0
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import time
+import sqlite3
+import pytest
+import sqlalchemy as sql
+
+from DatabaseHandler                  import AddEntry
+from DatabaseHandler.sqlite_interface import SQLiteDatabase
+
+#====================================================
+
+ATTRIBUTES = {'name': 'string', 'group': 'integer', 'value': 'float'}
+
+@pytest.fixture
+def database(tmp_path):
+	path = str(tmp_path / 'db' / 'test.db')
+	return path, SQLiteDatabase(path, ATTRIBUTES, name = 'test', indexes = [{'columns': ['name'], 'unique': False}])
+
+#====================================================
+
+def test_batched_inserts_and_chunked_fetches(database):
+	path, db = database
+	num_entries = 3 * SQLiteDatabase.IN_CHUNK_SIZE + 7
+	for index in range(num_entries):
+		db.add({'name': 'entry_%d' % index, 'group': index % 3, 'value': float(index)})
+
+	# list conditions longer than IN_CHUNK_SIZE are split into several selections
+	names   = ['entry_%d' % index for index in range(num_entries)]
+	entries = db.fetch_all({'name': names + names[:10]})
+	assert len(entries) == num_entries
+	assert sorted([entry['value'] for entry in entries]) == [float(index) for index in range(num_entries)]
+
+	entries = db.fetch_all({'name': names, 'group': [0, 2]})
+	assert len(entries) == len([index for index in range(num_entries) if index % 3 != 1])
+	assert db.fetch_all({'name': []}) == []
+
+
+def test_none_in_list_conditions(database):
+	path, db = database
+	db.add({'name': 'a', 'group': None, 'value': 1.})
+	db.add({'name': 'b', 'group': 1,    'value': 2.})
+	db.add({'name': 'c', 'group': 2,    'value': 3.})
+	entries = db.fetch_all({'group': [None, 1]})
+	assert sorted([entry['name'] for entry in entries]) == ['a', 'b']
+
+
+def test_batched_updates_apply_in_order(database):
+	path, db = database
+	for index in range(20):
+		db.add({'name': 'entry_%d' % index, 'group': 0, 'value': 0.})
+	db.update_all([{'name': 'entry_%d' % index} for index in range(20)], [{'value': float(index)} for index in range(20)])
+	db.update_all({'name': 'entry_3'}, {'group': 1, 'value': -1.})
+	entries = {entry['name']: entry for entry in db.fetch_all({'group': [0, 1]})}
+	assert [entries['entry_%d' % index]['value'] for index in range(20) if index != 3] == [float(index) for index in range(20) if index != 3]
+	assert entries['entry_3']['value'] == -1. and entries['entry_3']['group'] == 1
+
+
+def test_locked_database_is_retried(database):
+	path, db = database
+	lock = sqlite3.connect(path, timeout = 0)
+	lock.execute('BEGIN EXCLUSIVE')
+	for index in range(5):
+		db.add({'name': 'entry_%d' % index, 'group': 0, 'value': float(index)})
+	time.sleep(3 * SQLiteDatabase.RETRY_INTERVAL)
+	lock.rollback()
+	lock.close()
+	assert len(db.fetch_all({'group': 0})) == 5
+
+
+def test_retries_are_bounded(database):
+	path, db = database
+	db.MAX_RETRIES = 2
+	# attempts give up after 10 ms instead of the default busy timeout of the driver
+	db.connection.execute('PRAGMA busy_timeout = 10')
+	lock = sqlite3.connect(path, timeout = 0)
+	lock.execute('BEGIN EXCLUSIVE')
+	try:
+		with pytest.raises(sql.exc.OperationalError, match = 'locked'):
+			db._execute_batch([AddEntry(db.db, db.table, {'name': 'a', 'group': 0, 'value': 0.}, sequence = 0)])
+	finally:
+		lock.rollback()
+		lock.close()
+
+
+def test_other_errors_are_raised_immediately(database):
+	path, db = database
+	connection = sqlite3.connect(path)
+	connection.execute('DROP TABLE test')
+	connection.commit()
+	connection.close()
+	start = time.time()
+	with pytest.raises(sql.exc.OperationalError, match = 'no such table'):
+		db._execute_batch([AddEntry(db.db, db.table, {'name': 'a', 'group': 0, 'value': 0.}, sequence = 0)])
+	assert time.time() - start < SQLiteDatabase.RETRY_INTERVAL
+
+
+def test_failed_reads_raise_instead_of_waiting(database):
+	path, db = database
+	connection = sqlite3.connect(path)
+	connection.execute('DROP TABLE test')
+	connection.commit()
+	connection.close()
+	db.add({'name': 'a', 'group': 0, 'value': 0.})
+	with pytest.raises(sql.exc.OperationalError, match = 'no such table'):
+		db.fetch_all({'group': 0})
+	assert [request.get_entries() for request, error in db.FAILED_REQUESTS] == [[{'name': 'a', 'group': 0, 'value': 0.}]]
+
+
+def test_failing_requests_do_not_take_down_their_batch(database):
+	path, db = database
+	connection = sqlite3.connect(path)
+	connection.execute("CREATE TRIGGER reject_bad BEFORE INSERT ON test WHEN NEW.name = 'bad' BEGIN SELECT RAISE(ABORT, 'bad entry'); END")
+	connection.commit()
+	connection.close()
+
+	# requests issued while the processor is held back are executed as one batch
+	with db.connection_lock:
+		for name in ['a', 'bad', 'b']:
+			db.add({'name': name, 'group': 0, 'value': 0.})
+		db.update_all({'name': 'a'}, {'value': 1.})
+	entries = {entry['name']: entry for entry in db.fetch_all({'group': 0})}
+	assert sorted(entries.keys()) == ['a', 'b']
+	assert entries['a']['value'] == 1.
+	assert len(db.FAILED_REQUESTS) == 1 and 'bad entry' in str(db.FAILED_REQUESTS[0][1])
+
+	# the processor keeps serving requests
+	db.add({'name': 'c', 'group': 1, 'value': 0.})
+	assert len(db.fetch_all({'group': 1})) == 1
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import os
+import time
+
+from Submitter             import CircuitSubmitter
+from Submitter.worker_pool import WorkerPool
+
+#====================================================
+
+def evaluate(solver, carr, larr, jarr, **kwargs):
+	# stands in for the solver wrapper, 'crash' kills the worker process like a segfault
+	if solver == 'crash':
+		os._exit(11)
+	if solver == 'hang':
+		time.sleep(600)
+	return (carr, False)
+
+
+def create_job(name, solver):
+	return {'job_name': name, 'evaluation_function': evaluate, 'general_params': {'solver': solver, 'phiExt': None},
+			'circuit': {'circuit_values': {'capacities': name, 'junctions': None, 'inductances': None}}}
+
+
+def wait_for(results, num_results, timeout = 60.):
+	deadline = time.time() + timeout
+	while len(results) < num_results and time.time() < deadline:
+		time.sleep(0.05)
+
+#====================================================
+
+def test_dead_workers_are_replaced_and_their_jobs_failed():
+	results = []
+	pool    = WorkerPool([None, None], results.append)
+	try:
+		for name, solver in [('a', 'test'), ('b', 'crash'), ('c', 'test'), ('d', 'test')]:
+			pool.submit(create_job(name, solver))
+		wait_for(results, 4)
+		measurements = {data['job_name']: data['measurements'] for data in results}
+		assert sorted(measurements.keys()) == ['a', 'b', 'c', 'd']
+		assert measurements['a']['eigen_spectrum'] == 'a'
+		assert measurements['b']['eigen_spectrum'] is None
+
+		# the replacement worker processes further jobs
+		for name in ['e', 'f', 'g']:
+			pool.submit(create_job(name, 'test'))
+		wait_for(results, 7)
+		assert sorted([data['job_name'] for data in results]) == ['a', 'b', 'c', 'd', 'e', 'f', 'g']
+		assert all([worker.is_alive() for worker in pool.workers])
+	finally:
+		pool.close()
+
+
+def test_close_terminates_busy_workers():
+	pool = WorkerPool([None], [].append)
+	pool.JOIN_TIMEOUT = 0.5
+	pool.submit(create_job('a', 'hang'))
+	time.sleep(1.)
+	pool.close()
+	assert not any([worker.is_alive() for worker in pool.workers])
+	assert not pool.collector.is_alive()
+
+
+def test_closing_the_submitter_stops_the_workers(tmp_path, monkeypatch):
+	class GeneralSettings(object):
+		scratch_dir = str(tmp_path)
+
+	# the local submitter reads the cpus it may use from the scratch file in the working directory
+	monkeypatch.chdir(tmp_path)
+	with open('scratch_file', 'w') as content:
+		content.write('Cpus_allowed_list:\t0-1\n')
+
+	submitter = CircuitSubmitter(GeneralSettings(), {'spectrum_cache': False})
+	submitter.add_submitter('local')
+	pool = submitter.submitters['local'].pool
+	assert all([worker.is_alive() for worker in pool.workers])
+
+	submitter.close()
+	assert not any([worker.is_alive() for worker in pool.workers])
+	assert submitter.submitters == {}